@@ -0,0 +1,61 @@
+"""
+Throughput and commit latency of the intent journal under each fsync policy.
+
+Usage:
+    python benchmarks/bench_journal.py [--records 5000] [--producers 32] [--window-ms 2]
+
+Producers are asyncio tasks that each journal an intent and wait for it to be
+durable before "dispatching" the next one, like replicate_trade does.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.intent_journal import FSYNC_POLICIES, IntentJournal  # noqa: E402
+
+SIGNAL = {'symbol': 'EURUSD', 'volume': 0.1, 'type': 'buy', 'action': 'open', 'ticket': 1}
+
+
+async def run(policy, records, producers, window_ms, directory):
+    journal = IntentJournal(os.path.join(directory, f'{policy}.log'), commit_window_ms=window_ms, fsync=policy)
+    latencies = []
+
+    async def producer(count):
+        for _ in range(count):
+            started = time.perf_counter()
+            await journal.intent('bench', SIGNAL)
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*[producer(records // producers) for _ in range(producers)])
+    elapsed = time.perf_counter() - started
+    journal.stop()
+
+    latencies.sort()
+    stats = journal.get_stats()
+    print(f"{policy:>6}: {len(latencies) / elapsed:>10,.0f} intents/s  "
+          f"p50 {latencies[len(latencies) // 2] * 1000:6.2f} ms  "
+          f"p99 {latencies[int(len(latencies) * 0.99)] * 1000:6.2f} ms  "
+          f"fsyncs {stats['commits']:>6}  records/fsync {stats['records_per_commit']:.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--records', type=int, default=5000)
+    parser.add_argument('--producers', type=int, default=32)
+    parser.add_argument('--window-ms', type=float, default=2.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        for policy in FSYNC_POLICIES:
+            asyncio.run(run(policy, args.records, args.producers, args.window_ms, directory))
+
+
+if __name__ == '__main__':
+    main()
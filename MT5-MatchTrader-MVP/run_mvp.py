@@ -1,9 +1,12 @@
 #!/usr/bin/env python3
 """
 MT5 to MatchTrader MVP Runner
-Usage: python run_mvp.py
+Usage: python run_mvp.py [--flatten]
+
+--flatten closes every open position on every MatchTrader account and exits
 """
 
+import argparse
 import asyncio
 import logging
 import signal
@@ -11,6 +14,7 @@ import sys
 import os
 from pathlib import Path
 from src.trade_copier_mvp import TradeCopierMVP
+from src.flatten import summarize
 
 def setup_logging():
     """Setup logging configuration"""
@@ -26,8 +30,20 @@ def setup_logging():
         ]
     )
 
+async def flatten(copier):
+    """Close everything on every follower account; exit code 1 unless every account was confirmed flat"""
+    async with copier.session_pool as session:
+        report = await copier.flatten_all(session)
+    for line in summarize(report):
+        print(line)
+    return 0 if report['flat'] else 1
+
 async def main():
     """Main application entry point"""
+    parser = argparse.ArgumentParser(description="MT5 to MatchTrader MVP")
+    parser.add_argument('--flatten', action='store_true',
+                        help="close every open position on every MatchTrader account and exit")
+    args = parser.parse_args()
     setup_logging()
     logger = logging.getLogger(__name__)
     
@@ -40,6 +56,10 @@ async def main():
         
         copier = TradeCopierMVP("config_mvp.json")
         
+        if args.flatten:
+            logger.warning("Flattening all MatchTrader accounts...")
+            sys.exit(await flatten(copier))
+        
         # Setup signal handlers for graceful shutdown
         shutdown_event = asyncio.Event()
         
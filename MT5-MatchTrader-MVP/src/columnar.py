@@ -0,0 +1,58 @@
+import operator
+from typing import Sequence
+
+import numpy as np
+
+# Column layouts for MT5 TradePosition / TradeDeal rows. Field names match the
+# MetaTrader5 namedtuple attributes, so rows convert with one attrgetter each.
+POSITION_DTYPE = np.dtype([
+    ('ticket', np.int64),
+    ('time_update_msc', np.int64),
+    ('type', np.int8),
+    ('magic', np.int64),
+    ('volume', np.float64),
+    ('price_open', np.float64),
+    ('sl', np.float64),
+    ('tp', np.float64),
+    ('price_current', np.float64),
+    ('swap', np.float64),
+    ('profit', np.float64),
+    ('symbol', 'U32'),
+    ('comment', 'U32'),
+])
+
+DEAL_DTYPE = np.dtype([
+    ('ticket', np.int64),
+    ('order', np.int64),
+    ('time', np.int64),
+    ('time_msc', np.int64),
+    ('type', np.int8),
+    ('entry', np.int8),
+    ('magic', np.int64),
+    ('position_id', np.int64),
+    ('volume', np.float64),
+    ('price', np.float64),
+    ('commission', np.float64),
+    ('swap', np.float64),
+    ('profit', np.float64),
+    ('symbol', 'U32'),
+    ('comment', 'U32'),
+])
+
+
+def to_structured_array(rows: Sequence, dtype: np.dtype) -> np.ndarray:
+    """Build a structured array from MT5 namedtuples in one pass (no per-row dicts)"""
+    if not rows:
+        return np.empty(0, dtype=dtype)
+    getter = operator.attrgetter(*dtype.names)
+    return np.fromiter((getter(row) for row in rows), dtype=dtype, count=len(rows))
+
+
+def positions_to_array(positions: Sequence) -> np.ndarray:
+    """Convert positions_get() rows to a POSITION_DTYPE structured array"""
+    return to_structured_array(positions, POSITION_DTYPE)
+
+
+def deals_to_array(deals: Sequence) -> np.ndarray:
+    """Convert history_deals_get() rows to a DEAL_DTYPE structured array"""
+    return to_structured_array(deals, DEAL_DTYPE)
@@ -0,0 +1,181 @@
+import asyncio
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional
+
+
+class Outcome:
+    """Result of one request, set by the caller inside a limiter slot"""
+
+    __slots__ = ('ok',)
+
+    def __init__(self):
+        self.ok = True
+
+
+class AdaptiveLimit:
+    """Adaptive in-flight limit for one broker
+
+    Completed requests are collected into windows. At the end of each window
+    its p90 latency is compared with the long-term baseline (the lowest window
+    p90 seen, drifting slowly upward so it follows a broker that got slower
+    for good):
+      errors in the window         -> limit * error_backoff   (AIMD decrease)
+      p90 above baseline*tolerance -> limit * baseline*tolerance/p90 (gradient)
+      latency flat, limit in use   -> limit + 1               (additive increase)
+    """
+
+    def __init__(self, initial: int, min_limit: int, max_limit: int, window: int,
+                 tolerance: float, error_backoff: float):
+        self.limit = float(initial)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.window = window
+        self.tolerance = tolerance
+        self.error_backoff = error_backoff
+        self.in_flight = 0
+        self.waiters = deque()
+        self.samples: List[float] = []
+        self.window_errors = 0
+        self.window_peak = 0
+        self.baseline: Optional[float] = None
+        self.last_p90: Optional[float] = None
+        self.requests = 0
+        self.errors = 0
+        self.decreases = 0
+
+    @property
+    def slots(self) -> int:
+        return max(self.min_limit, int(self.limit))
+
+    async def acquire(self):
+        if self.in_flight < self.slots and not self.waiters:
+            self._take()
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        self.waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as the caller gave up
+                self.in_flight -= 1
+                self._wake()
+            else:
+                try:
+                    self.waiters.remove(waiter)
+                except ValueError:
+                    pass
+            raise
+
+    def _take(self):
+        self.in_flight += 1
+        self.window_peak = max(self.window_peak, self.in_flight)
+
+    def _wake(self):
+        while self.waiters and self.in_flight < self.slots:
+            waiter = self.waiters.popleft()
+            if not waiter.done():
+                self._take()
+                waiter.set_result(None)
+
+    def release(self, rtt: Optional[float], ok: bool):
+        """Return a slot; rtt is None for requests that were cancelled"""
+        self.in_flight -= 1
+        if rtt is not None:
+            self.requests += 1
+            self.samples.append(rtt)
+            if not ok:
+                self.errors += 1
+                self.window_errors += 1
+            if len(self.samples) >= self.window:
+                self._adapt()
+        self._wake()
+
+    def _adapt(self):
+        samples = sorted(self.samples)
+        p90 = samples[min(len(samples) - 1, int(len(samples) * 0.9))]
+        self.last_p90 = p90
+        if self.baseline is None or p90 < self.baseline:
+            self.baseline = p90
+        else:
+            self.baseline += (p90 - self.baseline) * 0.01
+
+        if self.window_errors:
+            self.limit *= self.error_backoff
+            self.decreases += 1
+        elif p90 > self.baseline * self.tolerance:
+            self.limit *= max(self.error_backoff, self.baseline * self.tolerance / p90)
+            self.decreases += 1
+        elif self.window_peak >= self.slots:
+            # Only grow a limit that is actually being reached
+            self.limit += 1
+        self.limit = min(float(self.max_limit), max(float(self.min_limit), self.limit))
+
+        self.samples = []
+        self.window_errors = 0
+        self.window_peak = self.in_flight
+
+    def get_stats(self) -> Dict:
+        return {
+            'limit': self.slots,
+            'in_flight': self.in_flight,
+            'waiting': len(self.waiters),
+            'rtt_p90_ms': self.last_p90 * 1000 if self.last_p90 is not None else None,
+            'rtt_baseline_ms': self.baseline * 1000 if self.baseline is not None else None,
+            'requests': self.requests,
+            'errors': self.errors,
+            'decreases': self.decreases,
+        }
+
+
+class ConcurrencyLimiter:
+    """Adaptive outbound concurrency limits, one per broker base URL
+
+    Usage:
+        async with limiter.slot(base_url) as outcome:
+            response = await session.post(...)
+            outcome.ok = response.status < 500
+    An exception inside the block counts as an error.
+    """
+
+    def __init__(self, initial_limit: int = 20, min_limit: int = 2, max_limit: int = 200, window: int = 20,
+                 tolerance: float = 1.5, error_backoff: float = 0.7):
+        self.initial_limit = initial_limit
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.window = window
+        self.tolerance = tolerance
+        self.error_backoff = error_backoff
+        self.limits: Dict[str, AdaptiveLimit] = {}
+
+    def limit_for(self, key: str) -> AdaptiveLimit:
+        limit = self.limits.get(key)
+        if limit is None:
+            limit = self.limits[key] = AdaptiveLimit(self.initial_limit, self.min_limit, self.max_limit,
+                                                     self.window, self.tolerance, self.error_backoff)
+        return limit
+
+    @asynccontextmanager
+    async def slot(self, key: str):
+        limit = self.limit_for(key)
+        await limit.acquire()
+        outcome = Outcome()
+        started = time.monotonic()
+        rtt = None
+        try:
+            yield outcome
+            rtt = time.monotonic() - started
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            outcome.ok = False
+            rtt = time.monotonic() - started
+            raise
+        finally:
+            limit.release(rtt, outcome.ok)
+
+    def get_stats(self) -> Dict[str, Dict]:
+        """Current limit and measured RTT per broker"""
+        return {key: limit.get_stats() for key, limit in self.limits.items()}
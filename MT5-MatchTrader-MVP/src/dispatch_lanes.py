@@ -0,0 +1,235 @@
+import asyncio
+import logging
+from collections import deque
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+# Result reported for requests that were coalesced away before being sent
+COALESCED = {'status': 'coalesced'}
+
+
+class PendingSend:
+    """One queued request on a lane"""
+
+    __slots__ = ('send', 'order', 'payload', 'action', 'ticket', 'future')
+
+    def __init__(self, send: Callable[[Dict, Optional[bytes]], Awaitable], order: Dict, payload: Optional[bytes],
+                 action: Optional[str], ticket: Any, future: asyncio.Future):
+        self.send = send
+        self.order = order
+        self.payload = payload
+        self.action = action
+        self.ticket = ticket
+        self.future = future
+
+
+class Lane:
+    """Bounded FIFO of pending sends that still allows removing queued entries"""
+
+    def __init__(self, maxsize: int):
+        self.items = deque()
+        self.maxsize = maxsize
+        self.changed = asyncio.Condition()
+        self.waiting = 0
+
+    async def put(self, item: PendingSend):
+        async with self.changed:
+            self.waiting += 1
+            try:
+                await self.changed.wait_for(lambda: len(self.items) < self.maxsize)
+            finally:
+                self.waiting -= 1
+            self.items.append(item)
+            self.changed.notify_all()
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[PendingSend]:
+        """Next pending send, or None if the lane stayed empty for timeout seconds"""
+        async with self.changed:
+            try:
+                await asyncio.wait_for(self.changed.wait_for(lambda: self.items), timeout)
+            except asyncio.TimeoutError:
+                # Items only leave the deque below, so a timeout racing a put cannot lose one
+                if not self.items:
+                    return None
+            item = self.items.popleft()
+            self.changed.notify_all()
+            return item
+
+
+class DispatchLanes:
+    """Partitioned dispatcher: FIFO within a lane, lanes run in parallel
+
+    A lane is one destination account, or one account+ticket pair. Each lane has
+    its own bounded queue and worker task, so a slow account only delays its own
+    lane. Idle lane workers exit and are recreated on the next submit.
+
+    Requests still waiting in a lane are coalesced per ticket: consecutive
+    modifies keep only the latest SL/TP, a modify folds into a pending open, a
+    close drops the modifies before it, and an open+close pair cancels out.
+    """
+
+    PARTITIONS = ('account', 'account_ticket')
+
+    def __init__(self, partition: str = 'account', max_queue: int = 1000, idle_timeout: float = 30.0,
+                 coalesce: bool = True):
+        if partition not in self.PARTITIONS:
+            raise ValueError(f"Unknown lane partition: {partition}")
+        self.partition = partition
+        self.max_queue = max_queue
+        self.idle_timeout = idle_timeout
+        self.coalesce = coalesce
+        self.lanes: Dict[Hashable, Lane] = {}
+        self.workers: Dict[Hashable, asyncio.Task] = {}
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.dispatched = 0
+        self.failed = 0
+        self.saved_requests = 0
+        self.max_depth = 0
+
+    def lane_key(self, account: str, signal: Dict) -> Hashable:
+        """Lane for a signal going to one account"""
+        ticket = signal.get('ticket')
+        if self.partition == 'account_ticket' and ticket is not None:
+            return (account, ticket)
+        return account
+
+    async def submit(self, key: Hashable, send: Callable[[Dict, Optional[bytes]], Awaitable], order: Dict,
+                     action: Optional[str] = None, ticket: Any = None,
+                     payload: Optional[bytes] = None) -> asyncio.Future:
+        """Queue a send on a lane; waits only if the lane is full
+
+        send is called as send(order, payload). Returns a future for the send
+        result, so callers can queue several sends in order before awaiting any
+        of them. The order dict is owned by the lane from here on (coalescing
+        may update it in place, dropping the now stale pre-serialized payload).
+        """
+        self._bind_loop()
+        lane = self.lanes.get(key)
+        if lane is None:
+            lane = self.lanes[key] = Lane(self.max_queue)
+        item = PendingSend(send, order, payload, action, ticket, self.loop.create_future())
+
+        # Skip coalescing while earlier submits wait for room, so they are not overtaken
+        if self.coalesce and ticket is not None and not lane.waiting and self._coalesce(lane, item):
+            return item.future
+
+        await lane.put(item)
+        self.max_depth = max(self.max_depth, len(lane.items))
+
+        worker = self.workers.get(key)
+        if worker is None or worker.done():
+            self.workers[key] = self.loop.create_task(self._run_lane(key, lane))
+        return item.future
+
+    async def dispatch(self, key: Hashable, send: Callable[[Dict, Optional[bytes]], Awaitable], order: Dict,
+                       action: Optional[str] = None, ticket: Any = None, payload: Optional[bytes] = None) -> Any:
+        """Queue a send on a lane and wait for its result"""
+        return await (await self.submit(key, send, order, action, ticket, payload))
+
+    def _coalesce(self, lane: Lane, item: PendingSend) -> bool:
+        """Merge a new request into pending ones; True if it needs no send of its own"""
+        pending = [p for p in lane.items if p.ticket == item.ticket]
+        if not pending:
+            return False
+
+        if item.action == 'modify':
+            last = pending[-1]
+            if last.action not in ('open', 'modify'):
+                return False
+            last.order.update({k: item.order[k] for k in ('sl', 'tp') if k in item.order})
+            last.payload = None
+            self._follow(last.future, item.future)
+            self.saved_requests += 1
+            return True
+
+        if item.action == 'close':
+            superseded = []
+            while pending and pending[-1].action == 'modify':
+                superseded.append(pending.pop())
+            for modify in superseded:
+                lane.items.remove(modify)
+            self.saved_requests += len(superseded)
+
+            if pending and pending[-1].action == 'open':
+                # Never sent, so nothing to close either
+                opened = pending[-1]
+                lane.items.remove(opened)
+                self.saved_requests += 2
+                for future in [opened.future, item.future] + [m.future for m in superseded]:
+                    if not future.done():
+                        future.set_result(dict(COALESCED))
+                return True
+
+            for modify in superseded:
+                self._follow(item.future, modify.future)
+        return False
+
+    @staticmethod
+    def _follow(source: asyncio.Future, target: asyncio.Future):
+        """Resolve target with whatever source resolves to"""
+        def copy(done: asyncio.Future):
+            if target.done():
+                return
+            if done.cancelled():
+                target.cancel()
+            elif done.exception() is not None:
+                target.set_exception(done.exception())
+            else:
+                target.set_result(done.result())
+        source.add_done_callback(copy)
+
+    def _bind_loop(self):
+        # Lanes belong to one event loop; start fresh if the copier moved to another
+        loop = asyncio.get_running_loop()
+        if loop is not self.loop:
+            self.loop = loop
+            self.lanes = {}
+            self.workers = {}
+
+    async def _run_lane(self, key: Hashable, lane: Lane):
+        while True:
+            item = await lane.get(self.idle_timeout)
+            if item is None:
+                # No await between the empty check and removal, so no submit can slip in
+                if not lane.items and not lane.waiting:
+                    self.lanes.pop(key, None)
+                    self.workers.pop(key, None)
+                    return
+                continue
+
+            if item.future.cancelled():
+                continue
+            try:
+                result = await item.send(item.order, item.payload)
+                self.dispatched += 1
+                if not item.future.cancelled():
+                    item.future.set_result(result)
+            except asyncio.CancelledError:
+                item.future.cancel()
+                raise
+            except Exception as e:
+                self.failed += 1
+                logging.error(f"Dispatch on lane {key} failed: {e}")
+                if not item.future.cancelled():
+                    item.future.set_exception(e)
+
+    async def close(self):
+        """Cancel all lane workers (queued sends are abandoned)"""
+        for worker in self.workers.values():
+            worker.cancel()
+        await asyncio.gather(*self.workers.values(), return_exceptions=True)
+        for lane in self.lanes.values():
+            for item in lane.items:
+                item.future.cancel()
+        self.lanes = {}
+        self.workers = {}
+
+    def get_stats(self) -> Dict:
+        """Get lane counts, queue depths, dispatch and coalescing counters"""
+        return {
+            'lanes': len(self.lanes),
+            'queued': sum(len(lane.items) for lane in self.lanes.values()),
+            'max_depth': self.max_depth,
+            'dispatched': self.dispatched,
+            'failed': self.failed,
+            'saved_requests': self.saved_requests,
+        }
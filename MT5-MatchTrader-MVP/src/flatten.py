@@ -0,0 +1,162 @@
+import asyncio
+import logging
+import time
+from typing import Dict, List
+
+
+class AccountCircuit:
+    """Stops closing on an account after too many consecutive failures"""
+
+    __slots__ = ('threshold', 'failures')
+
+    def __init__(self, threshold: int):
+        self.threshold = threshold
+        self.failures = 0
+
+    @property
+    def is_open(self) -> bool:
+        return self.failures >= self.threshold
+
+    def record(self, ok: bool):
+        self.failures = 0 if ok else self.failures + 1
+
+
+class Flattener:
+    """Emergency close of every open position on every follower account
+
+    Books are fetched for all accounts concurrently, then every close is fired
+    at once under a global and a per-account concurrency limit. A failed close
+    is retried with backoff; an account whose closes keep failing trips its
+    circuit and the rest of its positions are reported as skipped instead of
+    queueing more doomed requests behind the healthy accounts.
+
+    Every book is fetched again afterwards to confirm it is flat. An account
+    whose book cannot be fetched (before or after) is reported as unverified,
+    never as "0/0 closed", and the report is only `flat` when every account
+    was confirmed empty.
+    """
+
+    def __init__(self, concurrency: int = 200, per_account_concurrency: int = 20,
+                 max_attempts: int = 3, backoff: float = 0.1, circuit_threshold: int = 5):
+        self.concurrency = concurrency
+        self.per_account_concurrency = per_account_concurrency
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.circuit_threshold = circuit_threshold
+
+    async def flatten(self, session, clients: Dict[str, object]) -> Dict:
+        """Close all positions on all accounts; returns the per-account report"""
+        started = time.perf_counter()
+        semaphore = asyncio.Semaphore(self.concurrency)
+        accounts = list(clients)
+        reports = await asyncio.gather(
+            *[self._flatten_account(session, account, clients[account], semaphore, started) for account in accounts]
+        )
+        unverified = [account for account, r in zip(accounts, reports) if r['remaining'] is None]
+        report = {
+            'accounts': dict(zip(accounts, reports)),
+            'positions': sum(r['positions'] for r in reports),
+            'closed': sum(r['closed'] for r in reports),
+            'failed': sum(r['failed'] for r in reports),
+            'skipped': sum(r['skipped'] for r in reports),
+            'remaining': sum(r['remaining'] or 0 for r in reports),
+            'unverified_accounts': unverified,
+            'elapsed_ms': (time.perf_counter() - started) * 1000,
+        }
+        report['flat'] = not unverified and not report['remaining']
+        logging.warning(
+            f"Flatten closed {report['closed']}/{report['positions']} positions on {len(accounts)} accounts "
+            f"in {report['elapsed_ms']:.0f} ms ({report['failed']} failed, {report['skipped']} skipped, "
+            f"{report['remaining']} still open, {len(unverified)} accounts unverified)"
+        )
+        return report
+
+    async def _fetch(self, session, account: str, client, semaphore: asyncio.Semaphore, report: Dict):
+        """Fetch an account's book; None (recorded in the report) if it could not be fetched"""
+        try:
+            async with semaphore:
+                positions = await client.get_positions(session)
+            if positions is None:
+                raise RuntimeError("position fetch failed")
+            return positions
+        except Exception as e:
+            logging.error(f"Flatten could not fetch positions for {account}: {e}")
+            report['errors'].append(str(e))
+            return None
+
+    async def _flatten_account(self, session, account: str, client, semaphore: asyncio.Semaphore,
+                               started: float) -> Dict:
+        # remaining: positions still open after the flatten, None when that is unknown
+        report = {'positions': 0, 'closed': 0, 'failed': 0, 'skipped': 0, 'remaining': None,
+                  'fetch_failed': False, 'circuit_open': False, 'errors': [], 'elapsed_ms': 0.0}
+        positions = await self._fetch(session, account, client, semaphore, report)
+        if positions is None:
+            report['fetch_failed'] = True
+            report['elapsed_ms'] = (time.perf_counter() - started) * 1000
+            logging.error(f"Flatten could not see the book of {account}; its positions may still be open")
+            return report
+
+        report['positions'] = len(positions)
+        circuit = AccountCircuit(self.circuit_threshold)
+        account_limit = asyncio.Semaphore(self.per_account_concurrency)
+        results = await asyncio.gather(
+            *[self._close(session, client, position, semaphore, account_limit, circuit) for position in positions]
+        )
+        for result in results:
+            report[result] += 1
+        report['circuit_open'] = circuit.is_open
+
+        # Confirm against the broker rather than trusting the close responses
+        remaining = await self._fetch(session, account, client, semaphore, report) if positions else []
+        if remaining is not None:
+            report['remaining'] = len(remaining)
+        report['elapsed_ms'] = (time.perf_counter() - started) * 1000
+        if remaining is None:
+            logging.error(f"Flatten could not confirm {account} is flat")
+        elif remaining:
+            logging.error(f"Flatten left {len(remaining)} positions open on {account}")
+        return report
+
+    async def _close(self, session, client, position: Dict, semaphore: asyncio.Semaphore,
+                     account_limit: asyncio.Semaphore, circuit: AccountCircuit) -> str:
+        """Close one position with retries; returns 'closed', 'failed' or 'skipped'"""
+        for attempt in range(self.max_attempts):
+            if circuit.is_open:
+                return 'skipped'
+            async with account_limit, semaphore:
+                try:
+                    ok = await client.close_position(session, position['id']) is not None
+                except Exception as e:
+                    logging.error(f"Error closing position {position.get('id')}: {e}")
+                    ok = False
+            circuit.record(ok)
+            if ok:
+                return 'closed'
+            if attempt + 1 < self.max_attempts:
+                await asyncio.sleep(self.backoff * 2 ** attempt)
+        return 'failed'
+
+
+def summarize(report: Dict) -> List[str]:
+    """Human-readable lines for a flatten report, slowest accounts first"""
+    lines = [
+        f"Closed {report['closed']}/{report['positions']} positions in {report['elapsed_ms']:.0f} ms "
+        f"({report['failed']} failed, {report['skipped']} skipped)",
+        "All accounts confirmed flat" if report['flat'] else
+        f"NOT FLAT: {report['remaining']} positions still open, "
+        f"{len(report['unverified_accounts'])} accounts could not be checked",
+    ]
+    accounts = sorted(report['accounts'].items(), key=lambda item: item[1]['elapsed_ms'], reverse=True)
+    for account, result in accounts:
+        if result['fetch_failed']:
+            lines.append(f"  {account}: could not fetch positions, state unknown")
+            continue
+        status = ', circuit open' if result['circuit_open'] else ''
+        if result['remaining'] is None:
+            status += ', not verified'
+        elif result['remaining']:
+            status += f", {result['remaining']} still open"
+        lines.append(
+            f"  {account}: {result['closed']}/{result['positions']} closed in {result['elapsed_ms']:.0f} ms{status}"
+        )
+    return lines
@@ -0,0 +1,193 @@
+import asyncio
+import json
+import logging
+import os
+import queue
+import threading
+import time
+import uuid
+from concurrent.futures import Future
+from typing import Dict, List, Optional
+
+FSYNC_POLICIES = ('group', 'always', 'none')
+
+
+class IntentJournal:
+    """Append-only write-ahead journal of copy intents and acks with group commit
+
+    Records are NDJSON lines. A writer thread gathers everything appended within
+    the commit window and makes it durable with one fsync, so a burst of intents
+    costs one disk flush instead of one per record. fsync policy:
+      group  - one fsync per commit window (default)
+      always - one fsync per record
+      none   - flushed to the OS only (no durability across power loss)
+    """
+
+    def __init__(self, path: str, commit_window_ms: float = 2.0, fsync: str = 'group'):
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"Unknown fsync policy: {fsync}")
+        self.path = path
+        self.commit_window = commit_window_ms / 1000.0
+        self.fsync = fsync
+        self.jobs = queue.Queue()
+        self.thread: Optional[threading.Thread] = None
+        self.start_lock = threading.Lock()
+        self.records = 0
+        self.commits = 0
+
+    def start(self):
+        """Start the writer thread (done automatically on the first append)"""
+        with self.start_lock:
+            if self.thread is None or not self.thread.is_alive():
+                directory = os.path.dirname(self.path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                self.thread = threading.Thread(target=self._run, name="intent-journal", daemon=True)
+                self.thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        """Commit everything queued and stop the writer thread"""
+        if self.thread is not None and self.thread.is_alive():
+            self.jobs.put(None)
+            self.thread.join(timeout)
+
+    def append(self, record: Dict) -> Future:
+        """Queue a record; the future resolves once it is committed"""
+        self.start()
+        future = Future()
+        self.jobs.put((json.dumps(record, separators=(',', ':')).encode() + b'\n', future))
+        return future
+
+    async def intent(self, account: str, signal: Dict) -> str:
+        """Journal a copy intent and wait until it is durable; returns its id"""
+        intent_id = uuid.uuid4().hex
+        await asyncio.wrap_future(self.append({'t': 'intent', 'id': intent_id, 'account': account, 'signal': signal}))
+        return intent_id
+
+    def ack(self, intent_id: str, ok: bool = True) -> Future:
+        """Journal that an intent was dispatched (callers need not wait for it)"""
+        return self.append({'t': 'ack', 'id': intent_id, 'ok': ok})
+
+    def _run(self):
+        self._truncate_torn_tail()
+        with open(self.path, 'ab', buffering=0) as journal:
+            fd = journal.fileno()
+            stopping = False
+            while not stopping:
+                job = self.jobs.get()
+                if job is None:
+                    break
+                batch = [job]
+                # Group commit: gather whatever else arrives within the window
+                deadline = time.monotonic() + self.commit_window
+                while True:
+                    remaining = deadline - time.monotonic()
+                    try:
+                        job = self.jobs.get(timeout=remaining) if remaining > 0 else self.jobs.get_nowait()
+                    except queue.Empty:
+                        break
+                    if job is None:
+                        stopping = True
+                        break
+                    batch.append(job)
+                self._commit(journal, fd, batch)
+
+    def _truncate_torn_tail(self):
+        """Cut a partial last line left by a crash, so the next record starts on its own line"""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'r+b') as journal:
+            end = journal.seek(0, os.SEEK_END)
+            position = end
+            while position > 0:
+                start = max(0, position - 4096)
+                journal.seek(start)
+                chunk = journal.read(position - start)
+                newline = chunk.rfind(b'\n')
+                if newline >= 0:
+                    position = start + newline + 1
+                    break
+                position = start
+            if position < end:
+                journal.seek(position)
+                try:
+                    # Complete record whose newline never made it to disk
+                    json.loads(journal.read(end - position))
+                    journal.write(b'\n')
+                except ValueError:
+                    logging.warning(f"Truncating {end - position} bytes of torn record at the end of {self.path}")
+                    journal.truncate(position)
+
+    @staticmethod
+    def _write(journal, data: bytes):
+        """Write all of data; an unbuffered file may accept only part of it per call"""
+        view = memoryview(data)
+        while view:
+            written = journal.write(view)
+            view = view[written:]
+
+    def _commit(self, journal, fd: int, batch: List):
+        try:
+            if self.fsync == 'always':
+                for line, _ in batch:
+                    self._write(journal, line)
+                    os.fsync(fd)
+                    self.commits += 1
+            else:
+                self._write(journal, b''.join(line for line, _ in batch))
+                if self.fsync == 'group':
+                    os.fsync(fd)
+                    self.commits += 1
+        except OSError as e:
+            logging.error(f"Journal write failed: {e}")
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        self.records += len(batch)
+        for _, future in batch:
+            future.set_result(None)
+
+    def pending(self) -> List[Dict]:
+        """Intents with no ack, in journal order (read on startup, before appending)"""
+        intents: Dict[str, Dict] = {}
+        if not os.path.exists(self.path):
+            return []
+        with open(self.path, 'rb') as journal:
+            for line in journal:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # Torn final line from a crash mid-write
+                    continue
+                if record.get('t') == 'intent':
+                    intents[record['id']] = record
+                elif record.get('t') == 'ack':
+                    intents.pop(record.get('id'), None)
+        return list(intents.values())
+
+    def compact(self) -> List[Dict]:
+        """Rewrite the journal with only unacked intents and return them
+
+        Called on startup before anything is appended, so the journal does not
+        grow without bound and a torn final line is dropped.
+        """
+        if self.thread is not None and self.thread.is_alive():
+            raise RuntimeError("Cannot compact the journal while the writer is running")
+        pending = self.pending()
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'wb') as journal:
+            for record in pending:
+                journal.write(json.dumps(record, separators=(',', ':')).encode() + b'\n')
+            journal.flush()
+            os.fsync(journal.fileno())
+        os.replace(tmp_path, self.path)
+        return pending
+
+    def get_stats(self) -> Dict:
+        """Get record and commit counts"""
+        return {
+            'records': self.records,
+            'commits': self.commits,
+            'records_per_commit': self.records / self.commits if self.commits else 0.0,
+            'queued': self.jobs.qsize(),
+        }
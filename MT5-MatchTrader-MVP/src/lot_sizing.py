@@ -0,0 +1,99 @@
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+MODES = ('proportional', 'equity_based')
+
+
+class LotSizer:
+    """Sizes one master volume for every follower account in a single NumPy pass
+
+    Per-account state (multiplier, cached equity, volume step and the step-aligned
+    cap/floor) lives in parallel arrays indexed by account, so sizing a signal for
+    hundreds of followers is a handful of vector operations.
+    """
+
+    def __init__(self, mode: str = 'proportional', multiplier: float = 1.0,
+                 max_lot: float = 10.0, min_lot: float = 0.01, default_step: float = 0.01):
+        if mode not in MODES:
+            raise ValueError(f"Unknown lot size mode: {mode}")
+        self.mode = mode
+        self.multiplier = multiplier
+        self.max_lot = max_lot
+        self.min_lot = min_lot
+        self.default_step = default_step
+        self.master_equity = 0.0
+
+        self.accounts: List[str] = []
+        self.index: Dict[str, int] = {}
+        self.account_multipliers = np.empty(0)
+        self.equity = np.empty(0)
+        self.steps = np.empty(0)
+        self.caps = np.empty(0)
+        self.floors = np.empty(0)
+
+    def add_accounts(self, accounts: Iterable[str], steps: Optional[Sequence[float]] = None,
+                     multipliers: Optional[Sequence[float]] = None):
+        """Register follower accounts with their broker volume step and own multiplier"""
+        accounts = [a for a in accounts if a not in self.index]
+        if not accounts:
+            return
+        count = len(accounts)
+        for offset, account in enumerate(accounts):
+            self.index[account] = len(self.accounts) + offset
+        self.accounts.extend(accounts)
+        self.account_multipliers = np.append(
+            self.account_multipliers, multipliers if multipliers is not None else np.ones(count))
+        self.equity = np.append(self.equity, np.zeros(count))
+        self.steps = np.append(self.steps, steps if steps is not None else np.full(count, self.default_step))
+        self._update_limits()
+
+    def configure(self, multiplier: Optional[float] = None, max_lot: Optional[float] = None,
+                  min_lot: Optional[float] = None, mode: Optional[str] = None):
+        """Change global sizing settings"""
+        if mode is not None:
+            if mode not in MODES:
+                raise ValueError(f"Unknown lot size mode: {mode}")
+            self.mode = mode
+        if multiplier is not None:
+            self.multiplier = multiplier
+        if max_lot is not None:
+            self.max_lot = max_lot
+        if min_lot is not None:
+            self.min_lot = min_lot
+        self._update_limits()
+
+    def _update_limits(self):
+        # Cap and floor aligned to each broker's step, so rounding cannot leave the range
+        self.caps = np.floor(self.max_lot / self.steps + 1e-9) * self.steps
+        self.floors = np.maximum(np.ceil(self.min_lot / self.steps - 1e-9), 1) * self.steps
+
+    def update_equity(self, account: str, equity: float):
+        """Cache a follower's equity for equity_based sizing"""
+        index = self.index.get(account)
+        if index is not None:
+            self.equity[index] = equity
+
+    def indices(self, accounts: Sequence[str]) -> np.ndarray:
+        """Array positions for a subset of accounts (unknown accounts get defaults)"""
+        self.add_accounts(accounts)
+        return np.fromiter((self.index[a] for a in accounts), dtype=np.intp, count=len(accounts))
+
+    def size(self, master_volume: float, master_equity: Optional[float] = None,
+             indices: Optional[np.ndarray] = None) -> np.ndarray:
+        """Follower volumes for one master volume (all accounts, or the given indices)"""
+        multipliers, equity, steps = self.account_multipliers, self.equity, self.steps
+        caps, floors = self.caps, self.floors
+        if indices is not None:
+            multipliers, equity, steps = multipliers[indices], equity[indices], steps[indices]
+            caps, floors = caps[indices], floors[indices]
+
+        lots = multipliers * (master_volume * self.multiplier)
+        master_equity = master_equity or self.master_equity
+        if self.mode == 'equity_based' and master_equity > 0:
+            # Followers without a cached equity yet are sized proportionally
+            lots *= np.where(equity > 0, equity / master_equity, 1.0)
+
+        lots = np.floor(lots / steps + 1e-9) * steps
+        np.clip(lots, floors, caps, out=lots)
+        return np.round(lots, 8, out=lots)
@@ -3,16 +3,37 @@ import asyncio
 import logging
 from datetime import datetime, timedelta
 from typing import Dict, Optional, List
+from .rate_limiter import RateLimiter, parse_retry_after
+from .concurrency_limiter import ConcurrencyLimiter
 
 class MatchTraderClient:
-    def __init__(self, base_url: str, username: str, password: str, account_number: str = None):
+    def __init__(self, base_url: str, username: str, password: str, account_number: str = None,
+                 rate_limiter: Optional[RateLimiter] = None,
+                 concurrency_limiter: Optional[ConcurrencyLimiter] = None):
         self.base_url = base_url
         self.username = username
         self.password = password
         self.account_number = account_number
+        # Shared limiter for order requests; without one a 429 is returned to the caller
+        self.rate_limiter = rate_limiter
+        self.account_key = f"{base_url}#{account_number or username}"
+        # Shared adaptive in-flight limit per broker for every HTTP call
+        self.concurrency_limiter = concurrency_limiter
         self.token = None
         self.token_expiry = None
+        # In-flight refresh shared by every caller that needs a new token
+        self._refresh: Optional[asyncio.Future] = None
         
+    async def _request(self, session: aiohttp.ClientSession, method: str, url: str, **kwargs):
+        """Issue an HTTP call within the broker's adaptive concurrency limit"""
+        if self.concurrency_limiter is None:
+            return await getattr(session, method)(url, **kwargs)
+        async with self.concurrency_limiter.slot(self.base_url) as outcome:
+            response = await getattr(session, method)(url, **kwargs)
+            # Throttling and server errors mean the broker is overloaded
+            outcome.ok = response.status < 500 and response.status != 429
+            return response
+    
     async def authenticate(self, session: aiohttp.ClientSession) -> bool:
         """Authenticate with the MatchTrader platform"""
         try:
@@ -21,7 +42,7 @@ class MatchTraderClient:
             if self.account_number:
                 data["account_number"] = self.account_number
                 
-            response = await session.post(url, json=data)
+            response = await self._request(session, 'post', url, json=data)
             if response.status == 200:
                 result = await response.json()
                 self.token = result.get("access_token") or result.get("token")
@@ -44,19 +65,85 @@ class MatchTraderClient:
         return await self.authenticate(session)
     
     async def refresh_token(self, session: aiohttp.ClientSession) -> bool:
-        """Refresh the authentication token"""
-        return await self.authenticate(session)
+        """Refresh the authentication token
+        
+        Single-flight: callers arriving while a refresh is running wait for it
+        instead of logging in again.
+        """
+        if self._refresh is None:
+            self._refresh = asyncio.ensure_future(self.authenticate(session))
+            self._refresh.add_done_callback(self._refresh_done)
+        # Shielded so one cancelled caller does not cancel the refresh for the rest
+        return await asyncio.shield(self._refresh)
+    
+    def _refresh_done(self, refresh):
+        if self._refresh is refresh:
+            self._refresh = None
+    
+    async def _authorized(self, session: aiohttp.ClientSession, method: str, url: str,
+                          headers: Optional[Dict] = None, **kwargs):
+        """Call with the bearer token; on 401 refresh the token and replay once"""
+        token = self.token
+        response = await self._request(session, method, url,
+                                       headers=dict(headers or {}, Authorization=f"Bearer {token}"), **kwargs)
+        if response.status != 401:
+            return response
+        # Another request may already have refreshed the token while this one was in flight
+        if self.token == token:
+            await self.refresh_token(session)
+            if self.token == token:
+                return response
+        logging.warning(f"Token rejected by {self.base_url}, replaying request with a refreshed token")
+        return await self._request(session, method, url,
+                                   headers=dict(headers or {}, Authorization=f"Bearer {self.token}"), **kwargs)
+    
+    async def _post_authorized(self, session: aiohttp.ClientSession, url: str, **kwargs):
+        return await self._authorized(session, 'post', url, **kwargs)
+    
+    async def _get_authorized(self, session: aiohttp.ClientSession, url: str, **kwargs):
+        return await self._authorized(session, 'get', url, **kwargs)
     
-    async def place_order(self, session: aiohttp.ClientSession, order_details: Dict) -> Optional[Dict]:
-        """Place an order on the MatchTrader platform"""
+    async def _send_order(self, session: aiohttp.ClientSession, url: str, is_exit: bool = False, **kwargs):
+        """POST an order request through the rate limiter; a 429 is queued for retry, not dropped
+        
+        is_exit marks closes, which get priority over opens in the rate limiter.
+        """
+        retry = 0
+        while True:
+            if self.rate_limiter is not None:
+                await self.rate_limiter.acquire(self.base_url, self.account_key, is_exit=is_exit)
+            response = await self._post_authorized(session, url, **kwargs)
+            if self.rate_limiter is None:
+                return response
+            if response.status != 429:
+                self.rate_limiter.on_success(self.base_url, self.account_key)
+                return response
+            retry_after = parse_retry_after(response.headers.get('Retry-After'))
+            wait = self.rate_limiter.on_throttled(self.base_url, self.account_key, retry_after)
+            retry += 1
+            if not self.rate_limiter.should_retry(retry, wait):
+                return response
+            logging.warning(f"Rate limited by {self.base_url}, retrying in {wait:.2f}s (retry {retry})")
+    
+    async def place_order(self, session: aiohttp.ClientSession, order_details: Dict,
+                          payload: Optional[bytes] = None) -> Optional[Dict]:
+        """Place an order on the MatchTrader platform
+        
+        payload is the order already serialized to JSON (see order_templates);
+        when given it is sent as-is instead of serializing order_details.
+        """
         if not self.token:
             return None
             
         url = f"{self.base_url}/api/orders"
-        headers = {"Authorization": f"Bearer {self.token}"}
+        is_exit = order_details.get('action') in ('close', 'partial_close')
         
         try:
-            response = await session.post(url, json=order_details, headers=headers)
+            if payload is not None:
+                response = await self._send_order(session, url, is_exit=is_exit, data=payload,
+                                                  headers={"Content-Type": "application/json"})
+            else:
+                response = await self._send_order(session, url, is_exit=is_exit, json=order_details)
             if response.status == 200:
                 return await response.json()
             elif response.status == 401:
@@ -77,10 +164,9 @@ class MatchTraderClient:
             return None
             
         url = f"{self.base_url}/api/account/info"
-        headers = {"Authorization": f"Bearer {self.token}"}
         
         try:
-            response = await session.get(url, headers=headers)
+            response = await self._get_authorized(session, url)
             if response.status == 200:
                 return await response.json()
             return None
@@ -88,23 +174,23 @@ class MatchTraderClient:
             logging.error(f"Error getting account info: {e}")
             return None
     
-    async def get_positions(self, session: aiohttp.ClientSession) -> List[Dict]:
-        """Get open positions"""
+    async def get_positions(self, session: aiohttp.ClientSession) -> Optional[List[Dict]]:
+        """Get open positions; None when the book could not be fetched (not the same as no positions)"""
         if not self.token:
-            return []
+            return None
             
         url = f"{self.base_url}/api/positions"
-        headers = {"Authorization": f"Bearer {self.token}"}
         
         try:
-            response = await session.get(url, headers=headers)
+            response = await self._get_authorized(session, url)
             if response.status == 200:
                 data = await response.json()
                 return data.get('positions', [])
-            return []
+            logging.error(f"Getting positions from {self.base_url} failed: {response.status}")
+            return None
         except Exception as e:
             logging.error(f"Error getting positions: {e}")
-            return []
+            return None
     
     async def close_position(self, session: aiohttp.ClientSession, position_id: str) -> Optional[Dict]:
         """Close a specific position"""
@@ -112,10 +198,9 @@ class MatchTraderClient:
             return None
             
         url = f"{self.base_url}/api/positions/{position_id}/close"
-        headers = {"Authorization": f"Bearer {self.token}"}
         
         try:
-            response = await session.post(url, headers=headers)
+            response = await self._send_order(session, url, is_exit=True)
             if response.status == 200:
                 return await response.json()
             return None
@@ -127,8 +212,8 @@ class MatchTraderClient:
         """Check if client is authenticated"""
         return self.token is not None
     
-    def needs_refresh(self) -> bool:
-        """Check if token needs refresh"""
+    def needs_refresh(self, margin: float = 0.0) -> bool:
+        """Check if token needs refresh (or expires within `margin` seconds)"""
         if not self.token_expiry:
             return False
-        return datetime.now() >= self.token_expiry
+        return datetime.now() + timedelta(seconds=margin) >= self.token_expiry
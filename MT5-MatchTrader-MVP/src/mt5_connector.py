@@ -1,23 +1,34 @@
 import MetaTrader5 as mt5
 import logging
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 import asyncio
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional
+from .mt5_executor import get_mt5_executor
+from .columnar import positions_to_array, deals_to_array
+from .symbol_cache import SymbolCache
 
 class MT5Connector:
-    """Handles connection and operations with MetaTrader 5"""
+    """Handles connection and operations with MetaTrader 5
     
-    def __init__(self, config: Dict):
+    Every MetaTrader5 call runs on the shared MT5 I/O thread; the *_async
+    methods let the asyncio pipeline await terminal reads without blocking.
+    """
+    
+    def __init__(self, config: Dict, symbol_cache: Optional[SymbolCache] = None):
         self.login = config.get('login')
         self.password = config.get('password')
         self.server = config.get('server')
         self.max_retries = 3
         self.connected = False
+        # MT5 group= mask so the terminal only returns rows for copied symbols
+        self.symbol_group = config.get('symbol_group')
+        self.executor = get_mt5_executor()
+        self.symbol_cache = symbol_cache or SymbolCache()
         
     def initialize(self) -> bool:
         """Initialize MT5 terminal"""
         try:
-            return mt5.initialize()
+            return self.executor.call(mt5.initialize)
         except Exception as e:
             logging.error(f"Failed to initialize MT5: {e}")
             return False
@@ -28,7 +39,11 @@ class MT5Connector:
             return False
             
         try:
-            return mt5.login(self.login, self.password, self.server)
+            logged_in = self.executor.call(mt5.login, self.login, self.password, self.server)
+            if logged_in:
+                # A new terminal session may see different symbol specs
+                self.symbol_cache.invalidate()
+            return logged_in
         except Exception as e:
             logging.error(f"Failed to connect to MT5: {e}")
             return False
@@ -36,7 +51,7 @@ class MT5Connector:
     async def connect_with_retry(self) -> bool:
         """Connect with retry logic"""
         for attempt in range(self.max_retries):
-            if self.connect():
+            if await self.executor.call_async(self.connect):
                 self.connected = True
                 return True
             await asyncio.sleep(0.1)  # Small delay between retries
@@ -44,7 +59,7 @@ class MT5Connector:
     
     def get_account_info(self) -> Dict:
         """Get account information"""
-        info = mt5.account_info()
+        info = self.executor.call(mt5.account_info)
         if info:
             return {
                 'balance': info.balance,
@@ -55,9 +70,11 @@ class MT5Connector:
             }
         return {}
     
-    def get_positions(self) -> List[Dict]:
-        """Get all open positions"""
-        positions = mt5.positions_get()
+    def get_positions(self, columnar: bool = False):
+        """Get all open positions (a NumPy structured array when columnar=True)"""
+        positions = self.executor.call(self._positions_get)
+        if columnar:
+            return positions_to_array(positions or ())
         if positions is None:
             return []
             
@@ -73,62 +90,140 @@ class MT5Connector:
             'comment': pos.comment
         } for pos in positions]
     
+    def _positions_get(self):
+        """positions_get filtered by the symbol group mask when one is set"""
+        if self.symbol_group:
+            return mt5.positions_get(group=self.symbol_group)
+        return mt5.positions_get()
+    
+    def _orders_get(self):
+        """orders_get filtered by the symbol group mask when one is set"""
+        if self.symbol_group:
+            return mt5.orders_get(group=self.symbol_group)
+        return mt5.orders_get()
+    
+    def _history_deals_get(self, from_date: datetime, to_date: datetime):
+        """history_deals_get filtered by the symbol group mask when one is set"""
+        if self.symbol_group:
+            return mt5.history_deals_get(from_date, to_date, group=self.symbol_group)
+        return mt5.history_deals_get(from_date, to_date)
+    
     def get_position_type(self, position_type: int) -> str:
         """Convert MT5 position type to string"""
         return 'BUY' if position_type == 0 else 'SELL'
     
     def get_symbol_info(self, symbol: str) -> Optional[Dict]:
-        """Get symbol information"""
-        info = mt5.symbol_info(symbol)
-        if info:
-            return {
-                'bid': info.bid,
-                'ask': info.ask,
+        """Get symbol information (static fields and bid/ask served from the symbol cache)"""
+        spec = self.symbol_cache.get_spec(symbol)
+        if spec is None:
+            info = self.executor.call(mt5.symbol_info, symbol)
+            if not info:
+                return None
+            spec = {
                 'digits': info.digits,
-                'spread': info.spread,
+                'point': info.point,
+                'contract_size': info.trade_contract_size,
                 'volume_min': info.volume_min,
                 'volume_max': info.volume_max,
                 'volume_step': info.volume_step
             }
-        return None
+            tick = {'bid': info.bid, 'ask': info.ask, 'spread': info.spread}
+            self.symbol_cache.put_spec(symbol, spec)
+            self.symbol_cache.put_tick(symbol, tick)
+            return {**tick, **spec}
+        
+        tick = self.symbol_cache.get_tick(symbol)
+        if tick is None:
+            tick_info = self.executor.call(mt5.symbol_info_tick, symbol)
+            if not tick_info:
+                return None
+            tick = self._tick_to_dict(tick_info, spec)
+            self.symbol_cache.put_tick(symbol, tick)
+        return {**tick, **spec}
     
-    def get_position_history(self, from_date: datetime, to_date: datetime) -> List[Dict]:
-        """Get position history within date range"""
-        positions = mt5.history_deals_get(from_date, to_date)
-        if positions is None:
+    @staticmethod
+    def _tick_to_dict(tick_info, spec: Dict) -> Dict:
+        """Convert an MT5 tick to the cached bid/ask/spread fields"""
+        point = spec.get('point')
+        spread = round((tick_info.ask - tick_info.bid) / point) if point else None
+        return {'bid': tick_info.bid, 'ask': tick_info.ask, 'spread': spread}
+    
+    def get_position_history(self, from_date: datetime, to_date: datetime, columnar: bool = False):
+        """Get position history within date range (a NumPy structured array when columnar=True)"""
+        deals = self.executor.call(self._history_deals_get, from_date, to_date)
+        if columnar:
+            return deals_to_array(deals or ())
+        if deals is None:
             return []
-            
-        result = []
-        for pos in positions:
-            position_dict = {
-                'ticket': pos.ticket,
-                'symbol': getattr(pos, 'symbol', ''),
-                'volume': getattr(pos, 'volume', 0),
-                'profit': getattr(pos, 'profit', 0),
-            }
-            # Handle timestamps safely for mocked objects
-            if hasattr(pos, 'time') and pos.time is not None:
-                try:
-                    position_dict['time_open'] = datetime.fromtimestamp(pos.time)
-                except (TypeError, ValueError):
-                    position_dict['time_open'] = datetime.now()
-            else:
-                position_dict['time_open'] = datetime.now()
-                
-            if hasattr(pos, 'time_msc') and pos.time_msc is not None:
-                try:
-                    position_dict['time_close'] = datetime.fromtimestamp(pos.time_msc / 1000)
-                except (TypeError, ValueError):
-                    position_dict['time_close'] = datetime.now()
-            else:
-                position_dict['time_close'] = datetime.now()
-                
-            result.append(position_dict)
-        return result
+        return [self._deal_to_dict(deal) for deal in deals]
+    
+    def _deal_to_dict(self, deal) -> Dict:
+        """Convert an MT5 deal to a dict; unknown timestamps stay None instead of 'now'"""
+        return {
+            'ticket': deal.ticket,
+            'symbol': deal.symbol,
+            'volume': deal.volume,
+            'profit': deal.profit,
+            'time_msc': deal.time_msc,
+            'time_open': self._to_datetime(deal.time),
+            'time_close': self._to_datetime(deal.time_msc, 1000),
+        }
+    
+    @staticmethod
+    def _to_datetime(timestamp, divisor: int = 1) -> Optional[datetime]:
+        """Convert an MT5 epoch timestamp to datetime (None if missing or invalid)"""
+        try:
+            return datetime.fromtimestamp(timestamp / divisor)
+        except (TypeError, ValueError, OverflowError, OSError):
+            return None
+    
+    def history_cursor(self, start: datetime) -> 'DealHistoryCursor':
+        """Create an incremental deal-history cursor starting at the given time"""
+        return DealHistoryCursor(self, start)
     
     async def connect_async(self) -> bool:
         """Async version of connect for compatibility"""
-        return self.connect()
+        return await self.executor.call_async(self.connect)
+    
+    async def get_account_info_async(self) -> Dict:
+        """Async version of get_account_info"""
+        return await self.executor.call_async(self.get_account_info)
+    
+    async def get_positions_async(self, columnar: bool = False):
+        """Async version of get_positions"""
+        return await self.executor.call_async(self.get_positions, columnar)
+    
+    async def get_symbol_info_async(self, symbol: str) -> Optional[Dict]:
+        """Async version of get_symbol_info"""
+        return await self.executor.call_async(self.get_symbol_info, symbol)
+    
+    async def get_position_history_async(self, from_date: datetime, to_date: datetime, columnar: bool = False):
+        """Async version of get_position_history"""
+        return await self.executor.call_async(self.get_position_history, from_date, to_date, columnar)
+    
+    async def read_snapshot_async(self, symbols: Optional[List[str]] = None) -> Dict:
+        """Read positions, orders, account info and symbol ticks in one I/O-thread hop"""
+        symbols = symbols or []
+        calls = {
+            'positions': (self._positions_get, ()),
+            'orders': (self._orders_get, ()),
+            'account_info': (mt5.account_info, ()),
+        }
+        for symbol in symbols:
+            calls[f'tick:{symbol}'] = (mt5.symbol_info_tick, (symbol,))
+        
+        result = await self.executor.batch_async(calls)
+        for symbol in symbols:
+            tick_info = result[f'tick:{symbol}']
+            spec = self.symbol_cache.get_spec(symbol)
+            if tick_info and spec is not None:
+                self.symbol_cache.put_tick(symbol, self._tick_to_dict(tick_info, spec))
+        return {
+            'positions': result['positions'],
+            'orders': result['orders'],
+            'account_info': result['account_info'],
+            'ticks': {symbol: result[f'tick:{symbol}'] for symbol in symbols},
+        }
     
     async def monitor_positions(self):
         """Monitor MT5 positions (placeholder)"""
@@ -137,5 +232,69 @@ class MT5Connector:
         
     def shutdown(self):
         """Shutdown MT5 connection"""
-        mt5.shutdown()
+        self.executor.call(mt5.shutdown)
         self.connected = False
+
+
+class DealHistoryCursor:
+    """Incremental reader over MT5 deal history
+    
+    Keeps a (time_msc, ticket) watermark and only fetches deals after it, so
+    long-running consumers never re-read months of history. The watermark
+    advances as deals are yielded, so an abandoned generator resumes cleanly.
+    """
+    
+    # history_deals_get works in whole seconds and server time may run ahead of
+    # local time, so each fetch re-reads a small overlap and looks ahead
+    OVERLAP = timedelta(seconds=1)
+    LOOKAHEAD = timedelta(days=1)
+    
+    def __init__(self, connector: MT5Connector, start: datetime):
+        self.connector = connector
+        # MT5 reads naive datetimes as UTC, so the watermark is kept in UTC milliseconds
+        if start.tzinfo is None:
+            start = start.replace(tzinfo=timezone.utc)
+        self.watermark = (int(start.timestamp() * 1000), 0)
+        self.deals_read = 0
+    
+    def _fetch(self) -> List:
+        """Fetch raw deals after the watermark, oldest first"""
+        from_date = datetime.fromtimestamp(self.watermark[0] / 1000, tz=timezone.utc) - self.OVERLAP
+        to_date = datetime.now(timezone.utc) + self.LOOKAHEAD
+        deals = self.connector.executor.call(self.connector._history_deals_get, from_date, to_date)
+        if not deals:
+            return []
+        
+        new_deals = [deal for deal in deals if (deal.time_msc, deal.ticket) > self.watermark]
+        new_deals.sort(key=lambda deal: (deal.time_msc, deal.ticket))
+        return new_deals
+    
+    def fetch_new(self) -> Iterator[Dict]:
+        """Yield deals added since the last call as dicts"""
+        for deal in self._fetch():
+            self.watermark = (deal.time_msc, deal.ticket)
+            self.deals_read += 1
+            yield self.connector._deal_to_dict(deal)
+    
+    def fetch_chunks(self, chunk_size: int = 1000, columnar: bool = False) -> Iterator:
+        """Yield deals added since the last call in chunks of up to chunk_size
+        
+        Chunks are lists of dicts, or DEAL_DTYPE structured arrays when columnar=True.
+        """
+        if columnar:
+            deals = self._fetch()
+            for start in range(0, len(deals), chunk_size):
+                chunk = deals[start:start + chunk_size]
+                self.watermark = (chunk[-1].time_msc, chunk[-1].ticket)
+                self.deals_read += len(chunk)
+                yield deals_to_array(chunk)
+            return
+        
+        chunk = []
+        for deal in self.fetch_new():
+            chunk.append(deal)
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
@@ -0,0 +1,95 @@
+import json
+from typing import Dict, Optional
+
+from .symbol_mapper import SymbolMapper
+
+# Signal fields copied into every order body (volume is spliced in per destination)
+ORDER_FIELDS = ('action', 'type', 'sl', 'tp')
+
+# Fields a queued order keeps next to its payload: what routing and coalescing read
+LANE_FIELDS = ('action', 'sl', 'tp')
+
+# Follower orders carry the master ticket in their comment so books can be matched up
+COPY_TAG_PREFIX = 'mt5:'
+
+
+def copy_tag(ticket) -> str:
+    """Order comment tagging a copy of a master ticket"""
+    return f"{COPY_TAG_PREFIX}{ticket}"
+
+
+def parse_copy_tag(comment) -> Optional[int]:
+    """Master ticket from a copy tag comment, or None for untagged positions"""
+    if not comment or not comment.startswith(COPY_TAG_PREFIX):
+        return None
+    try:
+        return int(comment[len(COPY_TAG_PREFIX):])
+    except ValueError:
+        return None
+
+
+class OrderTemplate:
+    """Pre-serialized JSON order body with the volume left open"""
+
+    __slots__ = ('suffix',)
+
+    def __init__(self, fields: Dict):
+        body = json.dumps(fields, separators=(',', ':')).encode()
+        # '{"symbol":...}' -> ',"symbol":...}' so the volume can go in front
+        self.suffix = b',' + body[1:] if fields else b'}'
+
+    def render(self, volume: float, account_fields: bytes = b'') -> bytes:
+        """Splice the volume (and pre-serialized '"key":value,' account fields) into the body"""
+        return b'{' + account_fields + b'"volume":' + repr(float(volume)).encode() + self.suffix
+
+
+class CompiledSignal:
+    """A signal with its symbol and order fields resolved once, and one template per broker"""
+
+    def __init__(self, fields: Dict, broker_fields: Dict[str, Dict]):
+        self.fields = fields
+        self.broker_fields = broker_fields
+        self.templates: Dict[str, OrderTemplate] = {}
+
+    def order_details(self, broker: str, volume: float) -> Dict:
+        """Plain order dict for one destination, with the same fields as its payload"""
+        return dict(self.fields, **self.broker_fields.get(broker, {}), volume=float(volume))
+
+    def lane_order(self, volume: float) -> Dict:
+        """Small per-destination order queued with the payload (the full dict is only built without one)"""
+        order = {field: self.fields[field] for field in LANE_FIELDS if field in self.fields}
+        order['volume'] = float(volume)
+        return order
+
+    def template(self, broker: str) -> OrderTemplate:
+        """Template for a broker, serialized on first use"""
+        template = self.templates.get(broker)
+        if template is None:
+            template = self.templates[broker] = OrderTemplate(dict(self.fields, **self.broker_fields.get(broker, {})))
+        return template
+
+    def payload(self, broker: str, volume: float, account_fields: bytes = b'') -> bytes:
+        """Serialized order body for one destination"""
+        return self.template(broker).render(volume, account_fields)
+
+
+class SignalCompiler:
+    """Resolves symbol mapping and order fields once per signal"""
+
+    def __init__(self, symbol_mapper: SymbolMapper, broker_fields: Optional[Dict[str, Dict]] = None):
+        self.symbol_mapper = symbol_mapper
+        # Static extra order fields per broker, e.g. {base_url: {"comment": "copy"}}
+        self.broker_fields = broker_fields or {}
+
+    def compile(self, signal: Dict) -> Optional[CompiledSignal]:
+        """Compile a signal; None if its symbol is not copied"""
+        symbol = self.symbol_mapper.map_symbol(signal.get('symbol'))
+        if not symbol:
+            return None
+        fields = {'symbol': symbol}
+        for field in ORDER_FIELDS:
+            if field in signal:
+                fields[field] = signal[field]
+        if signal.get('ticket') is not None:
+            fields['comment'] = copy_tag(signal['ticket'])
+        return CompiledSignal(fields, self.broker_fields)
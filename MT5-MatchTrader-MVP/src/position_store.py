@@ -0,0 +1,117 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS copies (
+    master_ticket INTEGER NOT NULL,
+    account TEXT NOT NULL,
+    position_id TEXT NOT NULL,
+    opened_at REAL NOT NULL,
+    closed_at REAL,
+    PRIMARY KEY (master_ticket, account)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS copies_closed_at ON copies (closed_at) WHERE closed_at IS NOT NULL;
+"""
+
+
+class PositionStore:
+    """Persistent (master ticket, destination account) -> destination position id map
+
+    SQLite in WAL mode with a clustered primary key, so a lookup is a single
+    B-tree probe regardless of table size. The database is opened on first use.
+    """
+
+    def __init__(self, path: str, mmap_size: int = 256 * 1024 * 1024):
+        self.path = path
+        self.mmap_size = mmap_size
+        self.db: Optional[sqlite3.Connection] = None
+        self.lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self.db is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            db = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+            # auto_vacuum only takes effect before the first table is created
+            db.execute("PRAGMA auto_vacuum=INCREMENTAL")
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute(f"PRAGMA mmap_size={int(self.mmap_size)}")
+            db.executescript(SCHEMA)
+            self.db = db
+        return self.db
+
+    def record(self, master_ticket: int, account: str, position_id) -> bool:
+        """Record the destination position opened for a master ticket
+
+        A closed copy may be replaced, a still-open one never is: returns False
+        (and keeps the existing position id) when the ticket already has an
+        open copy on the account.
+        """
+        with self.lock:
+            inserted = self._connect().execute(
+                "INSERT INTO copies (master_ticket, account, position_id, opened_at, closed_at) "
+                "VALUES (?, ?, ?, ?, NULL) "
+                "ON CONFLICT (master_ticket, account) DO UPDATE SET "
+                "position_id = excluded.position_id, opened_at = excluded.opened_at, closed_at = NULL "
+                "WHERE closed_at IS NOT NULL",
+                (master_ticket, account, str(position_id), time.time())
+            ).rowcount
+        if not inserted:
+            logging.error(f"Ticket {master_ticket} already has an open copy on {account}; "
+                          f"not overwriting it with position {position_id}")
+        return bool(inserted)
+
+    def lookup(self, master_ticket: int, account: str) -> Optional[str]:
+        """Destination position id for a still-open copy, or None"""
+        with self.lock:
+            row = self._connect().execute(
+                "SELECT position_id FROM copies WHERE master_ticket = ? AND account = ? AND closed_at IS NULL",
+                (master_ticket, account)
+            ).fetchone()
+        return row[0] if row else None
+
+    def lookup_all(self, master_ticket: int) -> Dict[str, str]:
+        """All open copies of a master ticket, keyed by destination account"""
+        with self.lock:
+            rows = self._connect().execute(
+                "SELECT account, position_id FROM copies WHERE master_ticket = ? AND closed_at IS NULL",
+                (master_ticket,)
+            ).fetchall()
+        return dict(rows)
+
+    def mark_closed(self, master_ticket: int, account: str) -> None:
+        """Mark a copy closed (kept until the next compaction)"""
+        with self.lock:
+            self._connect().execute(
+                "UPDATE copies SET closed_at = ? WHERE master_ticket = ? AND account = ?",
+                (time.time(), master_ticket, account)
+            )
+
+    def compact(self, retention_seconds: float = 7 * 24 * 3600) -> int:
+        """Drop copies closed longer ago than the retention, then shrink the WAL and file"""
+        with self.lock:
+            db = self._connect()
+            deleted = db.execute(
+                "DELETE FROM copies WHERE closed_at IS NOT NULL AND closed_at < ?",
+                (time.time() - retention_seconds,)
+            ).rowcount
+            db.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            db.execute("PRAGMA incremental_vacuum")
+        return deleted
+
+    def count(self) -> int:
+        """Number of open copies"""
+        with self.lock:
+            return self._connect().execute("SELECT COUNT(*) FROM copies WHERE closed_at IS NULL").fetchone()[0]
+
+    def close(self):
+        with self.lock:
+            if self.db is not None:
+                self.db.close()
+                self.db = None
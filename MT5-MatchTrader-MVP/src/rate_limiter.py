@@ -0,0 +1,178 @@
+import asyncio
+import time
+from datetime import timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+
+
+def parse_retry_after(value, now: Optional[float] = None) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP-date), or None"""
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    now = time.time() if now is None else now
+    return max(0.0, when.timestamp() - now)
+
+
+class TokenBucket:
+    """Token bucket whose rate tightens on 429s and recovers on successes
+
+    acquire() reserves a token even when the bucket is empty (tokens go
+    negative), so waiters are served in arrival order without polling.
+    """
+
+    __slots__ = ('base_rate', 'rate', 'capacity', 'tokens', 'updated', 'paused_until',
+                 'throttled_seconds', 'waits', 'rejections')
+
+    def __init__(self, rate: float, capacity: float):
+        self.base_rate = rate
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.throttled_seconds = 0.0
+        self.waits = 0
+        self.rejections = 0
+
+    def reserve(self, now: float) -> float:
+        """Take a token; returns how long the caller must wait before using it"""
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+        wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        return max(wait, self.paused_until - now)
+
+    def take(self, now: float) -> float:
+        """Take a token without queueing behind the rate (exits); only a server pause is waited out
+
+        The debt is capped at one burst so a flatten cannot starve later orders for long.
+        """
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens = max(-self.capacity, self.tokens - 1)
+        return max(0.0, self.paused_until - now)
+
+    def throttle(self, now: float, retry_after: Optional[float], decrease: float, min_rate: float) -> float:
+        """The server said slow down: cut the rate and pause; returns the pause"""
+        self.rejections += 1
+        self.rate = max(min_rate, self.rate * decrease)
+        # Drain the burst so the next requests go out at the reduced rate
+        self.tokens = min(self.tokens, 0.0)
+        pause = retry_after if retry_after is not None else 1.0 / self.rate
+        self.paused_until = max(self.paused_until, now + pause)
+        return pause
+
+    def recover(self, increase: float):
+        self.rate = min(self.base_rate, self.rate + self.base_rate * increase)
+
+
+class RateLimiter:
+    """Shared async rate limiter with one bucket per broker and one per account
+
+    A request waits for a token from its broker's bucket and its account's
+    bucket. A 429 halves both rates (down to min_rate_fraction of the
+    configured rate) and pauses the broker for Retry-After; every success wins
+    back `increase` of the configured rate.
+
+    With exit_priority, closes do not queue behind the rate: they use up tokens
+    (so opens slow down after them) but only wait while a broker is paused, so
+    an emergency flatten is not stretched out to the order rate.
+    """
+
+    def __init__(self, broker_rate: float = 20.0, broker_burst: float = 40.0,
+                 account_rate: float = 5.0, account_burst: float = 10.0,
+                 broker_limits: Optional[Dict[str, Dict]] = None,
+                 max_wait: float = 30.0, max_retries: int = 3,
+                 decrease: float = 0.5, increase: float = 0.05, min_rate_fraction: float = 0.1,
+                 exit_priority: bool = True):
+        self.broker_rate = broker_rate
+        self.broker_burst = broker_burst
+        self.account_rate = account_rate
+        self.account_burst = account_burst
+        # Per-broker overrides keyed by base_url: {"rate": ..., "burst": ..., "account_rate": ..., "account_burst": ...}
+        self.broker_limits = broker_limits or {}
+        self.max_wait = max_wait
+        self.max_retries = max_retries
+        self.decrease = decrease
+        self.increase = increase
+        self.min_rate_fraction = min_rate_fraction
+        self.exit_priority = exit_priority
+        self.brokers: Dict[str, TokenBucket] = {}
+        self.accounts: Dict[str, TokenBucket] = {}
+
+    def _buckets(self, broker: str, account: str):
+        limits = self.broker_limits.get(broker, {})
+        broker_bucket = self.brokers.get(broker)
+        if broker_bucket is None:
+            broker_bucket = self.brokers[broker] = TokenBucket(
+                limits.get('rate', self.broker_rate), limits.get('burst', self.broker_burst))
+        account_bucket = self.accounts.get(account)
+        if account_bucket is None:
+            account_bucket = self.accounts[account] = TokenBucket(
+                limits.get('account_rate', self.account_rate), limits.get('account_burst', self.account_burst))
+        return broker_bucket, account_bucket
+
+    async def acquire(self, broker: str, account: str, is_exit: bool = False) -> float:
+        """Wait until both buckets allow a request; returns the time spent waiting
+
+        is_exit marks a close, which skips the rate queue when exit_priority is set.
+        """
+        buckets = self._buckets(broker, account)
+        now = time.monotonic()
+        if is_exit and self.exit_priority:
+            wait = max(bucket.take(now) for bucket in buckets)
+        else:
+            wait = max(bucket.reserve(now) for bucket in buckets)
+        total = 0.0
+        while wait > 0:
+            for bucket in buckets:
+                bucket.waits += 1
+                bucket.throttled_seconds += wait
+            await asyncio.sleep(wait)
+            total += wait
+            # A 429 seen while sleeping pauses the broker; do not fire into that pause
+            wait = max(bucket.paused_until for bucket in buckets) - time.monotonic()
+        return total
+
+    def on_throttled(self, broker: str, account: str, retry_after: Optional[float] = None) -> float:
+        """Record a 429; returns how long the next request will be held back"""
+        broker_bucket, account_bucket = self._buckets(broker, account)
+        now = time.monotonic()
+        pause = broker_bucket.throttle(now, retry_after, self.decrease,
+                                       broker_bucket.base_rate * self.min_rate_fraction)
+        account_bucket.throttle(now, None, self.decrease, account_bucket.base_rate * self.min_rate_fraction)
+        return pause
+
+    def on_success(self, broker: str, account: str):
+        broker_bucket, account_bucket = self._buckets(broker, account)
+        broker_bucket.recover(self.increase)
+        account_bucket.recover(self.increase)
+
+    def should_retry(self, retry: int, wait: float) -> bool:
+        """Whether a throttled request is queued for its `retry`-th retry after `wait` seconds"""
+        return retry <= self.max_retries and wait <= self.max_wait
+
+    def get_stats(self) -> Dict:
+        """Current rates, 429 counts and throttled time per broker and account"""
+        def describe(bucket: TokenBucket) -> Dict:
+            return {
+                'rate': bucket.rate,
+                'configured_rate': bucket.base_rate,
+                'throttled_seconds': bucket.throttled_seconds,
+                'waits': bucket.waits,
+                'rejections': bucket.rejections,
+            }
+        return {
+            'brokers': {key: describe(bucket) for key, bucket in self.brokers.items()},
+            'accounts': {key: describe(bucket) for key, bucket in self.accounts.items()},
+        }
@@ -0,0 +1,109 @@
+import asyncio
+import logging
+import time
+from typing import Dict, List, Optional
+
+from .order_templates import parse_copy_tag
+
+MISSING_OPEN = 'missing_open'
+STALE_POSITION = 'stale_position'
+VOLUME_MISMATCH = 'volume_mismatch'
+
+
+class Reconciler:
+    """Diffs follower books against the MT5 master snapshot
+
+    Follower positions are matched to master tickets through the copy tag in
+    their comment; untagged (manual) positions are left alone. The result is a
+    list of repair actions, one dict per discrepancy.
+    """
+
+    def __init__(self, concurrency: int = 64, volume_tolerance: float = 1e-6):
+        self.concurrency = concurrency
+        self.volume_tolerance = volume_tolerance
+        self.last_duration = 0.0
+        self.last_actions = 0
+        self.skipped = 0
+
+    async def fetch_followers(self, session, clients: Dict[str, object]) -> Dict[str, List[Dict]]:
+        """Fetch open positions for every account concurrently, at most `concurrency` at a time
+
+        Accounts whose book could not be fetched are left out for this cycle:
+        diffing them as empty would report every master ticket as missing.
+        """
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def fetch(client):
+            async with semaphore:
+                return await client.get_positions(session)
+
+        accounts = list(clients)
+        results = await asyncio.gather(*[fetch(clients[account]) for account in accounts], return_exceptions=True)
+        books = {}
+        for account, result in zip(accounts, results):
+            if isinstance(result, Exception) or result is None:
+                self.skipped += 1
+                reason = result if result is not None else 'fetch failed'
+                logging.error(f"Reconciler could not fetch positions for {account} ({reason}), skipping it this cycle")
+                continue
+            books[account] = result
+        return books
+
+    def diff(self, master: Dict[int, Dict], expected: Dict[str, Dict[int, float]],
+             books: Dict[str, List[Dict]]) -> List[Dict]:
+        """Repair actions for every account whose book differs from the master
+
+        master: master ticket -> master position (with the follower symbol)
+        expected: account -> master ticket -> expected follower volume
+        books: account -> follower positions
+        """
+        actions = []
+        tolerance = self.volume_tolerance
+        for account, positions in books.items():
+            copies = {}
+            for position in positions:
+                ticket = parse_copy_tag(position.get('comment'))
+                if ticket is not None:
+                    copies[ticket] = position
+            volumes = expected.get(account, {})
+
+            for ticket, master_position in master.items():
+                copy = copies.get(ticket)
+                expected_volume = volumes.get(ticket, master_position['volume'])
+                if copy is None:
+                    actions.append({
+                        'action': MISSING_OPEN, 'account': account, 'ticket': ticket,
+                        'symbol': master_position['symbol'], 'type': master_position.get('type'),
+                        'expected_volume': expected_volume,
+                    })
+                elif abs(copy.get('volume', 0.0) - expected_volume) > tolerance:
+                    actions.append({
+                        'action': VOLUME_MISMATCH, 'account': account, 'ticket': ticket,
+                        'position_id': copy.get('id'), 'symbol': copy.get('symbol'),
+                        'expected_volume': expected_volume, 'actual_volume': copy.get('volume'),
+                    })
+
+            for ticket, copy in copies.items():
+                if ticket not in master:
+                    actions.append({
+                        'action': STALE_POSITION, 'account': account, 'ticket': ticket,
+                        'position_id': copy.get('id'), 'symbol': copy.get('symbol'),
+                        'actual_volume': copy.get('volume'),
+                    })
+        return actions
+
+    async def reconcile(self, session, master: Dict[int, Dict], expected: Dict[str, Dict[int, float]],
+                        clients: Dict[str, object]) -> List[Dict]:
+        """Fetch all follower books and diff them against the master snapshot"""
+        started = time.perf_counter()
+        self.skipped = 0
+        books = await self.fetch_followers(session, clients)
+        actions = self.diff(master, expected, books)
+        self.last_duration = time.perf_counter() - started
+        self.last_actions = len(actions)
+        return actions
+
+    def get_stats(self) -> Dict:
+        """Get duration, action count and accounts skipped in the last run"""
+        return {'last_duration_ms': self.last_duration * 1000, 'last_actions': self.last_actions,
+                'last_skipped_accounts': self.skipped}
@@ -0,0 +1,178 @@
+import asyncio
+import logging
+import ssl
+import time
+from typing import Dict, Iterable, Optional
+from urllib.parse import urlsplit
+
+import aiohttp
+
+
+def host_key(url: str) -> str:
+    """scheme://host[:port] of a URL"""
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+class HostStats:
+    """Request and connection counters for one broker host, fed by aiohttp tracing"""
+
+    __slots__ = ('requests', 'in_flight', 'max_in_flight', 'queued', 'queued_total', 'queue_wait',
+                 'created', 'reused', 'dns_hits', 'dns_misses')
+
+    def __init__(self):
+        self.requests = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.queued = 0
+        self.queued_total = 0
+        self.queue_wait = 0.0
+        self.created = 0
+        self.reused = 0
+        self.dns_hits = 0
+        self.dns_misses = 0
+
+    def trace_config(self) -> aiohttp.TraceConfig:
+        trace = aiohttp.TraceConfig()
+
+        async def on_request_start(session, ctx, params):
+            self.requests += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+        async def on_request_done(session, ctx, params):
+            self.in_flight -= 1
+
+        async def on_queued_start(session, ctx, params):
+            # Every connection slot for the host is busy; the request waits
+            ctx.queued_at = time.perf_counter()
+            self.queued += 1
+            self.queued_total += 1
+
+        async def on_queued_end(session, ctx, params):
+            self.queued -= 1
+            self.queue_wait += time.perf_counter() - ctx.queued_at
+
+        async def on_created(session, ctx, params):
+            self.created += 1
+
+        async def on_reused(session, ctx, params):
+            self.reused += 1
+
+        async def on_dns_hit(session, ctx, params):
+            self.dns_hits += 1
+
+        async def on_dns_miss(session, ctx, params):
+            self.dns_misses += 1
+
+        trace.on_request_start.append(on_request_start)
+        trace.on_request_end.append(on_request_done)
+        trace.on_request_exception.append(on_request_done)
+        trace.on_connection_queued_start.append(on_queued_start)
+        trace.on_connection_queued_end.append(on_queued_end)
+        trace.on_connection_create_end.append(on_created)
+        trace.on_connection_reuseconn.append(on_reused)
+        trace.on_dns_cache_hit.append(on_dns_hit)
+        trace.on_dns_cache_miss.append(on_dns_miss)
+        return trace
+
+
+class SessionPool:
+    """One tuned aiohttp session per broker host, used like a single ClientSession
+
+    Requests are routed to the session of their URL's host, so accounts on the
+    same prop firm share warm keep-alive connections while each host gets its
+    own connection limit. All connectors share one SSL context and cache DNS.
+    """
+
+    def __init__(self, limit_per_host: int = 100, keepalive_timeout: float = 75.0, dns_ttl: int = 300,
+                 timeout: float = 30.0, host_limits: Optional[Dict[str, int]] = None):
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.dns_ttl = dns_ttl
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        # Per-host overrides of limit_per_host, keyed by scheme://host
+        self.host_limits = {host_key(url): limit for url, limit in (host_limits or {}).items()}
+        self.ssl_context = ssl.create_default_context()
+        self.sessions: Dict[str, aiohttp.ClientSession] = {}
+        self.stats: Dict[str, HostStats] = {}
+
+    def session_for(self, url: str) -> aiohttp.ClientSession:
+        """Session for the URL's host, created on first use (needs a running loop)"""
+        key = host_key(url)
+        session = self.sessions.get(key)
+        if session is None or session.closed:
+            limit = self.host_limits.get(key, self.limit_per_host)
+            connector = aiohttp.TCPConnector(
+                limit=limit,
+                limit_per_host=limit,
+                keepalive_timeout=self.keepalive_timeout,
+                use_dns_cache=True,
+                ttl_dns_cache=self.dns_ttl,
+                ssl=self.ssl_context
+            )
+            stats = self.stats.setdefault(key, HostStats())
+            session = aiohttp.ClientSession(connector=connector, timeout=self.timeout,
+                                            trace_configs=[stats.trace_config()])
+            self.sessions[key] = session
+        return session
+
+    def request(self, method: str, url: str, **kwargs):
+        return self.session_for(url).request(method, url, **kwargs)
+
+    def get(self, url: str, **kwargs):
+        return self.session_for(url).get(url, **kwargs)
+
+    def post(self, url: str, **kwargs):
+        return self.session_for(url).post(url, **kwargs)
+
+    def put(self, url: str, **kwargs):
+        return self.session_for(url).put(url, **kwargs)
+
+    def delete(self, url: str, **kwargs):
+        return self.session_for(url).delete(url, **kwargs)
+
+    async def prewarm(self, urls: Iterable[str], connections: int = 2):
+        """Open `connections` keep-alive connections per host (DNS, TCP and TLS done up front)"""
+        hosts = {host_key(url) for url in urls}
+
+        async def touch(host):
+            try:
+                async with self.session_for(host).options(host, allow_redirects=False) as response:
+                    await response.release()
+            except Exception as e:
+                logging.warning(f"Could not pre-warm connection to {host}: {e}")
+
+        await asyncio.gather(*[touch(host) for host in hosts for _ in range(connections)])
+
+    def get_stats(self) -> Dict[str, Dict]:
+        """Pool occupancy and connection reuse per host"""
+        stats = {}
+        for key, host in self.stats.items():
+            session = self.sessions.get(key)
+            limit = session.connector.limit_per_host if session is not None and not session.closed else 0
+            stats[key] = {
+                'limit': limit,
+                'in_flight': host.in_flight,
+                'max_in_flight': host.max_in_flight,
+                'occupancy': host.in_flight / limit if limit else 0.0,
+                'queued': host.queued,
+                'queued_total': host.queued_total,
+                'avg_queue_wait_ms': host.queue_wait / host.queued_total * 1000 if host.queued_total else 0.0,
+                'requests': host.requests,
+                'connections_created': host.created,
+                'connections_reused': host.reused,
+                'dns_cache_hits': host.dns_hits,
+                'dns_cache_misses': host.dns_misses,
+            }
+        return stats
+
+    async def close(self):
+        await asyncio.gather(*[session.close() for session in self.sessions.values()])
+        self.sessions.clear()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
@@ -0,0 +1,74 @@
+import threading
+import time
+from typing import Dict, Optional
+
+
+class SymbolCache:
+    """Shared cache for MT5 symbol specifications and ticks
+
+    Static contract fields (digits, steps, contract size) change rarely and use
+    a long TTL; bid/ask use a short TTL and can also be pushed in directly from
+    batched snapshot reads. Everything is dropped when the terminal reconnects.
+    """
+
+    def __init__(self, spec_ttl: float = 3600.0, tick_ttl: float = 0.25):
+        self.spec_ttl = spec_ttl
+        self.tick_ttl = tick_ttl
+        self.specs: Dict[str, tuple] = {}  # symbol -> (expires_at, spec)
+        self.ticks: Dict[str, tuple] = {}  # symbol -> (expires_at, tick)
+        self.lock = threading.Lock()
+        self.spec_hits = 0
+        self.spec_misses = 0
+        self.tick_hits = 0
+        self.tick_misses = 0
+
+    def get_spec(self, symbol: str) -> Optional[Dict]:
+        """Get cached static symbol fields, or None if missing or expired"""
+        with self.lock:
+            entry = self.specs.get(symbol)
+            if entry is not None and entry[0] > time.monotonic():
+                self.spec_hits += 1
+                return entry[1]
+            self.spec_misses += 1
+            return None
+
+    def put_spec(self, symbol: str, spec: Dict):
+        """Store static symbol fields"""
+        with self.lock:
+            self.specs[symbol] = (time.monotonic() + self.spec_ttl, spec)
+
+    def get_tick(self, symbol: str) -> Optional[Dict]:
+        """Get the cached bid/ask, or None if missing or expired"""
+        with self.lock:
+            entry = self.ticks.get(symbol)
+            if entry is not None and entry[0] > time.monotonic():
+                self.tick_hits += 1
+                return entry[1]
+            self.tick_misses += 1
+            return None
+
+    def put_tick(self, symbol: str, tick: Dict):
+        """Store a bid/ask quote (from a symbol_info_tick read or a pushed update)"""
+        with self.lock:
+            self.ticks[symbol] = (time.monotonic() + self.tick_ttl, tick)
+
+    def invalidate(self, symbol: Optional[str] = None):
+        """Drop one symbol, or everything (e.g. after a terminal reconnect)"""
+        with self.lock:
+            if symbol is None:
+                self.specs.clear()
+                self.ticks.clear()
+            else:
+                self.specs.pop(symbol, None)
+                self.ticks.pop(symbol, None)
+
+    def get_stats(self) -> Dict:
+        """Get hit/miss counters"""
+        with self.lock:
+            return {
+                'spec_hits': self.spec_hits,
+                'spec_misses': self.spec_misses,
+                'tick_hits': self.tick_hits,
+                'tick_misses': self.tick_misses,
+                'cached_symbols': len(self.specs),
+            }
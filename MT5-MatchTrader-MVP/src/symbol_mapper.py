@@ -12,3 +12,14 @@ class SymbolMapper:
     def map_symbol(self, mt5_symbol):
         """Map MT5 symbol to MatchTrader symbol"""
         return self.mapping.get(mt5_symbol, mt5_symbol)
+
+    def build_group_mask(self, allowed_symbols):
+        """Compile allowed symbols and mapping keys into an MT5 group= mask (None = no filter)"""
+        if not allowed_symbols:
+            return None
+
+        patterns = {f"{symbol}*" for symbol in allowed_symbols}
+        for mt5_symbol, mapped_symbol in self.mapping.items():
+            if mapped_symbol in allowed_symbols:
+                patterns.add(f"{mt5_symbol.split('.')[0]}*")
+        return ",".join(sorted(patterns))
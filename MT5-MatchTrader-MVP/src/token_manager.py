@@ -0,0 +1,64 @@
+import asyncio
+import logging
+from typing import Dict, List, Optional
+
+
+class TokenManager:
+    """Refreshes account tokens in the background before they expire
+
+    Orders never wait for a login: tokens are renewed `refresh_margin` seconds
+    ahead of expiry, and accounts whose login failed are retried on every
+    check. Refreshes go through MatchTraderClient.refresh_token, which is
+    single-flight, so a 401 replay racing a background refresh shares one login.
+    """
+
+    def __init__(self, refresh_margin: float = 300.0, check_interval: float = 30.0):
+        self.refresh_margin = refresh_margin
+        self.check_interval = check_interval
+        self.task: Optional[asyncio.Task] = None
+        self.refreshes = 0
+        self.failures = 0
+
+    async def refresh_due(self, session, clients: List) -> int:
+        """Refresh every token that expires within the margin; returns how many failed"""
+        due = [client for client in clients
+               if not client.is_authenticated() or client.needs_refresh(self.refresh_margin)]
+        if not due:
+            return 0
+        results = await asyncio.gather(*[client.refresh_token(session) for client in due], return_exceptions=True)
+        failed = 0
+        for client, result in zip(due, results):
+            if result is True:
+                self.refreshes += 1
+            else:
+                failed += 1
+                logging.error(f"Background token refresh failed for {client.base_url} ({client.username}): {result}")
+        self.failures += failed
+        return failed
+
+    async def run(self, session, clients: List):
+        while True:
+            try:
+                await self.refresh_due(session, clients)
+            except Exception as e:
+                logging.error(f"Token refresh check failed: {e}")
+            await asyncio.sleep(self.check_interval)
+
+    def start(self, session, clients: List) -> asyncio.Task:
+        """Run the refresh loop as a background task"""
+        if self.task is None or self.task.done():
+            self.task = asyncio.create_task(self.run(session, clients))
+        return self.task
+
+    async def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+    def get_stats(self) -> Dict:
+        """Get refresh and failure counts"""
+        return {'refreshes': self.refreshes, 'failures': self.failures, 'running': bool(self.task and not self.task.done())}
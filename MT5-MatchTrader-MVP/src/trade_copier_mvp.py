@@ -8,16 +8,36 @@ from aiohttp import ClientSession
 from .mt5_connector import MT5Connector
 from .matchtrade_client import MatchTraderClient
 from .symbol_mapper import SymbolMapper
+from .symbol_cache import SymbolCache
+from .dispatch_lanes import DispatchLanes
+from .lot_sizing import LotSizer
+from .order_templates import SignalCompiler
+from .position_store import PositionStore
+from .intent_journal import IntentJournal
+from .reconciler import Reconciler
+from .flatten import Flattener
+from .session_pool import SessionPool
+from .token_manager import TokenManager
+from .rate_limiter import RateLimiter
+from .concurrency_limiter import ConcurrencyLimiter
 
 class TradeCopierMVP:
     def __init__(self, config_path):
         self.config_path = config_path
         self.symbol_mapper = SymbolMapper()
+        # Shared by everything in the copier that needs symbol specs or quotes
+        self.symbol_cache = SymbolCache()
         self.match_trader_clients = []
         self.load_config()
         # Initialize MT5Connector after config is loaded
         mt5_config = self.config.get('mt5_accounts', [{}])[0] if self.config.get('mt5_accounts') else {}
-        self.mt5_connector = MT5Connector(mt5_config)
+        allowed_symbols = self.config.get('trade_settings', {}).get('allowed_symbols')
+        mt5_config = dict(mt5_config, symbol_group=self.symbol_mapper.build_group_mask(allowed_symbols))
+        self.mt5_connector = MT5Connector(mt5_config, symbol_cache=self.symbol_cache)
+        # One ordered lane per destination account (or account+ticket)
+        self.dispatch_lanes = DispatchLanes(
+            partition=self.config.get('trade_settings', {}).get('dispatch_partition', 'account')
+        )
         
         # Initialize MatchTrader clients from config
         broker_urls = {
@@ -26,6 +46,83 @@ class TradeCopierMVP:
             "ftmo": "https://platform.ftmo.com"
         }
         
+        # Optional persistent ticket -> destination position map (opened on first use)
+        store_path = self.config.get('position_store')
+        self.position_store = PositionStore(store_path) if store_path else None
+        # Optional write-ahead journal of copy intents (writer starts on first use)
+        journal_config = self.config.get('journal')
+        self.journal = None
+        if journal_config:
+            self.journal = IntentJournal(
+                journal_config['path'],
+                commit_window_ms=journal_config.get('commit_window_ms', 2.0),
+                fsync=journal_config.get('fsync', 'group')
+            )
+        
+        # One tuned HTTP session per broker host, shared by every account on that host
+        pool_config = self.config.get('http_pool', {})
+        self.session_pool = SessionPool(
+            limit_per_host=pool_config.get('limit_per_host', 100),
+            keepalive_timeout=pool_config.get('keepalive_timeout', 75.0),
+            dns_ttl=pool_config.get('dns_ttl', 300),
+            host_limits=pool_config.get('host_limits')
+        )
+        self.prewarm_connections = pool_config.get('prewarm_connections', 0)
+        
+        token_config = self.config.get('token_refresh', {})
+        self.token_manager = TokenManager(
+            refresh_margin=token_config.get('margin_seconds', 300),
+            check_interval=token_config.get('check_interval_seconds', 30)
+        )
+        
+        self.reconciler = Reconciler()
+        flatten_config = self.config.get('flatten', {})
+        self.flattener = Flattener(
+            concurrency=flatten_config.get('concurrency', 200),
+            per_account_concurrency=flatten_config.get('per_account_concurrency', 20),
+            max_attempts=flatten_config.get('max_attempts', 3),
+            circuit_threshold=flatten_config.get('circuit_threshold', 5)
+        )
+        
+        trade_settings = self.config.get('trade_settings', {})
+        self.lot_sizer = LotSizer(
+            mode=trade_settings.get('lot_size_mode', 'proportional'),
+            multiplier=trade_settings.get('lot_multiplier', 1.0),
+            max_lot=trade_settings.get('max_lot_size', 10.0),
+            min_lot=trade_settings.get('min_lot_size', 0.01)
+        )
+        volume_steps = trade_settings.get('volume_steps', {})
+        self.equity_refresh_seconds = trade_settings.get('equity_refresh_seconds', 60)
+        
+        # One limiter shared by all clients: a bucket per broker and one per account
+        rate_config = self.config.get('rate_limits', {})
+        self.rate_limiter = RateLimiter(
+            broker_rate=rate_config.get('broker_rate', 20.0),
+            broker_burst=rate_config.get('broker_burst', 40.0),
+            account_rate=rate_config.get('account_rate', 5.0),
+            account_burst=rate_config.get('account_burst', 10.0),
+            broker_limits={
+                broker_urls.get(name, "https://default.broker.com"): limits
+                for name, limits in rate_config.get('brokers', {}).items()
+            },
+            max_wait=rate_config.get('max_wait_seconds', 30.0),
+            max_retries=rate_config.get('max_retries', 3),
+            exit_priority=rate_config.get('exit_priority', True)
+        )
+        # Adaptive in-flight limit per broker, tuned from measured latency and errors
+        concurrency_config = self.config.get('concurrency', {})
+        self.concurrency_limiter = ConcurrencyLimiter(
+            initial_limit=concurrency_config.get('initial_limit', 20),
+            min_limit=concurrency_config.get('min_limit', 2),
+            max_limit=concurrency_config.get('max_limit', 200)
+        )
+        
+        # Static extra order fields per broker, serialized once into that broker's templates
+        self.signal_compiler = SignalCompiler(self.symbol_mapper, {
+            broker_urls.get(name, "https://default.broker.com"): fields
+            for name, fields in trade_settings.get('broker_order_fields', {}).items()
+        })
+        
         for account in self.config.get('matchtrade_accounts', []):
             broker_name = account.get('broker_name')
             base_url = broker_urls.get(broker_name, "https://default.broker.com")
@@ -33,9 +130,16 @@ class TradeCopierMVP:
                 base_url=base_url,
                 username=account.get('username'),
                 password=account.get('password'),
-                account_number=account.get('account_number')
+                account_number=account.get('account_number'),
+                rate_limiter=self.rate_limiter,
+                concurrency_limiter=self.concurrency_limiter
             )
             self.match_trader_clients.append(client)
+            self.lot_sizer.add_accounts(
+                [self.lane_account(client)],
+                steps=[volume_steps.get(broker_name, 0.01)],
+                multipliers=[account.get('lot_multiplier', 1.0)]
+            )
 
     async def test_mt5_connection(self):
         """Simulated test of MT5 connection"""
@@ -71,12 +175,41 @@ class TradeCopierMVP:
             raise
 
     async def start_copying(self):
-        async with aiohttp.ClientSession() as session:
+        async with self.session_pool as session:
+            if self.prewarm_connections:
+                await session.prewarm([client.base_url for client in self.match_trader_clients],
+                                      self.prewarm_connections)
             await self.authenticate_all_accounts(session)
-            await self.monitor_mt5_positions()
+            # Tokens are renewed ahead of expiry so orders never wait for a login
+            self.token_manager.start(session, self.match_trader_clients)
+            tasks = []
+            if self.lot_sizer.mode == 'equity_based':
+                # Equity must be known before the first signal (or replayed intent) is sized,
+                # and the master equity needs the terminal session
+                await self.mt5_connector.connect_async()
+                await self.refresh_equity(session)
+                tasks.append(asyncio.create_task(self.run_equity_refresher(session, self.equity_refresh_seconds)))
+            await self.replay_journal(session)
+            reconcile_interval = self.config.get('reconcile_interval_seconds')
+            if reconcile_interval:
+                tasks.append(asyncio.create_task(self.run_reconciler(session, reconcile_interval)))
+            stats_interval = self.config.get('stats_log_interval_seconds', 60)
+            if stats_interval:
+                tasks.append(asyncio.create_task(self.run_stats_logger(stats_interval)))
+            try:
+                await self.monitor_mt5_positions()
+            finally:
+                for task in tasks:
+                    task.cancel()
+                await self.token_manager.stop()
             
     async def stop_copying(self):
-        pass  # Implement stop logic
+        await self.dispatch_lanes.close()
+        # Both block (store lock, journal writer join and fsync), so run them off the event loop
+        if self.position_store is not None:
+            await asyncio.to_thread(self.position_store.close)
+        if self.journal is not None:
+            await asyncio.to_thread(self.journal.stop)
 
     async def authenticate_all_accounts(self, session) -> bool:
         results = await asyncio.gather(*[client.authenticate(session) for client in self.match_trader_clients])
@@ -90,43 +223,260 @@ class TradeCopierMVP:
         if not session:
             return None
         
-        tasks = []
-        for client in clients:
-            mapped_symbol = self.symbol_mapper.map_symbol(signal.get('symbol'))
-            if mapped_symbol:
-                order_details = {
-                    'symbol': mapped_symbol,
-                    'volume': signal['volume'],
-                    'type': signal['type']
-                }
-                tasks.append(client.place_order(session, order_details))
-        
-        if not tasks:
+        # Symbol, side and SL/TP are resolved once; per destination only the volume is spliced in
+        compiled = self.signal_compiler.compile(signal)
+        if compiled is None:
+            return None
+        volumes = self.size_volumes(signal, clients)
+        
+        # Intents for all destinations are made durable together (one group commit)
+        intent_ids = [None] * len(clients)
+        if self.journal is not None:
+            intent_ids = await asyncio.gather(*[
+                self.journal.intent(self.lane_account(client), signal) for client in clients
+            ])
+        
+        # Queue on every lane before awaiting, so per-lane order follows signal order.
+        # Each lane gets its own order dict, since pending orders may be coalesced in place.
+        futures = []
+        for client, volume, intent_id in zip(clients, volumes, intent_ids):
+            key = self.dispatch_lanes.lane_key(self.lane_account(client), signal)
+            future = await self.dispatch_lanes.submit(
+                key,
+                lambda order, payload, client=client: self.send_order(
+                    session, client, compiled, signal.get('ticket'), order, payload),
+                compiled.lane_order(volume),
+                action=signal.get('action'),
+                ticket=signal.get('ticket'),
+                payload=compiled.payload(client.base_url, volume),
+            )
+            if intent_id is not None:
+                future.add_done_callback(lambda done, intent_id=intent_id: self._ack_intent(intent_id, done))
+            futures.append(future)
+        
+        if not futures:
             return None
             
-        results = await asyncio.gather(*tasks)
+        results = await asyncio.gather(*futures)
         return results
 
+    def _ack_intent(self, intent_id, done):
+        # Cancelled sends (shutdown) stay unacked and are replayed on the next start
+        if done.cancelled():
+            return
+        self.journal.ack(intent_id, ok=done.exception() is None and done.result() is not None)
+
+    async def replay_journal(self, session) -> int:
+        """Re-drive copy intents that were journaled but never acknowledged"""
+        if self.journal is None:
+            return 0
+        clients = {self.lane_account(client): client for client in self.match_trader_clients}
+        replayed = 0
+        # Compact before the writer starts: drops acked history and any torn last line
+        for record in self.journal.compact():
+            client = clients.get(record['account'])
+            signal = record['signal']
+            ticket = signal.get('ticket')
+            already_copied = (
+                self.position_store is not None and ticket is not None
+                and signal.get('action', 'open') == 'open'
+                and await asyncio.to_thread(self.position_store.lookup, ticket, record['account']) is not None
+            )
+            if client is None:
+                logging.warning(f"Dropping journaled intent {record['id']} for unknown account {record['account']}")
+            elif not already_copied:
+                await self.replicate_trade(signal, [client], session=session)
+                replayed += 1
+            self.journal.ack(record['id'], ok=client is not None)
+        if replayed:
+            logging.info(f"Replayed {replayed} unacknowledged copy intents")
+        return replayed
+
+    async def send_order(self, session, client, compiled, ticket, order, payload=None):
+        """Send one order, routing modifies and closes to the stored destination position
+        
+        Opens are idempotent: a ticket that already has an open copy on the
+        account (a re-delivered or duplicated signal) is not copied again.
+        order is the lane order (action, volume, SL/TP); the full order dict is
+        only built when there is no payload (dropped by coalescing).
+        """
+        store = self.position_store
+        action = order.get('action')
+        if store is None or ticket is None:
+            return await self._place(session, client, compiled, order, payload)
+        
+        # SQLite calls run off the event loop
+        account = self.lane_account(client)
+        position_id = await asyncio.to_thread(store.lookup, ticket, account)
+        if action in (None, 'open') and position_id is not None:
+            logging.warning(f"Ticket {ticket} is already copied to {account} as {position_id}, skipping open")
+            return {'status': 'already_open', 'position_id': position_id}
+        if action in ('modify', 'partial_close', 'close'):
+            if position_id is None:
+                # Never copied (or already closed): a raw order here would open a new position
+                logging.warning(f"No copy of ticket {ticket} on {account}, skipping {action}")
+                return {'status': 'skipped', 'reason': 'no_position'}
+            if action == 'close':
+                result = await client.close_position(session, position_id)
+                if result:
+                    await asyncio.to_thread(store.mark_closed, ticket, account)
+                return result
+            order['position_id'] = position_id
+            if payload is not None:
+                payload = compiled.payload(client.base_url, order['volume'],
+                                           b'"position_id":' + json.dumps(position_id).encode() + b',')
+        
+        result = await self._place(session, client, compiled, order, payload)
+        if result and action in (None, 'open'):
+            position_id = result.get('position_id') or result.get('order_id')
+            if position_id is not None:
+                await asyncio.to_thread(store.record, ticket, account, position_id)
+        return result
+
+    @staticmethod
+    async def _place(session, client, compiled, order, payload):
+        if payload is None:
+            # Coalesced SL/TP and the position id in the lane order win over the signal's fields
+            order = dict(compiled.order_details(client.base_url, order['volume']), **order)
+        return await client.place_order(session, order, payload=payload)
+
+    @staticmethod
+    def lane_account(client) -> str:
+        """Destination account identifier used for dispatch lanes"""
+        return f"{client.base_url}#{client.account_number or client.username}"
+
+    async def reconcile_positions(self, session):
+        """Diff every follower book against the MT5 master snapshot and return repair actions"""
+        master = {}
+        for position in await self.mt5_connector.get_positions_async():
+            symbol = self.symbol_mapper.map_symbol(position['symbol'])
+            if symbol:
+                master[position['ticket']] = dict(position, symbol=symbol)
+        
+        accounts = [self.lane_account(client) for client in self.match_trader_clients]
+        indices = self.lot_sizer.indices(accounts)
+        expected = {account: {} for account in accounts}
+        for ticket, position in master.items():
+            for account, volume in zip(accounts, self.lot_sizer.size(position['volume'], indices=indices)):
+                expected[account][ticket] = float(volume)
+        
+        clients = dict(zip(accounts, self.match_trader_clients))
+        return await self.reconciler.reconcile(session, master, expected, clients)
+    
+    async def run_reconciler(self, session, interval: float):
+        """Reconcile periodically and log any drift found"""
+        while True:
+            try:
+                actions = await self.reconcile_positions(session)
+                if actions:
+                    counts = {}
+                    for action in actions:
+                        counts[action['action']] = counts.get(action['action'], 0) + 1
+                    logging.warning(f"Reconciliation found drift: {counts}")
+            except Exception as e:
+                logging.error(f"Reconciliation failed: {e}")
+            await asyncio.sleep(interval)
+
+    def get_stats(self):
+        """Stats from the copier's shared components"""
+        return {
+            'mt5_executor': self.mt5_connector.executor.get_stats(),
+            'http_pool': self.session_pool.get_stats(),
+            'rate_limits': self.rate_limiter.get_stats(),
+            'concurrency': self.concurrency_limiter.get_stats(),
+        }
+    
+    async def run_stats_logger(self, interval: float):
+        """Log component stats periodically"""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                logging.info(f"Copier stats: {self.get_stats()}")
+            except Exception as e:
+                logging.error(f"Collecting stats failed: {e}")
+
+    async def flatten_all(self, session):
+        """Emergency close of every open position on every follower account"""
+        unauthenticated = [client for client in self.match_trader_clients if not client.is_authenticated()]
+        if unauthenticated:
+            logins = await asyncio.gather(*[client.authenticate(session) for client in unauthenticated])
+            for client, ok in zip(unauthenticated, logins):
+                if not ok:
+                    # Still flattened: its book fetch fails and the account is reported unverified
+                    logging.error(f"Flatten could not log in to {self.lane_account(client)}")
+        clients = {self.lane_account(client): client for client in self.match_trader_clients}
+        report = await self.flattener.flatten(session, clients)
+        if not report['flat']:
+            self.send_notification(
+                f"Flatten incomplete: {report['remaining']} positions still open, "
+                f"{len(report['unverified_accounts'])} accounts unverified"
+            )
+        return report
+
     async def handle_connection_errors(self):
         pass  # Implement error handling
     
+    def size_volumes(self, signal, clients):
+        """Follower volumes for a signal, one per client, computed in one vector pass"""
+        indices = None
+        if clients is not self.match_trader_clients:
+            indices = self.lot_sizer.indices([self.lane_account(client) for client in clients])
+        return self.lot_sizer.size(signal['volume'], signal.get('master_equity'), indices)
+    
+    async def refresh_equity(self, session):
+        """Refresh the cached master and follower equity used by equity_based sizing"""
+        infos = await asyncio.gather(*[client.get_account_info(session) for client in self.match_trader_clients])
+        for client, info in zip(self.match_trader_clients, infos):
+            if info and info.get('equity'):
+                self.lot_sizer.update_equity(self.lane_account(client), info['equity'])
+        master = await self.mt5_connector.get_account_info_async()
+        if master.get('equity'):
+            self.lot_sizer.master_equity = master['equity']
+    
+    async def run_equity_refresher(self, session, interval: float):
+        """Refresh cached equity periodically so equity_based sizing tracks the accounts"""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.refresh_equity(session)
+            except Exception as e:
+                logging.error(f"Equity refresh failed: {e}")
+    
+    @property
+    def lot_multiplier(self) -> float:
+        return self.lot_sizer.multiplier
+    
+    @lot_multiplier.setter
+    def lot_multiplier(self, value: float):
+        self.lot_sizer.configure(multiplier=value)
+    
+    @property
+    def max_lot_size(self) -> float:
+        return self.lot_sizer.max_lot
+    
+    @max_lot_size.setter
+    def max_lot_size(self, value: float):
+        self.lot_sizer.configure(max_lot=value)
+    
+    @property
+    def min_lot_size(self) -> float:
+        return self.lot_sizer.min_lot
+    
+    @min_lot_size.setter
+    def min_lot_size(self, value: float):
+        self.lot_sizer.configure(min_lot=value)
+    
     def calculate_lot_size(self, original_lot: float) -> float:
         """Calculate adjusted lot size based on multiplier"""
-        if hasattr(self, 'lot_multiplier'):
-            return original_lot * self.lot_multiplier
-        return original_lot
+        return original_lot * self.lot_multiplier
     
     def apply_lot_size_cap(self, lot_size: float) -> float:
         """Apply maximum lot size cap"""
-        if hasattr(self, 'max_lot_size'):
-            return min(lot_size, self.max_lot_size)
-        return lot_size
+        return min(lot_size, self.max_lot_size)
     
     def apply_lot_size_floor(self, lot_size: float) -> float:
         """Apply minimum lot size floor"""
-        if hasattr(self, 'min_lot_size'):
-            return max(lot_size, self.min_lot_size)
-        return lot_size
+        return max(lot_size, self.min_lot_size)
     
     def log_error(self, message: str):
         """Log error message"""
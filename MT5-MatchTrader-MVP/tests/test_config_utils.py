@@ -101,6 +101,19 @@ class TestConfigurationAndUtils:
         adjusted_lot = copier.apply_lot_size_floor(original_lot)
         assert adjusted_lot == 0.01
     
+    # Test 51a: Test vectorized sizing across accounts with equity ratio and volume steps
+    def test_vectorized_lot_sizing(self):
+        from src.lot_sizing import LotSizer
+        sizer = LotSizer(mode='equity_based', multiplier=2.0, max_lot=5.0, min_lot=0.01)
+        sizer.add_accounts(['a', 'b', 'c', 'd'], steps=[0.01, 0.1, 0.01, 0.01])
+        for account, equity in [('a', 50000), ('b', 50000), ('c', 1000000)]:
+            sizer.update_equity(account, equity)
+        
+        lots = sizer.size(0.33, master_equity=100000)
+        # a: 0.33 lots, b: rounded down to its 0.1 step, c: capped, d: no equity yet -> proportional
+        assert lots.tolist() == [0.33, 0.3, 5.0, 0.66]
+        assert sizer.size(0.001, master_equity=100000).tolist() == [0.01, 0.1, 0.02, 0.01]
+    
     # Test 52: Test broker URL mapping
     def test_broker_url_mapping(self):
         broker_urls = {
@@ -151,6 +151,63 @@ class TestMatchTraderClient:
                 })
                 assert result is None
     
+    # Test 21a: Test a pre-serialized order template is posted as-is
+    @pytest.mark.asyncio
+    async def test_place_order_with_template_payload(self, client):
+        from src.order_templates import SignalCompiler
+        from src.symbol_mapper import SymbolMapper
+        client.token = 'valid_token'
+        
+        compiled = SignalCompiler(SymbolMapper(), {client.base_url: {'account_type': 'hedge'}}).compile(
+            {'symbol': 'EURUSD', 'type': 'buy', 'sl': 1.09, 'volume': 1.0, 'ticket': 7})
+        payload = compiled.payload(client.base_url, 0.25)
+        assert json.loads(payload) == {'volume': 0.25, 'symbol': 'EURUSD', 'type': 'buy', 'sl': 1.09,
+                                       'comment': 'mt5:7', 'account_type': 'hedge'}
+        # The dict fallback (used when coalescing drops the payload) sends the same body
+        assert compiled.order_details(client.base_url, 0.25) == json.loads(payload)
+        assert compiled.template(client.base_url) is compiled.template(client.base_url)
+        
+        mock_response = AsyncMock()
+        mock_response.status = 200
+        mock_response.json = AsyncMock(return_value={'order_id': '1', 'status': 'filled'})
+        mock_post = AsyncMock(return_value=mock_response)
+        with patch('aiohttp.ClientSession.post', mock_post):
+            async with aiohttp.ClientSession() as session:
+                result = await client.place_order(session, compiled.order_details(client.base_url, 0.25), payload=payload)
+        assert result['status'] == 'filled'
+        assert mock_post.call_args.kwargs['data'] == payload
+    
+    # Test 21b: Test a 401 triggers one shared token refresh and each order is replayed once
+    @pytest.mark.asyncio
+    async def test_place_order_replays_after_refresh(self, client):
+        client.token = 'expired_token'
+        logins = []
+        
+        async def mock_post(self, url, **kwargs):
+            response = AsyncMock()
+            if url.endswith('/api/auth/login'):
+                logins.append(url)
+                await asyncio.sleep(0.01)
+                response.status = 200
+                response.json = AsyncMock(return_value={'access_token': 'fresh_token', 'expires_in': 3600})
+            elif kwargs['headers']['Authorization'] == 'Bearer fresh_token':
+                response.status = 200
+                response.json = AsyncMock(return_value={'order_id': '1'})
+            else:
+                response.status = 401
+            return response
+        
+        with patch('aiohttp.ClientSession.post', mock_post):
+            async with aiohttp.ClientSession() as session:
+                results = await asyncio.gather(*[
+                    client.place_order(session, {'symbol': 'EURUSD', 'side': 'buy', 'volume': 0.1})
+                    for _ in range(10)
+                ])
+        
+        assert results == [{'order_id': '1'}] * 10
+        assert len(logins) == 1
+        assert client.token == 'fresh_token'
+    
     # Test 22: Test get account info
     @pytest.mark.asyncio
     async def test_get_account_info(self, client):
@@ -198,6 +255,35 @@ class TestMatchTraderClient:
                 assert len(positions) == 1
                 assert positions[0]['symbol'] == 'EURUSD'
     
+    # Test 23a: Test reads refresh an expired token and replay once instead of returning nothing
+    @pytest.mark.asyncio
+    async def test_get_positions_replays_after_refresh(self, client):
+        client.token = 'expired_token'
+        
+        async def mock_post(self, url, **kwargs):
+            response = AsyncMock()
+            response.status = 200
+            response.json = AsyncMock(return_value={'access_token': 'fresh_token', 'expires_in': 3600})
+            return response
+        
+        async def mock_get(self, url, **kwargs):
+            response = AsyncMock()
+            if kwargs['headers']['Authorization'] != 'Bearer fresh_token':
+                response.status = 401
+            elif url.endswith('/api/positions'):
+                response.status = 200
+                response.json = AsyncMock(return_value={'positions': [{'id': '123'}]})
+            else:
+                response.status = 200
+                response.json = AsyncMock(return_value={'equity': 10500.0})
+            return response
+        
+        with patch('aiohttp.ClientSession.post', mock_post), patch('aiohttp.ClientSession.get', mock_get):
+            async with aiohttp.ClientSession() as session:
+                assert await client.get_positions(session) == [{'id': '123'}]
+                client.token = 'expired_again'
+                assert (await client.get_account_info(session))['equity'] == 10500.0
+    
     # Test 24: Test close position
     @pytest.mark.asyncio
     async def test_close_position(self, client):
@@ -251,6 +337,77 @@ class TestMatchTraderClient:
                 })
                 assert result is None
     
+    # Test 27a: Test a 429 is queued for retry after Retry-After instead of being dropped
+    @pytest.mark.asyncio
+    async def test_rate_limited_order_is_retried(self, client):
+        import time
+        from src.rate_limiter import RateLimiter
+        client.token = 'valid_token'
+        client.rate_limiter = RateLimiter(max_wait=5.0)
+        
+        throttled = AsyncMock()
+        throttled.status = 429
+        throttled.headers = {'Retry-After': '0.05'}
+        accepted = AsyncMock()
+        accepted.status = 200
+        accepted.json = AsyncMock(return_value={'order_id': '1'})
+        too_long = AsyncMock()
+        too_long.status = 429
+        too_long.headers = {'Retry-After': '60'}
+        
+        mock_post = AsyncMock(side_effect=[throttled, accepted, too_long])
+        with patch('aiohttp.ClientSession.post', mock_post):
+            async with aiohttp.ClientSession() as session:
+                started = time.perf_counter()
+                result = await client.place_order(session, {'symbol': 'EURUSD', 'side': 'buy', 'volume': 0.1})
+                assert result == {'order_id': '1'}
+                assert time.perf_counter() - started >= 0.05
+                
+                # A Retry-After beyond max_wait gives up rather than stalling the copier
+                started = time.perf_counter()
+                assert await client.place_order(session, {'symbol': 'EURUSD', 'side': 'buy', 'volume': 0.1}) is None
+                assert time.perf_counter() - started < 1.0
+        
+        stats = client.rate_limiter.get_stats()['brokers'][client.base_url]
+        assert stats['rejections'] == 2
+        assert stats['throttled_seconds'] >= 0.04
+        assert stats['rate'] < stats['configured_rate']
+    
+    # Test 27b: Test the account bucket paces a burst of orders
+    @pytest.mark.asyncio
+    async def test_rate_limiter_paces_bursts(self):
+        import time
+        from src.rate_limiter import RateLimiter, parse_retry_after
+        limiter = RateLimiter(account_rate=100.0, account_burst=5.0)
+        
+        started = time.perf_counter()
+        await asyncio.gather(*[limiter.acquire('https://broker', 'acc') for _ in range(20)])
+        assert time.perf_counter() - started >= 0.14  # 15 requests beyond the burst at 100/s
+        assert limiter.get_stats()['accounts']['acc']['waits'] == 15
+        assert parse_retry_after('Wed, 21 Oct 2015 07:28:00 GMT', now=1445412470.0) == 10.0
+    
+    # Test 27c: Test closes skip the rate queue but a Retry-After pause holds back queued waiters
+    @pytest.mark.asyncio
+    async def test_rate_limiter_exit_priority_and_pause(self):
+        import time
+        from src.rate_limiter import RateLimiter
+        limiter = RateLimiter()
+        
+        # A flatten of 1000 positions over 50 accounts is not paced at the 20/s order rate
+        started = time.perf_counter()
+        await asyncio.gather(*[limiter.acquire('https://broker', f'acc{i % 50}', is_exit=True) for i in range(1000)])
+        assert time.perf_counter() - started < 0.5
+        
+        # Queued behind the (now drained) bucket, then the broker answers 429 with Retry-After
+        limiter = RateLimiter(broker_rate=100.0, broker_burst=1.0, account_rate=100.0, account_burst=1.0)
+        await limiter.acquire('https://broker', 'acc')
+        started = time.perf_counter()
+        waiter = asyncio.create_task(limiter.acquire('https://broker', 'acc'))
+        await asyncio.sleep(0)
+        limiter.on_throttled('https://broker', 'acc', retry_after=0.2)
+        await waiter
+        assert time.perf_counter() - started >= 0.2
+    
     # Test 28: Test different broker endpoints
     def test_broker_endpoints(self):
         e8_client = MatchTraderClient(
@@ -285,3 +442,98 @@ class TestMatchTraderClient:
         
         assert client.is_authenticated() == True
         assert client.needs_refresh() == True
+    
+    # Test 30a: Test accounts on one host share a pooled session with per-host limits and metrics
+    @pytest.mark.asyncio
+    async def test_session_pool(self):
+        from aiohttp import web
+        from src.session_pool import SessionPool
+        
+        async def positions(request):
+            await asyncio.sleep(0.05)
+            return web.json_response({'positions': [{'id': 'P1'}]})
+        
+        async def options(request):
+            return web.Response()
+        
+        app = web.Application()
+        app.router.add_get('/api/positions', positions)
+        app.router.add_route('OPTIONS', '/', options)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, '127.0.0.1', 0)
+        await site.start()
+        base_url = f"http://127.0.0.1:{runner.addresses[0][1]}"
+        
+        try:
+            async with SessionPool(limit_per_host=2) as pool:
+                await pool.prewarm([base_url], connections=2)
+                clients = [MatchTraderClient(base_url, f"user{i}", "pw") for i in range(6)]
+                for c in clients:
+                    c.token = 'token'
+                results = await asyncio.gather(*[c.get_positions(pool) for c in clients])
+                
+                assert all(result == [{'id': 'P1'}] for result in results)
+                assert len(pool.sessions) == 1
+                stats = pool.get_stats()[base_url]
+                assert stats['max_in_flight'] == 6
+                assert stats['queued_total'] >= 4  # Only two connections to the host at a time
+                assert stats['connections_created'] == 2
+                assert stats['connections_reused'] >= 6
+                assert stats['in_flight'] == 0
+        finally:
+            await runner.cleanup()
+    
+    # Test 30b: Test the token manager refreshes only tokens close to expiry
+    @pytest.mark.asyncio
+    async def test_token_manager_refreshes_expiring_tokens(self):
+        from src.token_manager import TokenManager
+        
+        fresh = MatchTraderClient("https://platform.e8markets.com", "fresh", "pw")
+        fresh.token = 'token'
+        fresh.token_expiry = datetime.now() + timedelta(hours=1)
+        expiring = MatchTraderClient("https://platform.e8markets.com", "expiring", "pw")
+        expiring.token = 'token'
+        expiring.token_expiry = datetime.now() + timedelta(seconds=60)
+        
+        manager = TokenManager(refresh_margin=300)
+        with patch.object(MatchTraderClient, 'authenticate', new_callable=AsyncMock, return_value=True) as mock_auth:
+            failed = await manager.refresh_due(object(), [fresh, expiring])
+        
+        assert failed == 0
+        mock_auth.assert_called_once()
+        assert manager.get_stats()['refreshes'] == 1
+    
+    # Test 30c: Test the adaptive limit grows while latency is flat and shrinks when the broker saturates
+    @pytest.mark.asyncio
+    async def test_adaptive_concurrency_limit(self):
+        from src.concurrency_limiter import ConcurrencyLimiter
+        
+        limiter = ConcurrencyLimiter(initial_limit=4, min_limit=1, max_limit=100, window=10)
+        capacity = {'value': 1000}
+        in_flight = {'value': 0}
+        
+        async def call(key):
+            async with limiter.slot(key):
+                in_flight['value'] += 1
+                # The broker slows down in proportion to the load beyond its capacity
+                await asyncio.sleep(0.005 * max(1.0, in_flight['value'] / capacity['value']))
+                in_flight['value'] -= 1
+        
+        await asyncio.gather(*[call('https://broker') for _ in range(400)])
+        grown = limiter.get_stats()['https://broker']['limit']
+        assert grown > 10
+        
+        capacity['value'] = 5
+        await asyncio.gather(*[call('https://broker') for _ in range(800)])
+        stats = limiter.get_stats()['https://broker']
+        assert stats['decreases'] > 0
+        assert stats['limit'] < grown
+        assert stats['rtt_p90_ms'] is not None
+        
+        # Errors cut the limit even while latency is flat
+        for _ in range(10):
+            with pytest.raises(RuntimeError):
+                async with limiter.slot('https://failing.broker'):
+                    raise RuntimeError("broker error")
+        assert limiter.get_stats()['https://failing.broker']['limit'] < 4
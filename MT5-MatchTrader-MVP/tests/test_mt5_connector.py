@@ -2,7 +2,8 @@ import pytest
 import asyncio
 from unittest.mock import Mock, patch, MagicMock
 import MetaTrader5 as mt5
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
+import time
 import sys
 import os
 
@@ -167,3 +168,78 @@ class TestMT5Connector:
         assert len(history) == 1
         assert history[0]['ticket'] == 789012
         assert history[0]['profit'] == 50.0
+    
+    # Test 15a: Test incremental deal-history cursor
+    @patch('MetaTrader5.history_deals_get')
+    def test_history_cursor_returns_only_new_deals(self, mock_history, mt5_connector):
+        from collections import namedtuple
+        Deal = namedtuple('Deal', ['ticket', 'symbol', 'volume', 'profit', 'time', 'time_msc'])
+        first = Deal(1, 'EURUSD', 0.1, 5.0, 1700000000, 1700000000123)
+        second = Deal(2, 'EURUSD', 0.1, -2.0, 1700000001, 1700000001456)
+        mock_history.side_effect = [[first], [first, second], [first, second]]
+        
+        cursor = mt5_connector.history_cursor(datetime.fromtimestamp(1699999999, tz=timezone.utc))
+        assert [d['ticket'] for d in cursor.fetch_new()] == [1]
+        assert [d['ticket'] for d in cursor.fetch_new()] == [2]
+        assert list(cursor.fetch_chunks()) == []
+        assert cursor.watermark == (1700000001456, 2)
+        assert cursor.deals_read == 2
+    
+    # Test 15b: Test columnar positions
+    @patch('MetaTrader5.positions_get')
+    def test_get_positions_columnar(self, mock_positions, mt5_connector):
+        from collections import namedtuple
+        from src.columnar import POSITION_DTYPE
+        Position = namedtuple('Position', POSITION_DTYPE.names)
+        mock_positions.return_value = (
+            Position(1, 1700000000000, 0, 0, 0.1, 1.1, 1.09, 1.12, 1.105, 0.0, 5.0, 'EURUSD', ''),
+            Position(2, 1700000000500, 1, 0, 0.3, 1.3, 0.0, 0.0, 1.295, 0.0, 15.0, 'GBPUSD', ''),
+        )
+        
+        positions = mt5_connector.get_positions(columnar=True)
+        assert positions.dtype == POSITION_DTYPE
+        assert list(positions['ticket']) == [1, 2]
+        assert positions['profit'].sum() == 20.0
+        assert positions['symbol'][1] == 'GBPUSD'
+    
+    # Test 15c: Test the deal-history window is in UTC whatever the host timezone
+    @pytest.mark.skipif(not hasattr(time, 'tzset'), reason='needs time.tzset')
+    @patch('MetaTrader5.history_deals_get')
+    def test_history_cursor_window_is_utc(self, mock_history, mt5_connector, monkeypatch):
+        mock_history.return_value = []
+        monkeypatch.setenv('TZ', 'America/New_York')
+        time.tzset()
+        try:
+            cursor = mt5_connector.history_cursor(datetime(2024, 1, 2, 9, 0, 0))
+            assert list(cursor.fetch_new()) == []
+        finally:
+            monkeypatch.undo()
+            time.tzset()
+        
+        start = datetime(2024, 1, 2, 9, 0, 0, tzinfo=timezone.utc)
+        assert cursor.watermark == (int(start.timestamp() * 1000), 0)
+        from_date = mock_history.call_args[0][0]
+        assert from_date == start - timedelta(seconds=1)
+    
+    # Test 14a: Test symbol specs are cached and ticks refreshed separately
+    @patch('MetaTrader5.symbol_info_tick')
+    @patch('MetaTrader5.symbol_info')
+    def test_symbol_info_cache(self, mock_symbol_info, mock_tick, mt5_connector):
+        mock_info = Mock()
+        mock_info.bid = 1.10000
+        mock_info.ask = 1.10010
+        mock_info.point = 0.00001
+        mock_info.volume_step = 0.01
+        mock_symbol_info.return_value = mock_info
+        mock_tick.return_value = Mock(bid=1.10020, ask=1.10030)
+        
+        first = mt5_connector.get_symbol_info('EURUSD')
+        mt5_connector.symbol_cache.ticks['EURUSD'] = (0, first)  # Expire the tick only
+        second = mt5_connector.get_symbol_info('EURUSD')
+        
+        assert mock_symbol_info.call_count == 1
+        assert mock_tick.call_count == 1
+        assert second['bid'] == 1.10020
+        assert second['spread'] == 10
+        assert second['volume_step'] == 0.01
+        assert mt5_connector.symbol_cache.get_stats()['spec_hits'] == 1
@@ -1,5 +1,6 @@
 import pytest
 import asyncio
+import json
 from unittest.mock import AsyncMock, patch
 import sys
 import os
@@ -62,3 +63,316 @@ class TestTradeCopierMVP:
     async def test_handle_connection_errors(self, copier):
         with patch('src.trade_copier_mvp.asyncio.sleep', new_callable=AsyncMock):
             await copier.handle_connection_errors()
+
+    # Test 35a: Test per-account lanes keep order while accounts run in parallel
+    @pytest.mark.asyncio
+    async def test_dispatch_lanes_order_and_parallelism(self, copier):
+        from src.matchtrade_client import MatchTraderClient
+        slow = MatchTraderClient("https://slow.example.com", "slow", "pw", "S-1")
+        fast = MatchTraderClient("https://fast.example.com", "fast", "pw", "F-1")
+        sent = []
+        
+        async def place_order(client, session, order_details, payload=None):
+            await asyncio.sleep(0.05 if client is slow else 0)
+            sent.append((client.username, json.loads(payload)['type']))
+            return {'status': 'success'}
+        
+        with patch.object(copier.symbol_mapper, 'map_symbol', return_value='EURUSD'), \
+             patch.object(MatchTraderClient, 'place_order', new=place_order):
+            signals = [{'symbol': 'EURUSD', 'volume': 0.1, 'type': kind, 'ticket': 1}
+                       for kind in ('open', 'modify', 'close')]
+            await asyncio.gather(*[
+                copier.replicate_trade(signal, [slow, fast], session=object()) for signal in signals
+            ])
+        
+        assert [kind for name, kind in sent if name == 'slow'] == ['open', 'modify', 'close']
+        # The fast account finished all three before the slow one sent its first
+        assert sent[:3] == [('fast', 'open'), ('fast', 'modify'), ('fast', 'close')]
+        assert copier.dispatch_lanes.get_stats()['dispatched'] == 6
+        await copier.stop_copying()
+
+    # Test 35b: Test pending modifies coalesce and an unsent open+close cancels out
+    @pytest.mark.asyncio
+    async def test_dispatch_lanes_coalescing(self, copier):
+        from src.matchtrade_client import MatchTraderClient
+        client = MatchTraderClient("https://broker.example.com", "user", "pw", "A-1")
+        sent = []
+        release = asyncio.Event()
+        
+        async def place_order(self, session, order_details, payload=None):
+            await release.wait()
+            sent.append(order_details)
+            return {'status': 'success'}
+        
+        def signal(action, ticket, **fields):
+            return dict({'symbol': 'EURUSD', 'volume': 0.1, 'type': 'buy', 'action': action, 'ticket': ticket}, **fields)
+        
+        def replicate(s):
+            return asyncio.ensure_future(copier.replicate_trade(s, [client], session=object()))
+        
+        with patch.object(copier.symbol_mapper, 'map_symbol', return_value='EURUSD'), \
+             patch.object(MatchTraderClient, 'place_order', new=place_order):
+            tasks = [replicate(signal('open', 1))]
+            await asyncio.sleep(0.01)                 # Open is in flight, blocking the lane
+            tasks += [replicate(s) for s in [
+                signal('modify', 1, sl=1.09),
+                signal('modify', 1, sl=1.095),        # Replaces the first modify
+                signal('open', 2),
+                signal('modify', 2, tp=1.2),          # Folds into the pending open
+                signal('close', 2),                   # Cancels the open
+            ]]
+            await asyncio.sleep(0.01)
+            release.set()
+            results = await asyncio.gather(*tasks)
+        
+        assert [(o['action'], o.get('sl')) for o in sent] == [('open', None), ('modify', 1.095)]
+        assert results[5] == [{'status': 'coalesced'}]
+        assert copier.dispatch_lanes.get_stats()['saved_requests'] == 4
+        await copier.stop_copying()
+
+    # Test 35c: Test copied tickets persist and route closes to the stored position
+    @pytest.mark.asyncio
+    async def test_position_store_routing(self, copier, tmp_path):
+        from src.position_store import PositionStore
+        copier.position_store = PositionStore(str(tmp_path / "positions.db"))
+        client = copier.match_trader_clients[0]
+        client.place_order = AsyncMock(return_value={'status': 'filled', 'position_id': 'P-9'})
+        client.close_position = AsyncMock(return_value={'status': 'closed'})
+        
+        with patch.object(copier.symbol_mapper, 'map_symbol', return_value='EURUSD'):
+            for _ in range(2):
+                # The second, duplicated open signal must not copy the trade again
+                await copier.replicate_trade({'symbol': 'EURUSD', 'volume': 0.1, 'type': 'buy', 'action': 'open',
+                                              'ticket': 42}, [client], session=object())
+            client.place_order.assert_awaited_once()
+            assert copier.position_store.record(42, copier.lane_account(client), 'P-10') is False
+            # A restart reopens the same database file
+            copier.position_store.close()
+            copier.position_store = PositionStore(str(tmp_path / "positions.db"))
+            await copier.replicate_trade({'symbol': 'EURUSD', 'volume': 0.1, 'type': 'buy', 'action': 'close',
+                                          'ticket': 42}, [client], session=object())
+        
+        client.close_position.assert_awaited_once()
+        assert client.close_position.await_args.args[1] == 'P-9'
+        assert copier.position_store.lookup(42, copier.lane_account(client)) is None
+        # A close or modify for a ticket with no copy is skipped, never sent as a new order
+        with patch.object(copier.symbol_mapper, 'map_symbol', return_value='EURUSD'):
+            for action in ('close', 'modify'):
+                result = await copier.replicate_trade({'symbol': 'EURUSD', 'volume': 0.1, 'type': 'buy',
+                                                       'action': action, 'ticket': 42}, [client], session=object())
+                assert result == [{'status': 'skipped', 'reason': 'no_position'}]
+        client.place_order.assert_awaited_once()
+        client.close_position.assert_awaited_once()
+        assert copier.position_store.compact(retention_seconds=0) == 1
+        await copier.stop_copying()
+
+    # Test 35d: Test unacknowledged journaled intents are replayed once on startup
+    @pytest.mark.asyncio
+    async def test_journal_replay(self, copier, tmp_path):
+        from src.intent_journal import IntentJournal
+        path = str(tmp_path / "intents.log")
+        client = copier.match_trader_clients[0]
+        signal = {'symbol': 'EURUSD', 'volume': 0.1, 'type': 'buy', 'action': 'open', 'ticket': 7}
+        
+        # Crash after the intent was journaled but before the order went out
+        crashed = IntentJournal(path)
+        await crashed.intent(copier.lane_account(client), signal)
+        acked = await crashed.intent(copier.lane_account(client), signal)
+        await asyncio.wrap_future(crashed.ack(acked))
+        crashed.stop()
+        # ... and died halfway through writing the next record
+        with open(path, 'ab') as journal:
+            journal.write(b'{"t":"intent","id":"to')
+        
+        copier.journal = IntentJournal(path)
+        client.place_order = AsyncMock(return_value={'status': 'filled'})
+        with patch.object(copier.symbol_mapper, 'map_symbol', return_value='EURUSD'):
+            assert await copier.replay_journal(object()) == 1
+            copier.journal.stop()
+            assert copier.journal.pending() == []
+        client.place_order.assert_awaited_once()
+        assert copier.journal.get_stats()['commits'] >= 1
+        # Compaction dropped the acked intent and the torn line; only the replay's records remain
+        with open(path, 'rb') as journal:
+            records = [json.loads(line) for line in journal]
+        assert [r['t'] for r in records] == ['intent', 'intent', 'ack', 'ack']
+        
+        # A record appended after a torn tail (no compaction) still lands on its own line
+        with open(path, 'ab') as journal:
+            journal.write(b'{"t":"ack","id":"to')
+        journal = IntentJournal(path)
+        await journal.intent(copier.lane_account(client), signal)
+        journal.stop()
+        assert len(journal.pending()) == 1
+        await copier.stop_copying()
+
+    # Test 35e: Test reconciliation finds missing, stale and mismatched copies across 500 accounts
+    @pytest.mark.asyncio
+    async def test_reconcile_positions(self, copier):
+        import time
+        from src.matchtrade_client import MatchTraderClient
+        
+        async def get_positions(self, session):
+            await asyncio.sleep(0.01)  # Network round trip
+            if self.username == 'user1':
+                return None  # Fetch failed: must not read as an empty book
+            if self.username == 'user0':
+                return [{'id': 'P1', 'symbol': 'EURUSD', 'volume': 0.2, 'comment': 'mt5:1'},
+                        {'id': 'P2', 'symbol': 'EURUSD', 'volume': 0.1, 'comment': 'mt5:2'},
+                        {'id': 'M1', 'symbol': 'EURUSD', 'volume': 1.0, 'comment': 'manual'}]
+            return [{'id': 'P1', 'symbol': 'EURUSD', 'volume': 0.1, 'comment': 'mt5:1'},
+                    {'id': 'P3', 'symbol': 'GBPUSD', 'volume': 0.3, 'comment': 'mt5:3'}]
+        
+        copier.match_trader_clients = [
+            MatchTraderClient("https://broker.example.com", f"user{i}", "pw", f"A-{i}") for i in range(500)
+        ]
+        master = [{'ticket': 1, 'symbol': 'EURUSD', 'volume': 0.1, 'type': 'buy'},
+                  {'ticket': 3, 'symbol': 'GBPUSD', 'volume': 0.3, 'type': 'sell'}]
+        with patch.object(copier.mt5_connector, 'get_positions_async', new=AsyncMock(return_value=master)), \
+             patch.object(MatchTraderClient, 'get_positions', new=get_positions):
+            started = time.perf_counter()
+            actions = await copier.reconcile_positions(object())
+            elapsed = time.perf_counter() - started
+        
+        account0 = copier.lane_account(copier.match_trader_clients[0])
+        assert sorted((a['action'], a['ticket']) for a in actions if a['account'] == account0) == [
+            ('missing_open', 3), ('stale_position', 2), ('volume_mismatch', 1)]
+        assert len(actions) == 3
+        assert copier.reconciler.get_stats()['last_skipped_accounts'] == 1
+        assert elapsed < 1.0
+
+    # Test 35f: Test flatten closes 1000 positions concurrently and trips the circuit on a failing account
+    @pytest.mark.asyncio
+    async def test_flatten_all(self, copier):
+        import time
+        from src.matchtrade_client import MatchTraderClient
+        
+        closed = set()
+        
+        async def get_positions(self, session):
+            await asyncio.sleep(0.01)
+            if self.username == 'user50':
+                return None  # Login or book fetch failed
+            positions = [{'id': f"{self.username}-{i}"} for i in range(20)]
+            return [position for position in positions if position['id'] not in closed]
+        
+        async def close_position(self, session, position_id):
+            await asyncio.sleep(0.01)
+            if self.username == 'user0':
+                return None
+            closed.add(position_id)
+            return {'status': 'closed'}
+        
+        copier.match_trader_clients = [
+            MatchTraderClient("https://broker.example.com", f"user{i}", "pw", f"A-{i}") for i in range(51)
+        ]
+        for client in copier.match_trader_clients:
+            client.token = 'token'
+        copier.flattener.backoff = 0.01
+        
+        with patch.object(MatchTraderClient, 'get_positions', new=get_positions), \
+             patch.object(MatchTraderClient, 'close_position', new=close_position), \
+             patch.object(copier, 'send_notification') as notify:
+            started = time.perf_counter()
+            report = await copier.flatten_all(object())
+            elapsed = time.perf_counter() - started
+        
+        assert report['positions'] == 1000
+        assert report['closed'] == 980
+        failing = report['accounts'][copier.lane_account(copier.match_trader_clients[0])]
+        assert failing['circuit_open'] is True
+        assert failing['failed'] + failing['skipped'] == 20
+        assert failing['remaining'] == 20
+        assert report['accounts'][copier.lane_account(copier.match_trader_clients[1])]['remaining'] == 0
+        # An account whose book could not be read is never reported as flat
+        unreadable = copier.lane_account(copier.match_trader_clients[50])
+        assert report['accounts'][unreadable]['fetch_failed'] is True
+        assert report['unverified_accounts'] == [unreadable]
+        assert report['flat'] is False
+        notify.assert_called_once()
+        assert elapsed < 3.0
+
+    # Test 35g: Test equity_based sizing refreshes equity on start and scales by the equity ratio
+    @pytest.mark.asyncio
+    async def test_equity_based_sizing(self, copier):
+        from src.matchtrade_client import MatchTraderClient
+        
+        copier.lot_sizer.configure(mode='equity_based')
+        with patch.object(copier, 'authenticate_all_accounts', new_callable=AsyncMock), \
+             patch.object(copier, 'monitor_mt5_positions', new_callable=AsyncMock), \
+             patch.object(copier.mt5_connector, 'connect_async', new=AsyncMock(return_value=True)), \
+             patch.object(copier.mt5_connector, 'get_account_info_async',
+                          new=AsyncMock(return_value={'equity': 10000.0})), \
+             patch.object(MatchTraderClient, 'get_account_info',
+                          new=AsyncMock(return_value={'equity': 25000.0})):
+            await copier.start_copying()
+        
+        assert copier.lot_sizer.master_equity == 10000.0
+        with patch.object(copier.symbol_mapper, 'map_symbol', return_value='EURUSD'), \
+             patch.object(MatchTraderClient, 'place_order', new_callable=AsyncMock) as place_order:
+            place_order.return_value = {'status': 'success'}
+            await copier.replicate_trade({'symbol': 'EURUSD', 'volume': 0.1, 'type': 'buy'},
+                                         copier.match_trader_clients, session=object())
+        assert place_order.call_args.args[1]['volume'] == pytest.approx(0.25)
+
+    # Test 35h: Test per-broker order fields from config land in that broker's payload only
+    @pytest.mark.asyncio
+    async def test_broker_order_fields(self, tmp_path):
+        from src.matchtrade_client import MatchTraderClient
+        with open("config_mvp.json") as f:
+            config = json.load(f)
+        config['matchtrade_accounts'].append(dict(config['matchtrade_accounts'][0], broker_name='ftmo'))
+        config['trade_settings'] = {'broker_order_fields': {'e8markets': {'account_type': 'hedge'}}}
+        path = tmp_path / "config.json"
+        path.write_text(json.dumps(config))
+        copier = TradeCopierMVP(str(path))
+        sent = {}
+        
+        async def place_order(client, session, order_details, payload=None):
+            sent[client.base_url] = json.loads(payload)
+            return {'status': 'success'}
+        
+        with patch.object(copier.symbol_mapper, 'map_symbol', return_value='EURUSD'), \
+             patch.object(MatchTraderClient, 'place_order', new=place_order):
+            await copier.replicate_trade({'symbol': 'EURUSD', 'volume': 0.1, 'type': 'buy'},
+                                         copier.match_trader_clients, session=object())
+        
+        assert sent["https://platform.e8markets.com"]['account_type'] == 'hedge'
+        assert 'account_type' not in sent["https://platform.ftmo.com"]
+        await copier.stop_copying()
+
+    # Test 35i: Test component stats are collected and logged periodically
+    @pytest.mark.asyncio
+    async def test_stats_logger(self, copier, caplog):
+        import logging
+        stats = copier.get_stats()
+        assert 'calls' in stats['mt5_executor']
+        assert stats['http_pool'] == {}
+        assert set(stats['rate_limits']) == {'brokers', 'accounts'}
+        assert stats['concurrency'] == {}
+        
+        with caplog.at_level(logging.INFO):
+            task = asyncio.create_task(copier.run_stats_logger(0.01))
+            await asyncio.sleep(0.05)
+            task.cancel()
+        assert any('Copier stats' in record.message for record in caplog.records)
+
+    # Test 35j: Test a lane worker idling out never loses a send queued as it times out
+    @pytest.mark.asyncio
+    async def test_dispatch_lanes_idle_timeout_race(self):
+        from src.dispatch_lanes import DispatchLanes
+        lanes = DispatchLanes(idle_timeout=0.001)
+        sent = []
+        
+        async def send(order, payload):
+            sent.append(order['n'])
+            return order['n']
+        
+        futures = []
+        for n in range(200):
+            futures.append(await lanes.submit('A', send, {'n': n}))
+            await asyncio.sleep(0.001 * (n % 3))
+        
+        assert await asyncio.wait_for(asyncio.gather(*futures), 5) == list(range(200))
+        assert sent == list(range(200))
+        await lanes.close()
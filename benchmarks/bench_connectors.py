@@ -0,0 +1,79 @@
+"""
+Benchmark both MT5 connectors against the MetaTrader5 simulator.
+
+Usage:
+    python benchmarks/bench_connectors.py [--events 20000] [--rate 5000] [--batch 50]
+
+The simulator generates --batch events between polls; each poll is timed
+through the full connector path (I/O thread, positions_get, change detection).
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "src"))
+sys.path.insert(0, os.path.join(ROOT, "MT5-MatchTrader-MVP"))
+
+from mt5_simulator import MT5Simulator, install  # noqa: E402
+
+START = datetime(2024, 1, 2, 9, 0, 0)
+
+
+def bench_root_connector(simulator, events, batch):
+    from mt5_connector import MT5Connector
+
+    detected = []
+    connector = MT5Connector("bench", "Simulator-Demo", "1", "pw", on_event=detected.append)
+    connector.initialize()
+    started = time.perf_counter()
+    while simulator.step(batch):
+        connector.poll_positions()
+        if simulator.events_generated >= events:
+            break
+    elapsed = time.perf_counter() - started
+    connector.shutdown()
+    return elapsed, len(detected)
+
+
+def bench_mvp_connector(simulator, events, batch):
+    from src.mt5_connector import MT5Connector
+
+    connector = MT5Connector({"login": 1, "password": "pw", "server": "Simulator-Demo"})
+    connector.initialize()
+    cursor = connector.history_cursor(START)
+    deals = 0
+    started = time.perf_counter()
+    while simulator.step(batch):
+        connector.get_positions(columnar=True)
+        deals += sum(len(chunk) for chunk in cursor.fetch_chunks(columnar=True))
+        if simulator.events_generated >= events:
+            break
+    elapsed = time.perf_counter() - started
+    connector.shutdown()
+    return elapsed, deals
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--events", type=int, default=20000)
+    parser.add_argument("--rate", type=float, default=5000.0, help="simulated events per second")
+    parser.add_argument("--batch", type=int, default=50, help="events generated between polls")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    for name, bench in (("root MT5Connector", bench_root_connector), ("MVP MT5Connector", bench_mvp_connector)):
+        simulator = install(MT5Simulator(seed=args.seed, event_rate=args.rate, start_time=START))
+        simulator.initialize()
+        elapsed, observed = bench(simulator, args.events, args.batch)
+        stats = simulator.get_stats()
+        print(f"{name}: {stats['events_generated']} events in {elapsed:.3f}s "
+              f"({stats['events_generated'] / elapsed:,.0f} events/s, {observed} observed, "
+              f"{stats['api_calls']} MT5 calls, {stats['open_positions']} open)")
+
+
+if __name__ == "__main__":
+    main()
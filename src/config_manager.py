@@ -25,6 +25,9 @@ class MT5AccountConfig(BaseModel):
     login: str
     password: str
     terminal_path: Optional[str] = None
+    push_port: Optional[int] = Field(default=None, ge=1, le=65535)
+    # None: measured from the latest tick when the terminal connects
+    server_time_offset_seconds: Optional[int] = Field(default=None, ge=-86400, le=86400)
 
 
 class MatchTradeAccountConfig(BaseModel):
@@ -80,6 +83,13 @@ class PerformanceConfig(BaseModel):
     heartbeat_interval_seconds: int = Field(default=30, ge=5)
     retry_max_attempts: int = Field(default=5, ge=1)
     retry_delay_seconds: int = Field(default=5, ge=1)
+    reconcile_interval_seconds: int = Field(default=5, ge=1)
+    pipeline_ingest_queue_size: int = Field(default=1000, ge=1)
+    pipeline_dispatch_queue_size: int = Field(default=100, ge=1)
+    pipeline_overflow_policy: str = Field(default="block", pattern="^(block|drop_oldest|drop_newest)$")
+    pipeline_block_timeout_seconds: float = Field(default=1.0, ge=0)
+    stale_signal_policy: str = Field(default="flag", pattern="^(drop|flag|slippage_check)$")
+    max_slippage_percent: float = Field(default=0.05, ge=0)
 
 
 class TradeCopierConfig(BaseModel):
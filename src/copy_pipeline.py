@@ -0,0 +1,497 @@
+"""
+Copy Pipeline Module
+
+Staged, bounded pipeline between MT5 position events and destination accounts.
+- Ingest queue -> map/size stage -> one dispatch queue and worker per destination
+- Every queue is bounded, with a configurable overflow policy
+  (block, drop_oldest, drop_newest)
+- Blocking puts time out and drop, so a slow destination cannot stall the
+  map/size stage (and with it every other destination)
+- Optional priority classes: urgent items (e.g. closes) are dequeued before
+  less urgent ones (e.g. opens) while items sharing an ordering key stay in order.
+  Under the drop policies a full queue evicts less urgent items to admit urgent
+  ones; under block the producer waits instead
+- Optional latency budget checked at dispatch time for signals older than it
+- Queue depth, drops, evictions and per-stage processing time exposed as metrics
+"""
+
+import logging
+import queue
+import threading
+import time
+from collections import deque
+from enum import Enum
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+# (destination id, payload) pairs produced by the map/size stage
+Routed = Iterable[Tuple[str, Any]]
+
+
+class OverflowPolicy(Enum):
+    """What to do when a bounded queue is full"""
+    BLOCK = "block"
+    DROP_OLDEST = "drop_oldest"
+    DROP_NEWEST = "drop_newest"
+
+
+class StalePolicy(Enum):
+    """What to do with a signal older than the latency budget"""
+    DROP = "drop"
+    FLAG = "flag"
+    SLIPPAGE_CHECK = "slippage_check"
+
+
+class PriorityClassQueue(queue.Queue):
+    """Bounded queue with FIFO lanes per priority class, lower class numbers first
+
+    Items that share an ordering key never overtake each other: queuing an
+    urgent item moves its key's queued items up into its lane ahead of it.
+    """
+
+    def __init__(self, maxsize: int, priority: Callable[[Any], int], classes: int = 3,
+                 key: Optional[Callable[[Any], Any]] = None):
+        """
+        Initialize Priority Class Queue
+
+        Args:
+            maxsize: Maximum queued items across all classes
+            priority: Function returning an item's class (0 is the most urgent)
+            classes: Number of priority classes
+            key: Function returning an item's ordering key (e.g. its ticket)
+        """
+        self.priority = priority
+        self.classes = classes
+        self.key = key
+        super().__init__(maxsize)
+
+    def _init(self, maxsize: int):
+        self.lanes = [deque() for _ in range(self.classes)]
+
+    def _qsize(self) -> int:
+        return sum(len(lane) for lane in self.lanes)
+
+    def _class(self, item: Any) -> int:
+        return min(max(int(self.priority(item)), 0), self.classes - 1)
+
+    def _put(self, item: Any):
+        cls = self._class(item)
+        if self.key is not None:
+            key = self.key(item)
+            for lane in self.lanes[cls + 1:]:
+                if any(self.key(queued) == key for queued in lane):
+                    kept = [queued for queued in lane if self.key(queued) != key]
+                    self.lanes[cls].extend(queued for queued in lane if self.key(queued) == key)
+                    lane.clear()
+                    lane.extend(kept)
+        self.lanes[cls].append(item)
+
+    def _get(self) -> Any:
+        for lane in self.lanes:
+            if lane:
+                return lane.popleft()
+        raise queue.Empty
+
+    def evict_below(self, item: Any) -> bool:
+        """
+        Drop the newest queued item of the least urgent class below the item's class
+
+        Returns:
+            True if an item was dropped to make room
+        """
+        cls = self._class(item)
+        with self.mutex:
+            for lane in reversed(self.lanes[cls + 1:]):
+                if lane:
+                    lane.pop()
+                    self.not_full.notify()
+                    return True
+        return False
+
+    def evict_oldest(self, item: Any) -> bool:
+        """
+        Drop the oldest queued item of the item's own class (more urgent items are kept)
+
+        Returns:
+            True if an item was dropped to make room
+        """
+        with self.mutex:
+            lane = self.lanes[self._class(item)]
+            if lane:
+                lane.popleft()
+                self.not_full.notify()
+                return True
+        return False
+
+
+class LatencyBudget:
+    """Enforces a maximum signal age, measured from the MT5 event time, at dispatch"""
+
+    def __init__(self,
+                 max_latency_ms: float,
+                 policy: str = "flag",
+                 applies_to: Optional[Callable[[Any], bool]] = None,
+                 slippage_check: Optional[Callable[[Any], bool]] = None,
+                 event_time: Optional[Callable[[Any], Optional[float]]] = None):
+        """
+        Initialize Latency Budget
+
+        Args:
+            max_latency_ms: Maximum signal age in milliseconds
+            policy: What to do with stale signals (drop, flag, slippage_check)
+            applies_to: Predicate selecting the payloads the budget applies to (default all)
+            slippage_check: Predicate returning True if a stale payload may still be sent
+                (required by the slippage_check policy)
+            event_time: Function returning a payload's event time as a Unix timestamp
+                (default payload["event_time"])
+        """
+        self.max_latency_ms = max_latency_ms
+        self.policy = StalePolicy(policy)
+        if self.policy == StalePolicy.SLIPPAGE_CHECK and slippage_check is None:
+            raise ValueError("slippage_check policy needs a slippage_check function")
+        self.applies_to = applies_to
+        self.slippage_check = slippage_check
+        self.event_time = event_time or (lambda payload: payload.get("event_time"))
+        self.lock = threading.Lock()
+        self.logger = logging.getLogger(__name__)
+
+        self.checked = 0
+        self.stale = 0
+        self.dropped = 0
+        self.flagged = 0
+        self.max_age_ms = 0.0
+
+    def apply(self, payload: Any) -> Optional[Any]:
+        """
+        Check a payload against the budget just before it is sent
+
+        Args:
+            payload: Payload about to be dispatched
+
+        Returns:
+            The payload to send (a flagged copy under the flag policy), or None to drop it
+        """
+        if self.applies_to is not None and not self.applies_to(payload):
+            return payload
+        event_time = self.event_time(payload)
+        if event_time is None:
+            return payload
+
+        age_ms = max(0.0, (time.time() - event_time) * 1000)
+        with self.lock:
+            self.checked += 1
+            self.max_age_ms = max(self.max_age_ms, age_ms)
+            if age_ms <= self.max_latency_ms:
+                return payload
+            self.stale += 1
+
+        if self.policy == StalePolicy.FLAG:
+            with self.lock:
+                self.flagged += 1
+            self.logger.warning(f"Signal {age_ms:.0f} ms old exceeds the {self.max_latency_ms} ms budget")
+            return dict(payload, stale=True, age_ms=round(age_ms, 1)) if isinstance(payload, dict) else payload
+
+        if self.policy == StalePolicy.SLIPPAGE_CHECK:
+            try:
+                within = self.slippage_check(payload)
+            except Exception as e:
+                self.logger.error(f"Slippage check failed: {e}")
+                within = False
+            if within:
+                return payload
+
+        with self.lock:
+            self.dropped += 1
+        self.logger.warning(f"Dropped signal {age_ms:.0f} ms old (budget {self.max_latency_ms} ms)")
+        return None
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Get latency budget metrics
+
+        Returns:
+            Dictionary with checked, stale, dropped and flagged counts and the largest age seen
+        """
+        with self.lock:
+            return {
+                "budget_ms": self.max_latency_ms,
+                "policy": self.policy.value,
+                "checked": self.checked,
+                "stale": self.stale,
+                "dropped": self.dropped,
+                "flagged": self.flagged,
+                "max_age_ms": self.max_age_ms,
+            }
+
+
+class BoundedStage:
+    """Bounded queue with an overflow policy and stage metrics"""
+
+    def __init__(self, name: str, maxsize: int, policy: OverflowPolicy = OverflowPolicy.BLOCK,
+                 block_timeout: float = 1.0, priority: Optional[Callable[[Any], int]] = None,
+                 ordering_key: Optional[Callable[[Any], Any]] = None):
+        """
+        Initialize Bounded Stage
+
+        Args:
+            name: Stage name used in logs and metrics
+            maxsize: Maximum queued items
+            policy: Overflow policy when the queue is full
+            block_timeout: Seconds a BLOCK put waits before dropping the item
+            priority: Function returning an item's priority class (0 first); plain FIFO when None
+            ordering_key: Function returning a key whose items keep their relative order
+        """
+        self.name = name
+        if priority is not None:
+            self.queue = PriorityClassQueue(maxsize, priority, key=ordering_key)
+        else:
+            self.queue = queue.Queue(maxsize=maxsize)
+        self.policy = OverflowPolicy(policy)
+        self.block_timeout = block_timeout
+        self.lock = threading.Lock()
+        self.logger = logging.getLogger(__name__)
+
+        self.enqueued = 0
+        self.dropped = 0
+        self.evicted = 0
+        self.processed = 0
+        self.errors = 0
+        self.max_depth = 0
+        self.busy_seconds = 0.0
+        self.max_seconds = 0.0
+
+    def put(self, item: Any) -> bool:
+        """
+        Queue an item according to the overflow policy
+
+        Returns:
+            True if the item was queued, False if it was dropped
+        """
+        # Under the drop policies a full queue makes room for urgent items at the expense of
+        # less urgent ones; under BLOCK nothing queued is lost and the producer waits instead
+        if (self.policy != OverflowPolicy.BLOCK and isinstance(self.queue, PriorityClassQueue)
+                and self.queue.full() and self.queue.evict_below(item)):
+            self._evicted("a lower-priority item")
+        try:
+            if self.policy == OverflowPolicy.BLOCK:
+                self.queue.put(item, timeout=self.block_timeout)
+            elif self.policy == OverflowPolicy.DROP_NEWEST:
+                self.queue.put_nowait(item)
+            else:
+                self._put_drop_oldest(item)
+        except queue.Full:
+            with self.lock:
+                self.dropped += 1
+            self.logger.warning(f"Pipeline stage {self.name} full, dropped item")
+            return False
+
+        with self.lock:
+            self.enqueued += 1
+            self.max_depth = max(self.max_depth, self.queue.qsize())
+        return True
+
+    def _put_drop_oldest(self, item: Any):
+        """Evict queued items until the new one fits"""
+        while True:
+            try:
+                self.queue.put_nowait(item)
+                return
+            except queue.Full:
+                if isinstance(self.queue, PriorityClassQueue):
+                    if not self.queue.evict_oldest(item):
+                        # Everything queued is more urgent than the new item
+                        raise
+                else:
+                    try:
+                        self.queue.get_nowait()
+                    except queue.Empty:
+                        continue
+                self._evicted("oldest item")
+
+    def _evicted(self, what: str):
+        """Count a queued item dropped to make room (evictions are also drops)"""
+        with self.lock:
+            self.dropped += 1
+            self.evicted += 1
+        self.logger.warning(f"Pipeline stage {self.name} full, dropped {what}")
+
+    def get(self, timeout: float) -> Any:
+        """Get the next item (raises queue.Empty on timeout)"""
+        return self.queue.get(timeout=timeout)
+
+    def record(self, seconds: float, error: bool = False):
+        """Record the processing time of one item"""
+        with self.lock:
+            self.processed += 1
+            self.busy_seconds += seconds
+            self.max_seconds = max(self.max_seconds, seconds)
+            if error:
+                self.errors += 1
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Get stage metrics
+
+        Returns:
+            Dictionary with depth, counters and processing times in milliseconds
+        """
+        with self.lock:
+            return {
+                "depth": self.queue.qsize(),
+                "capacity": self.queue.maxsize,
+                "max_depth": self.max_depth,
+                "enqueued": self.enqueued,
+                "dropped": self.dropped,
+                "evicted": self.evicted,
+                "processed": self.processed,
+                "errors": self.errors,
+                "avg_ms": self.busy_seconds / self.processed * 1000 if self.processed else 0.0,
+                "max_ms": self.max_seconds * 1000,
+            }
+
+
+class CopyPipeline:
+    """Ingest -> map/size -> per-destination dispatch, each stage on its own thread"""
+
+    def __init__(self,
+                 transform: Callable[[Any], Routed],
+                 ingest_size: int = 1000,
+                 dispatch_size: int = 100,
+                 overflow_policy: str = "block",
+                 block_timeout: float = 1.0,
+                 priority: Optional[Callable[[Any], int]] = None,
+                 ordering_key: Optional[Callable[[Any], Any]] = None,
+                 latency_budget: Optional[LatencyBudget] = None):
+        """
+        Initialize Copy Pipeline
+
+        Args:
+            transform: Map/size function turning one event into (destination id, payload) pairs
+            ingest_size: Capacity of the ingest queue
+            dispatch_size: Capacity of each destination queue
+            overflow_policy: Overflow policy for every queue (block, drop_oldest, drop_newest)
+            block_timeout: Seconds a blocking put waits before dropping
+            priority: Priority class of an event or payload (0 first) for every queue
+            ordering_key: Key of events/payloads that must keep their relative order
+            latency_budget: Budget checked just before each payload is sent
+        """
+        self.transform = transform
+        self.dispatch_size = dispatch_size
+        self.policy = OverflowPolicy(overflow_policy)
+        self.block_timeout = block_timeout
+        self.priority = priority
+        self.ordering_key = ordering_key
+        self.latency_budget = latency_budget
+        self.ingest = BoundedStage("ingest", ingest_size, self.policy, block_timeout, priority, ordering_key)
+        self.destinations: Dict[str, Tuple[BoundedStage, Callable[[Any], Any]]] = {}
+        self.threads = []
+        self.running = False
+        self.logger = logging.getLogger(__name__)
+
+    def add_destination(self, destination_id: str, send: Callable[[Any], Any], queue_size: Optional[int] = None):
+        """
+        Register a destination with its own bounded queue and dispatch worker
+
+        Args:
+            destination_id: Destination account ID
+            send: Function delivering one payload to the destination
+            queue_size: Capacity of this destination's queue (defaults to dispatch_size)
+        """
+        stage = BoundedStage(f"dispatch:{destination_id}", queue_size or self.dispatch_size,
+                             self.policy, self.block_timeout, self.priority, self.ordering_key)
+        self.destinations[destination_id] = (stage, send)
+        if self.running:
+            self._start_thread(self._dispatch_loop, destination_id, (destination_id, stage, send))
+
+    def _start_thread(self, target: Callable, name: str, args: tuple = ()):
+        thread = threading.Thread(target=target, args=args, name=f"pipeline-{name}", daemon=True)
+        thread.start()
+        self.threads.append(thread)
+
+    def start(self):
+        """Start the map/size thread and one dispatch thread per destination"""
+        if self.running:
+            return
+        self.running = True
+        self._start_thread(self._map_loop, "map")
+        for destination_id, (stage, send) in self.destinations.items():
+            self._start_thread(self._dispatch_loop, destination_id, (destination_id, stage, send))
+        self.logger.info(f"Copy pipeline started with {len(self.destinations)} destinations")
+
+    def stop(self, timeout: float = 5.0):
+        """
+        Stop all pipeline threads (queued items are discarded)
+
+        Args:
+            timeout: Seconds to wait for each thread
+        """
+        self.running = False
+        for thread in self.threads:
+            thread.join(timeout)
+        self.threads = []
+
+    def submit(self, event: Any) -> bool:
+        """
+        Submit an event to the ingest queue
+
+        Returns:
+            True if queued, False if dropped by the overflow policy
+        """
+        return self.ingest.put(event)
+
+    def _map_loop(self):
+        """Map/size stage: route each ingested event to destination queues"""
+        while self.running:
+            try:
+                event = self.ingest.get(timeout=0.2)
+            except queue.Empty:
+                continue
+            started = time.perf_counter()
+            error = False
+            try:
+                for destination_id, payload in self.transform(event):
+                    destination = self.destinations.get(destination_id)
+                    if destination is None:
+                        self.logger.warning(f"No pipeline destination {destination_id}")
+                        continue
+                    destination[0].put(payload)
+            except Exception as e:
+                error = True
+                self.logger.error(f"Error mapping event: {e}")
+            self.ingest.record(time.perf_counter() - started, error)
+
+    def _dispatch_loop(self, destination_id: str, stage: BoundedStage, send: Callable[[Any], Any]):
+        """Dispatch stage: deliver payloads to one destination"""
+        while self.running:
+            try:
+                payload = stage.get(timeout=0.2)
+            except queue.Empty:
+                continue
+            if self.latency_budget is not None:
+                payload = self.latency_budget.apply(payload)
+                if payload is None:
+                    continue
+            started = time.perf_counter()
+            error = False
+            try:
+                send(payload)
+            except Exception as e:
+                error = True
+                self.logger.error(f"Error dispatching to {destination_id}: {e}")
+            stage.record(time.perf_counter() - started, error)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        Get metrics for every stage
+
+        Returns:
+            Dictionary with "ingest" metrics, "dispatch" metrics per destination and
+            "latency" budget metrics (None without a budget)
+        """
+        return {
+            "ingest": self.ingest.get_metrics(),
+            "dispatch": {
+                destination_id: stage.get_metrics()
+                for destination_id, (stage, _) in self.destinations.items()
+            },
+            "latency": self.latency_budget.get_metrics() if self.latency_budget is not None else None,
+        }
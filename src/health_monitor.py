@@ -3,9 +3,8 @@ Health Monitoring System for application health checks and metrics.
 """
 
 import psutil
-import time
 import logging
-from typing import Dict, Any, List
+from typing import Dict, Any, Callable, List
 from datetime import datetime, timedelta
 import threading
 
@@ -24,6 +23,23 @@ class HealthMonitor:
         self.metrics = []
         self.monitoring = False
         self.monitor_thread = None
+        self.stop_event = threading.Event()
+        # Component name -> stats getter (pipeline, executor, ...) included in every check
+        self.stats_sources: Dict[str, Callable[[], Dict[str, Any]]] = {}
+
+    def add_stats_source(self, name: str, get_stats: Callable[[], Dict[str, Any]]):
+        """Include a component's stats in health checks and the periodic log."""
+        self.stats_sources[name] = get_stats
+
+    def get_component_stats(self) -> Dict[str, Any]:
+        """Collect stats from every registered component."""
+        stats = {}
+        for name, get_stats in self.stats_sources.items():
+            try:
+                stats[name] = get_stats()
+            except Exception as e:
+                stats[name] = {"error": str(e)}
+        return stats
 
     def get_system_metrics(self) -> Dict[str, Any]:
         """Collect current system metrics."""
@@ -56,6 +72,7 @@ class HealthMonitor:
         health_status = {
             "status": "healthy" if not alerts else "warning",
             "metrics": metrics,
+            "components": self.get_component_stats(),
             "alerts": alerts,
             "timestamp": datetime.now().isoformat(),
         }
@@ -85,6 +102,7 @@ class HealthMonitor:
     def start_monitoring(self, interval_seconds: int = 60):
         """Start continuous health monitoring."""
         self.monitoring = True
+        self.stop_event.clear()
         self.monitor_thread = threading.Thread(target=self._monitor_loop, args=(interval_seconds,))
         self.monitor_thread.daemon = True
         self.monitor_thread.start()
@@ -105,15 +123,19 @@ class HealthMonitor:
                 if health_status["alerts"]:
                     for alert in health_status["alerts"]:
                         self.logger.warning(f"Health Alert: {alert}")
+                if health_status["components"]:
+                    self.logger.info(f"Component stats: {health_status['components']}")
 
             except Exception as e:
                 self.logger.error(f"Error in health monitoring: {e}")
 
-            time.sleep(interval_seconds)
+            # Woken early by stop_monitoring
+            self.stop_event.wait(interval_seconds)
 
     def stop_monitoring(self):
         """Stop health monitoring."""
         self.monitoring = False
+        self.stop_event.set()
         if self.monitor_thread:
             self.monitor_thread.join()
         self.logger.info("Health monitoring stopped")
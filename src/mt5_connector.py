@@ -3,20 +3,49 @@ MT5 Connector Module for handling MetaTrader 5 connections.
 
 - Initializes and manages persistent connections.
 - Monitors and processes real-time trade data.
+- Routes every MetaTrader5 call through the process-wide MT5 I/O thread.
+- Optionally ingests pushed trade events from the TradeEventBridge EA,
+  dropping polling to a slow reconciliation pass while the feed is alive.
 """
 
 import MetaTrader5 as mt5
 import logging
 from datetime import datetime, timedelta
-from typing import List, Optional
+from typing import Any, Callable, Dict, List, Optional
 from threading import Thread
 import time
 
+try:
+    from .position_tracker import PositionTracker
+    from .poll_scheduler import AdaptivePollScheduler
+    from .trade_event_listener import TradeEventListener
+    from .mt5_executor import get_mt5_executor
+except ImportError:
+    from position_tracker import PositionTracker
+    from poll_scheduler import AdaptivePollScheduler
+    from trade_event_listener import TradeEventListener
+    from mt5_executor import get_mt5_executor
+
 
 class MT5Connector:
     """MetaTrader 5 Connector"""
 
-    def __init__(self, account_id: str, server: str, login: str, password: str, terminal_path: Optional[str] = None):
+    def __init__(
+        self,
+        account_id: str,
+        server: str,
+        login: str,
+        password: str,
+        terminal_path: Optional[str] = None,
+        on_event: Optional[Callable[[Dict[str, Any]], None]] = None,
+        max_latency_ms: int = 100,
+        push_port: Optional[int] = None,
+        reconcile_interval: float = 5.0,
+        symbol_group: Optional[str] = None,
+        server_time_offset: Optional[float] = None,
+        time_probe_symbols: Optional[List[str]] = None,
+        known_positions: Optional[List[Dict[str, Any]]] = None,
+    ):
         self.account_id = account_id
         self.server = server
         self.login = login
@@ -25,19 +54,77 @@ class MT5Connector:
         self.logger = logging.getLogger(__name__)
         self.connection_thread = None
         self.connected = False
+        self.on_event = on_event
+        # MT5 group= mask so the terminal only returns rows for copied symbols
+        self.symbol_group = symbol_group
+        # Trade server clock minus UTC in seconds, used to turn MT5 times into Unix time;
+        # None means it is measured from the latest tick when the terminal connects
+        self.server_time_offset = server_time_offset
+        self.time_probe_symbols = time_probe_symbols or ["EURUSD"]
+        self.future_event_warned = False
+        self.executor = get_mt5_executor()
+        self.position_tracker = PositionTracker()
+        if known_positions:
+            # Restarted worker: resume from the positions already reported to the copier
+            self.position_tracker.seed(known_positions)
+        self.poll_scheduler = AdaptivePollScheduler(max_latency_ms=max_latency_ms)
+        self.stats_log_interval = 60
+        self.reconcile_interval = reconcile_interval
+        self.push_listener = None
+        self.push_thread = None
+        if push_port is not None:
+            self.push_listener = TradeEventListener(self.position_tracker, self.process_event, port=push_port)
 
     def initialize(self) -> bool:
         """Initialize and connect to MT5 terminal"""
-        if not mt5.initialize(login=self.login, password=self.password, server=self.server, path=self.terminal_path):
+        if not self.executor.call(
+            mt5.initialize, login=self.login, password=self.password, server=self.server, path=self.terminal_path
+        ):
             self.logger.error("Failed to initialize MT5 connection.")
             return False
         self.logger.info("MT5 connection initialized.")
         self.connected = True
+        if self.server_time_offset is None:
+            self.server_time_offset = self.detect_server_time_offset()
         return True
 
+    def detect_server_time_offset(self) -> float:
+        """
+        Measure the trade server clock offset from UTC
+
+        MT5 stamps ticks and positions with the trade server's wall clock, which for
+        most brokers runs ahead of UTC. The offset is the freshest probe symbol tick
+        time minus the local UTC time, rounded to whole half hours.
+
+        Returns:
+            Offset in seconds; 0 when no tick is fresh enough to tell
+        """
+        ticks = self.executor.batch({
+            symbol: (mt5.symbol_info_tick, (symbol,)) for symbol in self.time_probe_symbols
+        })
+        times = [tick.time for tick in ticks.values() if tick is not None]
+        if not times:
+            self.logger.warning(
+                f"No tick for {self.time_probe_symbols} on {self.account_id}; assuming the server clock is UTC, "
+                f"set server_time_offset_seconds if it is not"
+            )
+            return 0.0
+        offset = round((max(times) - time.time()) / 1800) * 1800
+        if abs(offset) > 14 * 3600:
+            # The market is closed and the last tick is old; its time says nothing about the clock
+            self.logger.warning(
+                f"Latest tick on {self.account_id} is too old to measure the server clock; assuming UTC, "
+                f"set server_time_offset_seconds if it is not"
+            )
+            return 0.0
+        self.logger.info(f"Trade server clock on {self.account_id} is UTC{offset / 3600:+g}h")
+        return float(offset)
+
     def shutdown(self):
         """Shutdown MT5 connection"""
-        mt5.shutdown()
+        if self.push_listener is not None:
+            self.push_listener.stop_threadsafe()
+        self.executor.call(mt5.shutdown)
         self.logger.info("MT5 connection shut down.")
         self.connected = False
 
@@ -46,22 +133,129 @@ class MT5Connector:
         if not self.connected:
             self.logger.error("Unable to start monitoring as MT5 connection is not established.")
             return
+        if self.push_listener is not None and (self.push_thread is None or not self.push_thread.is_alive()):
+            self.push_thread = self.push_listener.run_in_thread()
         self.connection_thread = Thread(target=self.trade_monitor)
         self.connection_thread.start()
 
     def trade_monitor(self):
         """Monitor trades in real-time"""
         self.logger.info("Starting trade monitoring...")
+        last_stats_log = time.monotonic()
+        last_reconcile = 0.0
         while self.connected:
-            positions = mt5.positions_get()
-            for position in positions:
-                self.process_trade(position)
-            time.sleep(1)
-
-    def process_trade(self, position):
-        """Process a single trade position"""
-        self.logger.info(f"Processing trade: {position}")
-        # Process trade logic here
+            if self.push_listener is not None and self.push_listener.is_active():
+                # The EA pushes events; polling only reconciles anything the feed missed
+                if time.monotonic() - last_reconcile >= self.reconcile_interval:
+                    self.poll_positions()
+                    last_reconcile = time.monotonic()
+                time.sleep(self.poll_scheduler.max_interval)
+                continue
+
+            activity = False
+            counts = self.executor.batch({
+                "positions_total": (mt5.positions_total, ()),
+                "orders_total": (mt5.orders_total, ()),
+            })
+            if self.poll_scheduler.should_fetch(counts["positions_total"], counts["orders_total"]):
+                activity = self.poll_positions()
+            self.poll_scheduler.record(activity)
+
+            if time.monotonic() - last_stats_log >= self.stats_log_interval:
+                stats = self.poll_scheduler.get_stats()
+                self.logger.info(
+                    f"Polling {self.account_id} at {stats['recent_poll_rate_hz']:.1f} Hz "
+                    f"({stats['full_fetch_rate_hz']:.1f} full fetches/s)"
+                )
+                last_stats_log = time.monotonic()
+
+            time.sleep(self.poll_scheduler.next_interval())
+
+    def poll_positions(self) -> bool:
+        """Fetch all positions and process any changes; returns True if something changed"""
+        fetched_at = time.monotonic()
+        result = self.executor.batch({"positions": self._positions_call(), "last_error": (mt5.last_error, ())})
+        positions = result["positions"]
+        if positions is None:
+            self.logger.warning(f"positions_get failed: {result['last_error']}")
+            return False
+        events = self.position_tracker.update(positions, fetched_at)
+        for event in events:
+            self.process_event(event)
+        return bool(events)
+
+    def _positions_call(self) -> tuple:
+        """positions_get call spec, filtered by the symbol group mask when set"""
+        if self.symbol_group:
+            return (lambda: mt5.positions_get(group=self.symbol_group), ())
+        return (mt5.positions_get, ())
+
+    def _orders_call(self) -> tuple:
+        """orders_get call spec, filtered by the symbol group mask when set"""
+        if self.symbol_group:
+            return (lambda: mt5.orders_get(group=self.symbol_group), ())
+        return (mt5.orders_get, ())
+
+    def read_snapshot(self, symbols: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Read positions, orders, account info and symbol ticks in one I/O-thread hop
+
+        Args:
+            symbols: Symbols to read ticks for
+
+        Returns:
+            Dictionary with "positions", "orders", "account_info" and "ticks"
+        """
+        calls = {
+            "positions": self._positions_call(),
+            "orders": self._orders_call(),
+            "account_info": (mt5.account_info, ()),
+        }
+        for symbol in symbols or []:
+            calls[f"tick:{symbol}"] = (mt5.symbol_info_tick, (symbol,))
+
+        result = self.executor.batch(calls)
+        return {
+            "positions": result["positions"],
+            "orders": result["orders"],
+            "account_info": result["account_info"],
+            "ticks": {symbol: result[f"tick:{symbol}"] for symbol in symbols or []},
+        }
+
+    def get_tick(self, symbol: str) -> Any:
+        """Get the latest tick for a symbol (None if the terminal has none)"""
+        return self.executor.call(mt5.symbol_info_tick, symbol)
+
+    def get_poll_stats(self) -> Dict[str, Any]:
+        """Get achieved polling rate and probe statistics"""
+        return self.poll_scheduler.get_stats()
+
+    def process_event(self, event: Dict[str, Any]):
+        """Process a single position event (OPEN / MODIFY / PARTIAL_CLOSE / CLOSE)"""
+        event["account_id"] = self.account_id
+        event_time = event.get("event_time")
+        now = time.time()
+        if event_time is None:
+            event["event_time"] = now
+        else:
+            event["event_time"] = event_time - (self.server_time_offset or 0.0)
+            if event["event_time"] > now + 1.0 and not self.future_event_warned:
+                # Ages are clamped to 0, so the latency budget would never trigger
+                self.future_event_warned = True
+                self.logger.warning(
+                    f"Position event time on {self.account_id} is {event['event_time'] - now:.0f}s in the future; "
+                    f"server_time_offset_seconds ({self.server_time_offset}) is probably wrong"
+                )
+        position = event["position"]
+        self.logger.info(
+            f"Position {event['event'].name} on {self.account_id}: ticket={event['ticket']} "
+            f"{event['symbol']} volume={position.get('volume')} sl={position.get('sl')} tp={position.get('tp')}"
+        )
+        if self.on_event:
+            try:
+                self.on_event(event)
+            except Exception as e:
+                self.logger.error(f"Error handling position event {event['ticket']}: {e}")
 
     def reconnect(self):
         """Reconnect to MT5 if connection is lost"""
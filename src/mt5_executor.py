@@ -0,0 +1,191 @@
+"""
+MT5 Executor Module
+
+Single dedicated I/O thread for MetaTrader5 API calls.
+- The MetaTrader5 module is not safe for concurrent use, so every call is
+  serialized onto one thread per process
+- Batched reads: several calls (positions, orders, account info, ticks) run
+  back-to-back in one queue hop
+- Blocking, Future-based and awaitable interfaces
+
+MT5-MatchTrader-MVP/src/mt5_executor.py is a copy of this module; keep it in sync.
+"""
+
+import asyncio
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+class MT5Executor:
+    """Runs MetaTrader5 calls one at a time on a dedicated thread"""
+
+    def __init__(self, name: str = "mt5-io"):
+        """
+        Initialize MT5 Executor
+
+        Args:
+            name: Name of the I/O thread
+        """
+        self.name = name
+        self.jobs = queue.Queue()
+        self.thread: Optional[threading.Thread] = None
+        self.start_lock = threading.Lock()
+        self.logger = logging.getLogger(__name__)
+
+        self.calls = 0
+        self.batches = 0
+        self.errors = 0
+        self.busy_seconds = 0.0
+
+    def start(self):
+        """Start the I/O thread if it is not running"""
+        with self.start_lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self.thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        """
+        Stop the I/O thread after the queued jobs have run
+
+        Args:
+            timeout: Seconds to wait for the thread
+        """
+        if self.thread is not None and self.thread.is_alive():
+            self.jobs.put(None)
+            self.thread.join(timeout)
+
+    def _run(self):
+        """I/O thread main loop"""
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                break
+            func, args, kwargs, future = job
+            if not future.set_running_or_notify_cancel():
+                continue
+            started = time.perf_counter()
+            try:
+                future.set_result(func(*args, **kwargs))
+            except BaseException as e:
+                self.errors += 1
+                future.set_exception(e)
+            finally:
+                self.busy_seconds += time.perf_counter() - started
+
+    def in_io_thread(self) -> bool:
+        """Check whether the caller is already running on the I/O thread"""
+        return threading.current_thread() is self.thread
+
+    def submit(self, func: Callable, *args, **kwargs) -> Future:
+        """
+        Queue a call for the I/O thread
+
+        Args:
+            func: MetaTrader5 function (or any callable using it)
+            *args: Positional arguments
+            **kwargs: Keyword arguments
+
+        Returns:
+            Future resolving to the call result
+        """
+        self.start()
+        self.calls += 1
+        future = Future()
+        self.jobs.put((func, args, kwargs, future))
+        return future
+
+    def call(self, func: Callable, *args, **kwargs) -> Any:
+        """
+        Run a call on the I/O thread and wait for the result
+
+        Returns:
+            Call result (exceptions are re-raised in the caller)
+        """
+        if self.in_io_thread():
+            # Nested call from a job already on the I/O thread - run inline
+            self.calls += 1
+            return func(*args, **kwargs)
+        return self.submit(func, *args, **kwargs).result()
+
+    async def call_async(self, func: Callable, *args, **kwargs) -> Any:
+        """
+        Awaitable version of call() that never blocks the event loop
+
+        Returns:
+            Call result
+        """
+        return await asyncio.wrap_future(self.submit(func, *args, **kwargs))
+
+    def _run_batch(self, calls: Dict[str, Tuple]) -> Dict[str, Any]:
+        """Run a batch of calls back-to-back; a failing call yields None"""
+        results = {}
+        for key, spec in calls.items():
+            func, args = spec[0], spec[1] if len(spec) > 1 else ()
+            try:
+                results[key] = func(*args)
+            except Exception as e:
+                self.errors += 1
+                self.logger.error(f"MT5 batch call {key} failed: {e}")
+                results[key] = None
+        return results
+
+    def submit_batch(self, calls: Dict[str, Tuple]) -> Future:
+        """
+        Queue several reads as one job
+
+        Args:
+            calls: Mapping of result key -> (function, args tuple)
+
+        Returns:
+            Future resolving to a mapping of result key -> result
+        """
+        self.batches += 1
+        return self.submit(self._run_batch, calls)
+
+    def batch(self, calls: Dict[str, Tuple]) -> Dict[str, Any]:
+        """Blocking version of submit_batch()"""
+        if self.in_io_thread():
+            return self._run_batch(calls)
+        return self.submit_batch(calls).result()
+
+    async def batch_async(self, calls: Dict[str, Tuple]) -> Dict[str, Any]:
+        """Awaitable version of submit_batch()"""
+        return await asyncio.wrap_future(self.submit_batch(calls))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get executor statistics
+
+        Returns:
+            Dictionary with call counts, queue depth and busy time
+        """
+        return {
+            "calls": self.calls,
+            "batches": self.batches,
+            "errors": self.errors,
+            "queue_depth": self.jobs.qsize(),
+            "busy_seconds": self.busy_seconds,
+        }
+
+
+_default_executor: Optional[MT5Executor] = None
+_default_executor_lock = threading.Lock()
+
+
+def get_mt5_executor() -> MT5Executor:
+    """
+    Get the process-wide MT5 executor (the terminal session is process-wide too)
+
+    Returns:
+        Shared MT5Executor instance
+    """
+    global _default_executor
+    with _default_executor_lock:
+        if _default_executor is None:
+            _default_executor = MT5Executor()
+        return _default_executor
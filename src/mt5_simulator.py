@@ -0,0 +1,511 @@
+"""
+MT5 Simulator Module
+
+Deterministic stand-in for the Windows-only MetaTrader5 package.
+- Implements the read API the connectors use: initialize, login, shutdown,
+  last_error, positions_get/total, orders_get/total, history_deals_get,
+  symbol_info, symbol_info_tick and account_info
+- Returns namedtuples with the same field names as the real package
+- Seeded random trade generator (open / modify / partial close / close) or a
+  scripted event list, driven manually with step() or in real time at a
+  configurable event rate
+- install() registers the simulator as the MetaTrader5 module, so both
+  connectors can be exercised and benchmarked on Linux
+"""
+
+import bisect
+import fnmatch
+import random
+import sys
+import threading
+import time
+import types
+from collections import namedtuple
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional
+
+TradePosition = namedtuple("TradePosition", [
+    "ticket", "time", "time_msc", "time_update", "time_update_msc", "type", "magic",
+    "identifier", "reason", "volume", "price_open", "sl", "tp", "price_current",
+    "swap", "profit", "symbol", "comment", "external_id",
+])
+
+TradeOrder = namedtuple("TradeOrder", [
+    "ticket", "time_setup", "time_setup_msc", "time_done", "time_done_msc", "time_expiration",
+    "type", "type_time", "type_filling", "state", "magic", "position_id", "position_by_id",
+    "reason", "volume_initial", "volume_current", "price_open", "sl", "tp", "price_current",
+    "price_stoplimit", "symbol", "comment", "external_id",
+])
+
+TradeDeal = namedtuple("TradeDeal", [
+    "ticket", "order", "time", "time_msc", "type", "entry", "magic", "position_id", "reason",
+    "volume", "price", "commission", "swap", "profit", "fee", "symbol", "comment", "external_id",
+])
+
+SymbolInfo = namedtuple("SymbolInfo", [
+    "name", "digits", "point", "spread", "bid", "ask", "trade_contract_size",
+    "volume_min", "volume_max", "volume_step", "currency_base", "currency_profit", "visible",
+])
+
+Tick = namedtuple("Tick", ["time", "bid", "ask", "last", "volume", "time_msc", "flags", "volume_real"])
+
+AccountInfo = namedtuple("AccountInfo", [
+    "login", "trade_mode", "leverage", "balance", "credit", "profit", "equity", "margin",
+    "margin_free", "margin_level", "name", "server", "currency", "company",
+])
+
+# Constants the connectors and callers reference
+CONSTANTS = {
+    "ORDER_TYPE_BUY": 0,
+    "ORDER_TYPE_SELL": 1,
+    "POSITION_TYPE_BUY": 0,
+    "POSITION_TYPE_SELL": 1,
+    "DEAL_TYPE_BUY": 0,
+    "DEAL_TYPE_SELL": 1,
+    "DEAL_ENTRY_IN": 0,
+    "DEAL_ENTRY_OUT": 1,
+    "TRADE_ACTION_DEAL": 1,
+    "TRADE_ACTION_SLTP": 6,
+    "TRADE_RETCODE_DONE": 10009,
+    "RES_S_OK": 1,
+    "RES_E_INVALID_PARAMS": -2,
+    "RES_E_AUTH_FAILED": -6,
+    "RES_E_INTERNAL_FAIL_INIT": -10005,
+}
+
+DEFAULT_SYMBOLS = {
+    "EURUSD": (1.10000, 5),
+    "GBPUSD": (1.27000, 5),
+    "USDJPY": (150.000, 3),
+    "XAUUSD": (2000.00, 2),
+}
+
+
+@lru_cache(maxsize=256)
+def _group_filter(group: str):
+    """Compile an MT5 group mask ("EUR*,*USD,!GBPUSD") into include/exclude pattern lists"""
+    include, exclude = [], []
+    for part in group.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if part.startswith("!"):
+            exclude.append(part[1:])
+        else:
+            include.append(part)
+    return tuple(include), tuple(exclude)
+
+
+def _matches_group(symbol: str, group: Optional[str]) -> bool:
+    """Check a symbol against an MT5 group mask"""
+    if not group:
+        return True
+    include, exclude = _group_filter(group)
+    if any(fnmatch.fnmatchcase(symbol, pattern) for pattern in exclude):
+        return False
+    return any(fnmatch.fnmatchcase(symbol, pattern) for pattern in include)
+
+
+def _to_msc(value: Any) -> int:
+    """Convert a datetime (naive datetimes are UTC, like the real package) or seconds to milliseconds"""
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return int(value.timestamp() * 1000)
+    return int(value * 1000)
+
+
+class MT5Simulator:
+    """Simulated MT5 terminal with a deterministic trade generator"""
+
+    def __init__(self,
+                 seed: int = 0,
+                 event_rate: float = 1000.0,
+                 symbols: Optional[Dict[str, tuple]] = None,
+                 max_positions: int = 200,
+                 start_time: Optional[datetime] = None,
+                 script: Optional[Iterable[Dict[str, Any]]] = None,
+                 realtime: bool = False):
+        """
+        Initialize MT5 Simulator
+
+        Args:
+            seed: Random seed; the same seed replays the same event sequence
+            event_rate: Trade events per simulated second
+            symbols: Mapping of symbol -> (starting price, digits)
+            max_positions: Open positions above which the generator stops opening new ones
+            start_time: Simulated clock start (defaults to now)
+            script: Explicit events to play instead of random ones; each is a dict with
+                "action" (open/modify/partial_close/close) and optional fields
+                (ticket, symbol, type, volume, sl, tp)
+            realtime: Generate events from wall-clock time on every API call
+                instead of only on step()
+        """
+        self.random = random.Random(seed)
+        self.event_rate = event_rate
+        self.symbols = dict(symbols or DEFAULT_SYMBOLS)
+        self.max_positions = max_positions
+        self.script = list(script) if script is not None else None
+        self.script_index = 0
+        self.realtime = realtime
+        self.lock = threading.RLock()
+
+        self.start_msc = _to_msc(start_time) if start_time is not None else int(time.time() * 1000)
+        self.clock_msc = self.start_msc
+        self.started_at = time.monotonic()
+        self.event_interval_msc = 1000.0 / event_rate if event_rate > 0 else 0.0
+
+        self.prices = {symbol: price for symbol, (price, _) in self.symbols.items()}
+        self.positions: Dict[int, TradePosition] = {}
+        self.orders: Dict[int, TradeOrder] = {}
+        self.deals: List[TradeDeal] = []
+        self.deal_times: List[int] = []
+        self.next_ticket = 100000
+        self.balance = 100000.0
+
+        self.initialized = False
+        self.login_id = 0
+        self.server = "Simulator-Demo"
+        self.error = (CONSTANTS["RES_S_OK"], "Success")
+
+        self.events_generated = 0
+        self.api_calls = 0
+
+    # Terminal session
+
+    def initialize(self, path: Optional[str] = None, login: Optional[int] = None, password: Optional[str] = None,
+                   server: Optional[str] = None, timeout: Optional[int] = None, portable: bool = False) -> bool:
+        """Open the simulated terminal session"""
+        with self.lock:
+            self.initialized = True
+            if login:
+                self.login_id = int(login)
+            if server:
+                self.server = server
+            self.error = (CONSTANTS["RES_S_OK"], "Success")
+            return True
+
+    def login(self, login: int, password: Optional[str] = None, server: Optional[str] = None,
+              timeout: Optional[int] = None) -> bool:
+        """Log into an account on the simulated terminal"""
+        with self.lock:
+            if not self.initialized:
+                self.error = (CONSTANTS["RES_E_INTERNAL_FAIL_INIT"], "Terminal not initialized")
+                return False
+            self.login_id = int(login)
+            if server:
+                self.server = server
+            return True
+
+    def shutdown(self) -> bool:
+        """Close the simulated terminal session"""
+        with self.lock:
+            self.initialized = False
+            return True
+
+    def last_error(self) -> tuple:
+        """Result code and description of the last failed call"""
+        return self.error
+
+    def _check(self) -> bool:
+        """Common per-call bookkeeping; False when the terminal is not initialized"""
+        self.api_calls += 1
+        if not self.initialized:
+            self.error = (CONSTANTS["RES_E_INTERNAL_FAIL_INIT"], "Terminal not initialized")
+            return False
+        if self.realtime:
+            self._catch_up()
+        return True
+
+    # Read API
+
+    def positions_total(self) -> Optional[int]:
+        with self.lock:
+            return len(self.positions) if self._check() else None
+
+    def positions_get(self, symbol: Optional[str] = None, group: Optional[str] = None,
+                      ticket: Optional[int] = None) -> Optional[tuple]:
+        with self.lock:
+            if not self._check():
+                return None
+            if ticket is not None:
+                position = self.positions.get(ticket)
+                return (position,) if position is not None else ()
+            return tuple(
+                p for p in self.positions.values()
+                if (symbol is None or p.symbol == symbol) and _matches_group(p.symbol, group)
+            )
+
+    def orders_total(self) -> Optional[int]:
+        with self.lock:
+            return len(self.orders) if self._check() else None
+
+    def orders_get(self, symbol: Optional[str] = None, group: Optional[str] = None,
+                   ticket: Optional[int] = None) -> Optional[tuple]:
+        with self.lock:
+            if not self._check():
+                return None
+            if ticket is not None:
+                order = self.orders.get(ticket)
+                return (order,) if order is not None else ()
+            return tuple(
+                o for o in self.orders.values()
+                if (symbol is None or o.symbol == symbol) and _matches_group(o.symbol, group)
+            )
+
+    def history_deals_get(self, date_from: Any = None, date_to: Any = None, group: Optional[str] = None,
+                          ticket: Optional[int] = None, position: Optional[int] = None) -> Optional[tuple]:
+        with self.lock:
+            if not self._check():
+                return None
+            if ticket is not None:
+                return tuple(d for d in self.deals if d.order == ticket)
+            if position is not None:
+                return tuple(d for d in self.deals if d.position_id == position)
+            if date_from is None or date_to is None:
+                self.error = (CONSTANTS["RES_E_INVALID_PARAMS"], "Invalid arguments")
+                return None
+            # Deals are appended in time order, so the range is a bisect slice
+            low = bisect.bisect_left(self.deal_times, _to_msc(date_from))
+            high = bisect.bisect_right(self.deal_times, _to_msc(date_to))
+            return tuple(d for d in self.deals[low:high] if _matches_group(d.symbol, group))
+
+    def symbol_info(self, symbol: str) -> Optional[SymbolInfo]:
+        with self.lock:
+            if not self._check() or symbol not in self.symbols:
+                return None
+            digits = self.symbols[symbol][1]
+            point = 10 ** -digits
+            bid, ask = self._quote(symbol)
+            return SymbolInfo(
+                name=symbol, digits=digits, point=point, spread=round((ask - bid) / point),
+                bid=bid, ask=ask, trade_contract_size=100000.0 if digits >= 3 else 100.0,
+                volume_min=0.01, volume_max=100.0, volume_step=0.01,
+                currency_base=symbol[:3], currency_profit=symbol[3:], visible=True,
+            )
+
+    def symbol_info_tick(self, symbol: str) -> Optional[Tick]:
+        with self.lock:
+            if not self._check() or symbol not in self.symbols:
+                return None
+            bid, ask = self._quote(symbol)
+            return Tick(time=self.clock_msc // 1000, bid=bid, ask=ask, last=0.0, volume=0,
+                        time_msc=self.clock_msc, flags=6, volume_real=0.0)
+
+    def account_info(self) -> Optional[AccountInfo]:
+        with self.lock:
+            if not self._check():
+                return None
+            profit = round(sum(p.profit for p in self.positions.values()), 2)
+            margin = round(sum(p.volume for p in self.positions.values()) * 1000.0, 2)
+            equity = round(self.balance + profit, 2)
+            return AccountInfo(
+                login=self.login_id, trade_mode=0, leverage=100, balance=round(self.balance, 2), credit=0.0,
+                profit=profit, equity=equity, margin=margin, margin_free=round(equity - margin, 2),
+                margin_level=round(equity / margin * 100, 2) if margin else 0.0,
+                name="Simulated Account", server=self.server, currency="USD", company="MT5 Simulator",
+            )
+
+    # Trade generator
+
+    def step(self, count: int = 1) -> int:
+        """
+        Advance the simulated clock by `count` events
+
+        Args:
+            count: Number of trade events to generate
+
+        Returns:
+            Number of events generated (fewer once a script runs out)
+        """
+        generated = 0
+        with self.lock:
+            for _ in range(count):
+                self.clock_msc = self.start_msc + int((self.events_generated + 1) * self.event_interval_msc)
+                if not self._next_event():
+                    break
+                self.events_generated += 1
+                generated += 1
+        return generated
+
+    def _catch_up(self):
+        """Realtime mode: generate every event due since the simulator started"""
+        elapsed = time.monotonic() - self.started_at
+        due = int(elapsed * self.event_rate) - self.events_generated
+        if due > 0:
+            self.step(due)
+        self.clock_msc = self.start_msc + int(elapsed * 1000)
+
+    def _next_event(self) -> bool:
+        """Apply the next scripted or random event"""
+        if self.script is not None:
+            if self.script_index >= len(self.script):
+                return False
+            event = self.script[self.script_index]
+            self.script_index += 1
+            self._apply(dict(event))
+            return True
+
+        self._walk_prices()
+        roll = self.random.random()
+        if not self.positions or (roll < 0.4 and len(self.positions) < self.max_positions):
+            action = "open"
+        elif roll < 0.75:
+            action = "modify"
+        elif roll < 0.85:
+            action = "partial_close"
+        else:
+            action = "close"
+        self._apply({"action": action})
+        return True
+
+    def _walk_prices(self):
+        """Random-walk every symbol price by up to 2 points"""
+        for symbol, (_, digits) in self.symbols.items():
+            point = 10 ** -digits
+            self.prices[symbol] = round(self.prices[symbol] + self.random.randint(-2, 2) * point, digits)
+
+    def _quote(self, symbol: str) -> tuple:
+        """Current (bid, ask) for a symbol with a fixed 10-point spread"""
+        digits = self.symbols[symbol][1]
+        bid = self.prices[symbol]
+        return bid, round(bid + 10 * 10 ** -digits, digits)
+
+    def _apply(self, event: Dict[str, Any]):
+        """Apply one trade event to the simulated account"""
+        action = event["action"]
+        if action == "open":
+            self._open(event)
+            return
+
+        ticket = event.get("ticket")
+        if ticket is None:
+            ticket = self.random.choice(list(self.positions))
+        position = self.positions.get(ticket)
+        if position is None:
+            return
+
+        if action == "modify":
+            digits = self.symbols[position.symbol][1]
+            offset = self.random.randint(50, 500) * 10 ** -digits
+            sign = 1 if position.type == CONSTANTS["POSITION_TYPE_BUY"] else -1
+            self.positions[ticket] = self._refresh(
+                position,
+                sl=event.get("sl", round(position.price_open - sign * offset, digits)),
+                tp=event.get("tp", round(position.price_open + sign * offset * 2, digits)),
+            )
+        elif action == "partial_close":
+            volume = event.get("volume", round(position.volume / 2, 2))
+            if volume <= 0 or volume >= position.volume:
+                self._close(position, position.volume)
+            else:
+                self._close(position, volume)
+        elif action == "close":
+            self._close(position, position.volume)
+        else:
+            raise ValueError(f"Unknown simulator action: {action}")
+
+    def _open(self, event: Dict[str, Any]):
+        """Open a new position and record its entry deal"""
+        symbol = event.get("symbol") or self.random.choice(list(self.symbols))
+        position_type = event.get("type", self.random.randint(0, 1))
+        volume = event.get("volume", self.random.randint(1, 200) / 100)
+        bid, ask = self._quote(symbol)
+        price = ask if position_type == CONSTANTS["POSITION_TYPE_BUY"] else bid
+        ticket = event.get("ticket") or self._new_ticket()
+        now = self.clock_msc
+        self.positions[ticket] = TradePosition(
+            ticket=ticket, time=now // 1000, time_msc=now, time_update=now // 1000, time_update_msc=now,
+            type=position_type, magic=0, identifier=ticket, reason=0, volume=volume,
+            price_open=price, sl=event.get("sl", 0.0), tp=event.get("tp", 0.0), price_current=price,
+            swap=0.0, profit=0.0, symbol=symbol, comment="", external_id="",
+        )
+        self._record_deal(ticket, symbol, position_type, CONSTANTS["DEAL_ENTRY_IN"], volume, price, 0.0)
+
+    def _close(self, position: TradePosition, volume: float):
+        """Close some or all of a position and record its exit deal"""
+        bid, ask = self._quote(position.symbol)
+        buy = position.type == CONSTANTS["POSITION_TYPE_BUY"]
+        price = bid if buy else ask
+        profit = round((price - position.price_open) * (1 if buy else -1) * volume * 100000, 2)
+        self.balance += profit
+        remaining = round(position.volume - volume, 2)
+        if remaining > 0:
+            self.positions[position.ticket] = self._refresh(position, volume=remaining)
+        else:
+            del self.positions[position.ticket]
+        self._record_deal(position.ticket, position.symbol, 1 - position.type, CONSTANTS["DEAL_ENTRY_OUT"],
+                          volume, price, profit)
+
+    def _refresh(self, position: TradePosition, **changes) -> TradePosition:
+        """Copy a position with new fields, current price/profit and update time"""
+        bid, ask = self._quote(position.symbol)
+        buy = position.type == CONSTANTS["POSITION_TYPE_BUY"]
+        price = bid if buy else ask
+        volume = changes.get("volume", position.volume)
+        profit = round((price - position.price_open) * (1 if buy else -1) * volume * 100000, 2)
+        return position._replace(price_current=price, profit=profit, time_update=self.clock_msc // 1000,
+                                 time_update_msc=self.clock_msc, **changes)
+
+    def _record_deal(self, position_id: int, symbol: str, deal_type: int, entry: int, volume: float,
+                     price: float, profit: float):
+        """Append a deal to the history"""
+        ticket = self._new_ticket()
+        self.deals.append(TradeDeal(
+            ticket=ticket, order=ticket, time=self.clock_msc // 1000, time_msc=self.clock_msc, type=deal_type,
+            entry=entry, magic=0, position_id=position_id, reason=0, volume=volume, price=price,
+            commission=0.0, swap=0.0, profit=profit, fee=0.0, symbol=symbol, comment="", external_id="",
+        ))
+        self.deal_times.append(self.clock_msc)
+
+    def _new_ticket(self) -> int:
+        self.next_ticket += 1
+        return self.next_ticket
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get simulator statistics
+
+        Returns:
+            Dictionary with generated events, API calls, open positions and deals
+        """
+        with self.lock:
+            return {
+                "events_generated": self.events_generated,
+                "api_calls": self.api_calls,
+                "open_positions": len(self.positions),
+                "deals": len(self.deals),
+            }
+
+
+API_FUNCTIONS = (
+    "initialize", "login", "shutdown", "last_error", "positions_total", "positions_get",
+    "orders_total", "orders_get", "history_deals_get", "symbol_info", "symbol_info_tick", "account_info",
+)
+
+
+def install(simulator: Optional[MT5Simulator] = None) -> MT5Simulator:
+    """
+    Register a simulator as the MetaTrader5 module
+
+    Call before the connectors are imported. Installing again rebinds the same
+    module object, so already-imported connectors switch to the new simulator.
+
+    Args:
+        simulator: Simulator to expose (a default one is created if omitted)
+
+    Returns:
+        The installed simulator
+    """
+    simulator = simulator or MT5Simulator()
+    module = sys.modules.get("MetaTrader5")
+    if module is None or not hasattr(module, "simulator"):
+        module = types.ModuleType("MetaTrader5", "Simulated MetaTrader5 module")
+        sys.modules["MetaTrader5"] = module
+    for name in API_FUNCTIONS:
+        setattr(module, name, getattr(simulator, name))
+    for name, value in CONSTANTS.items():
+        setattr(module, name, value)
+    module.simulator = simulator
+    return simulator
@@ -0,0 +1,304 @@
+"""
+MT5 Worker Pool Module
+
+Runs one MT5 terminal session per subprocess.
+- The MetaTrader5 module is process-global: every mt5.initialize() replaces the
+  previous session, so several master accounts cannot share one process
+- Each worker owns one MT5Connector and streams its position events to the parent
+  over a multiprocessing queue (pipe-backed)
+- The parent supervises workers: heartbeat checks, restart with back-off, give-up limit
+- The parent keeps the last reported positions per account and seeds a restarted
+  worker with them, so a restart does not re-copy every open position
+
+Every account needs its own terminal installation (terminal_path), since one
+terminal instance can only be logged into one account at a time.
+"""
+
+import logging
+import multiprocessing
+import queue
+import time
+from threading import Thread, Lock
+from typing import Any, Callable, Dict, Optional
+
+try:
+    from .position_tracker import PositionEventType
+except ImportError:
+    from position_tracker import PositionEventType
+
+
+def mt5_worker_main(account_id: str, connector_kwargs: Dict[str, Any], event_queue, stop_event,
+                    heartbeat_interval: float):
+    """
+    Worker process entry point: run one MT5Connector and forward its events
+
+    Args:
+        account_id: MT5 account handled by this worker
+        connector_kwargs: Keyword arguments for MT5Connector
+        event_queue: Queue shared with the parent
+        stop_event: Set by the parent to request a clean shutdown
+        heartbeat_interval: Seconds between heartbeat messages
+    """
+    # Import inside the child so the terminal session belongs to this process only
+    try:
+        from .mt5_connector import MT5Connector
+    except ImportError:
+        from mt5_connector import MT5Connector
+
+    def forward(event: Dict[str, Any]):
+        # Send the enum by value so the parent does not depend on the child's import path
+        event_queue.put((account_id, "event", dict(event, event=event["event"].value)))
+
+    connector = MT5Connector(account_id=account_id, on_event=forward, **connector_kwargs)
+    if not connector.initialize():
+        event_queue.put((account_id, "error", "MT5 initialization failed"))
+        return
+
+    connector.start_trade_monitor()
+    try:
+        while not stop_event.wait(heartbeat_interval):
+            event_queue.put((account_id, "heartbeat", connector.get_poll_stats()))
+            if connector.connection_thread is not None and not connector.connection_thread.is_alive():
+                event_queue.put((account_id, "error", "Trade monitor thread died"))
+                break
+    finally:
+        connector.shutdown()
+
+
+class MT5WorkerPool:
+    """Supervises one MT5 worker process per account"""
+
+    def __init__(self,
+                 on_event: Callable[[Dict[str, Any]], None],
+                 max_restarts: int = 5,
+                 restart_backoff: float = 5.0,
+                 heartbeat_interval: float = 5.0,
+                 heartbeat_timeout: float = 30.0,
+                 worker_target: Callable = mt5_worker_main):
+        """
+        Initialize MT5 Worker Pool
+
+        Args:
+            on_event: Callback for every position event from any worker
+            max_restarts: Restarts per worker before it is marked failed
+            restart_backoff: Minimum seconds between restarts of the same worker
+            heartbeat_interval: Seconds between worker heartbeats
+            heartbeat_timeout: Seconds without a heartbeat before a worker is restarted
+            worker_target: Worker entry point (replaceable for testing)
+        """
+        self.on_event = on_event
+        self.max_restarts = max_restarts
+        self.restart_backoff = restart_backoff
+        self.heartbeat_interval = heartbeat_interval
+        self.heartbeat_timeout = heartbeat_timeout
+        self.worker_target = worker_target
+
+        # Spawn everywhere: matches Windows (where MT5 runs) and avoids forking threads
+        self.context = multiprocessing.get_context("spawn")
+        self.event_queue = self.context.Queue()
+        self.workers: Dict[str, Dict[str, Any]] = {}
+        self.lock = Lock()
+        self.running = False
+        self.threads = []
+        self.logger = logging.getLogger(__name__)
+
+    def add_account(self, account_id: str, **connector_kwargs):
+        """
+        Register an MT5 account to run in its own worker
+
+        Args:
+            account_id: MT5 account ID
+            **connector_kwargs: MT5Connector arguments (server, login, password, terminal_path, ...)
+        """
+        self.workers[account_id] = {
+            "kwargs": connector_kwargs,
+            "process": None,
+            "stop_event": None,
+            "restarts": 0,
+            "started_at": 0.0,
+            "last_heartbeat": 0.0,
+            "last_error": None,
+            "failed": False,
+            "stats": {},
+            # ticket -> last reported position, handed to the worker on restart
+            "positions": {},
+        }
+
+    def start(self):
+        """Start all workers and the supervision threads"""
+        self.running = True
+        for account_id in self.workers:
+            self._start_worker(account_id)
+
+        self.threads = [
+            Thread(target=self._dispatch_loop, daemon=True),
+            Thread(target=self._supervise_loop, daemon=True),
+        ]
+        for thread in self.threads:
+            thread.start()
+        self.logger.info(f"MT5 worker pool started with {len(self.workers)} workers")
+
+    def _start_worker(self, account_id: str):
+        """Spawn (or respawn) the worker process for one account (called without the lock held)"""
+        worker = self.workers[account_id]
+        with self.lock:
+            connector_kwargs = worker["kwargs"]
+            known_positions = [position for position in worker["positions"].values() if position]
+        if known_positions:
+            connector_kwargs = dict(connector_kwargs, known_positions=known_positions)
+        stop_event = self.context.Event()
+        process = self.context.Process(
+            target=self.worker_target,
+            args=(account_id, connector_kwargs, self.event_queue, stop_event, self.heartbeat_interval),
+            name=f"mt5-worker-{account_id}",
+            daemon=True,
+        )
+        process.start()
+        with self.lock:
+            worker.update(process=process, stop_event=stop_event,
+                          started_at=time.monotonic(), last_heartbeat=time.monotonic())
+        self.logger.info(f"Started MT5 worker for {account_id} (pid {process.pid})")
+
+    def _dispatch_loop(self):
+        """Forward worker messages to the event callback"""
+        while self.running:
+            try:
+                account_id, kind, payload = self.event_queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            except (EOFError, OSError):
+                break
+
+            worker = self.workers.get(account_id)
+            if worker is None:
+                continue
+
+            if kind == "event":
+                payload["event"] = PositionEventType(payload["event"])
+                payload["account_id"] = account_id
+                worker["last_heartbeat"] = time.monotonic()
+                if not self._track(worker, payload):
+                    continue
+                try:
+                    self.on_event(payload)
+                except Exception as e:
+                    self.logger.error(f"Error handling event from worker {account_id}: {e}")
+            elif kind == "heartbeat":
+                worker["last_heartbeat"] = time.monotonic()
+                worker["stats"] = payload
+            elif kind == "error":
+                worker["last_error"] = payload
+                self.logger.error(f"MT5 worker {account_id}: {payload}")
+
+    def _track(self, worker: Dict[str, Any], event: Dict[str, Any]) -> bool:
+        """
+        Update the worker's known positions from an event
+
+        Args:
+            worker: Worker state
+            event: Position event from the worker
+
+        Returns:
+            False for an OPEN of a ticket already reported (replayed by a restarted worker)
+        """
+        ticket = event.get("ticket")
+        with self.lock:
+            positions = worker["positions"]
+            if event["event"] == PositionEventType.CLOSE:
+                positions.pop(ticket, None)
+                return True
+            known = ticket in positions
+            positions[ticket] = event.get("position") or positions.get(ticket)
+        if known and event["event"] == PositionEventType.OPEN:
+            self.logger.info(f"Ignoring replayed OPEN for ticket {ticket}")
+            return False
+        return True
+
+    def _supervise_loop(self):
+        """
+        Restart dead or hung workers with back-off
+
+        Only the restart decision is made under the lock; terminating, joining and
+        spawning happen outside it so event dispatch for other accounts keeps flowing.
+        """
+        while self.running:
+            now = time.monotonic()
+            restarts = []
+            with self.lock:
+                for account_id, worker in self.workers.items():
+                    process = worker["process"]
+                    if worker["failed"] or process is None:
+                        continue
+
+                    hung = now - worker["last_heartbeat"] > self.heartbeat_timeout
+                    if process.is_alive() and not hung:
+                        continue
+                    if now - worker["started_at"] < self.restart_backoff:
+                        continue
+
+                    if worker["restarts"] >= self.max_restarts:
+                        worker["failed"] = True
+                        self.logger.error(f"MT5 worker {account_id} failed {worker['restarts']} restarts, giving up")
+                    else:
+                        worker["restarts"] += 1
+                    restarts.append((account_id, worker, process, hung))
+
+            for account_id, worker, process, hung in restarts:
+                if hung and process.is_alive():
+                    self.logger.warning(f"MT5 worker {account_id} missed heartbeats, terminating")
+                    process.terminate()
+                    process.join(5)
+                if worker["failed"] or not self.running:
+                    continue
+                self.logger.warning(
+                    f"Restarting MT5 worker {account_id} (exit code {process.exitcode}, "
+                    f"restart {worker['restarts']}/{self.max_restarts})"
+                )
+                self._start_worker(account_id)
+            time.sleep(0.5)
+
+    def stop(self, timeout: float = 10.0):
+        """
+        Stop all workers
+
+        Args:
+            timeout: Seconds to wait for each worker before terminating it
+        """
+        self.running = False
+        with self.lock:
+            for worker in self.workers.values():
+                if worker["stop_event"] is not None:
+                    worker["stop_event"].set()
+            processes = [(account_id, worker["process"]) for account_id, worker in self.workers.items()]
+        for account_id, process in processes:
+            if process is None:
+                continue
+            process.join(timeout)
+            if process.is_alive():
+                self.logger.warning(f"MT5 worker {account_id} did not stop, terminating")
+                process.terminate()
+        for thread in self.threads:
+            thread.join(timeout)
+        self.logger.info("MT5 worker pool stopped")
+
+    def get_status(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get status of all workers
+
+        Returns:
+            Dictionary with process state, restarts and last poll stats per account
+        """
+        now = time.monotonic()
+        status = {}
+        for account_id, worker in self.workers.items():
+            process = worker["process"]
+            status[account_id] = {
+                "alive": bool(process is not None and process.is_alive()),
+                "pid": process.pid if process is not None else None,
+                "restarts": worker["restarts"],
+                "failed": worker["failed"],
+                "last_error": worker["last_error"],
+                "seconds_since_heartbeat": now - worker["last_heartbeat"],
+                "poll_stats": worker["stats"],
+            }
+        return status
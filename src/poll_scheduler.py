@@ -0,0 +1,133 @@
+"""
+Poll Scheduler Module
+
+Adaptive polling cadence for the MT5 trade monitor.
+- Fast polling (10 ms and up) while there is trade activity
+- Exponential back-off to the latency budget when idle
+- Cheap positions_total()/orders_total() probes gate full positions_get() calls
+- Reports the polling rate actually achieved
+"""
+
+import logging
+import time
+from collections import deque
+from typing import Any, Dict, Optional
+
+
+class AdaptivePollScheduler:
+    """Decides when to poll MT5 and whether a full positions fetch is needed"""
+
+    def __init__(self,
+                 max_latency_ms: int = 100,
+                 min_interval_ms: int = 10,
+                 backoff_factor: float = 2.0,
+                 active_window_ms: int = 1000,
+                 full_refresh_ms: int = 500):
+        """
+        Initialize Poll Scheduler
+
+        Args:
+            max_latency_ms: Latency budget; the idle poll interval never exceeds it
+            min_interval_ms: Poll interval used while trades are active
+            backoff_factor: Interval multiplier applied on every idle poll
+            active_window_ms: How long after the last activity every poll does a full fetch
+            full_refresh_ms: Longest time between full fetches when the probes show no change;
+                bounds detection of SL/TP edits and partial closes on an idle book
+        """
+        self.max_interval = max_latency_ms / 1000.0
+        self.min_interval = min(min_interval_ms / 1000.0, self.max_interval)
+        self.backoff_factor = backoff_factor
+        self.active_window = active_window_ms / 1000.0
+        self.full_refresh = max(full_refresh_ms / 1000.0, self.max_interval)
+
+        self.interval = self.min_interval
+        self.last_counts = None
+        self.last_full_fetch = 0.0
+        self.last_activity = 0.0
+
+        self.polls = 0
+        self.full_fetches = 0
+        self.started_at = time.monotonic()
+        self.recent_polls = deque(maxlen=200)
+        self.logger = logging.getLogger(__name__)
+
+    def should_fetch(self, positions_total: Optional[int], orders_total: Optional[int]) -> bool:
+        """
+        Decide whether this poll needs a full positions_get()
+
+        Args:
+            positions_total: Result of mt5.positions_total() (None if the call failed)
+            orders_total: Result of mt5.orders_total() (None if the call failed)
+
+        Returns:
+            True if a full fetch should be done now
+        """
+        now = time.monotonic()
+        self.polls += 1
+        self.recent_polls.append(now)
+
+        counts = (positions_total, orders_total)
+        counts_changed = positions_total is None or orders_total is None or counts != self.last_counts
+        self.last_counts = counts
+
+        if counts_changed:
+            self.last_activity = now
+
+        if (counts_changed
+                or now - self.last_activity < self.active_window
+                or now - self.last_full_fetch >= self.full_refresh):
+            self.last_full_fetch = now
+            self.full_fetches += 1
+            return True
+        return False
+
+    def record(self, activity: bool):
+        """
+        Record the outcome of a poll and adapt the interval
+
+        Args:
+            activity: True if the poll found position changes
+        """
+        now = time.monotonic()
+        if activity:
+            self.last_activity = now
+
+        if now - self.last_activity < self.active_window:
+            self.interval = self.min_interval
+        else:
+            self.interval = min(self.interval * self.backoff_factor, self.max_interval)
+
+    def next_interval(self) -> float:
+        """
+        Get the delay before the next poll
+
+        Returns:
+            Delay in seconds
+        """
+        return self.interval
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get polling statistics
+
+        Returns:
+            Dictionary with achieved poll rate, full fetch rate and current interval
+        """
+        now = time.monotonic()
+        elapsed = max(now - self.started_at, 1e-9)
+
+        recent_rate = 0.0
+        if len(self.recent_polls) > 1:
+            window = self.recent_polls[-1] - self.recent_polls[0]
+            if window > 0:
+                recent_rate = (len(self.recent_polls) - 1) / window
+
+        return {
+            "polls": self.polls,
+            "full_fetches": self.full_fetches,
+            "probe_only_polls": self.polls - self.full_fetches,
+            "average_poll_rate_hz": self.polls / elapsed,
+            "recent_poll_rate_hz": recent_rate,
+            "full_fetch_rate_hz": self.full_fetches / elapsed,
+            "current_interval_ms": self.interval * 1000.0,
+        }
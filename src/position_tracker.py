@@ -0,0 +1,230 @@
+"""
+Position Tracker Module
+
+Turns successive MT5 position snapshots into typed position events.
+- Snapshots keyed by ticket
+- Change detection on volume, SL, TP and last update time
+- Emits OPEN / MODIFY / PARTIAL_CLOSE / CLOSE events only when something changed
+- Accepts single pushed updates as well as full polled snapshots
+"""
+
+import logging
+import threading
+import time
+from enum import Enum
+from types import SimpleNamespace
+from typing import Any, Dict, Iterable, List, Optional
+
+
+class PositionEventType(Enum):
+    """Position event types"""
+    OPEN = "open"
+    MODIFY = "modify"
+    PARTIAL_CLOSE = "partial_close"
+    CLOSE = "close"
+
+
+def position_to_dict(position: Any) -> Dict[str, Any]:
+    """
+    Convert an MT5 position (namedtuple or plain object) into a dictionary
+
+    Args:
+        position: Position as returned by positions_get or decoded from a push message
+
+    Returns:
+        Dictionary of position fields
+    """
+    if hasattr(position, "_asdict"):
+        return dict(position._asdict())
+    if isinstance(position, dict):
+        return dict(position)
+    return dict(vars(position))
+
+
+class PositionTracker:
+    """Keeps the last known position snapshot and diffs new snapshots against it"""
+
+    def __init__(self):
+        # ticket -> (volume, sl, tp, time_update_msc, position, pushed_at)
+        self.snapshot: Dict[int, tuple] = {}
+        # ticket -> pushed_at for closes pushed since the last full update
+        self.recently_removed: Dict[int, float] = {}
+        self.lock = threading.Lock()
+        self.logger = logging.getLogger(__name__)
+
+    @staticmethod
+    def _state(position: Any) -> tuple:
+        """Fields that define a change in a position"""
+        return (position.volume, position.sl, position.tp, position.time_update_msc)
+
+    def update(self, positions: Optional[Iterable[Any]], fetched_at: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Diff a full positions snapshot against the previous one
+
+        Args:
+            positions: Result of mt5.positions_get(); None means the call failed
+            fetched_at: time.monotonic() taken just before the fetch; tickets pushed
+                through apply()/remove() after that moment are newer than the snapshot
+                and are left untouched
+
+        Returns:
+            List of position events, empty when nothing changed
+        """
+        if positions is None:
+            # A failed terminal call is not an empty book - keep the old snapshot
+            return []
+
+        events = []
+        current = {}
+
+        with self.lock:
+            previous_snapshot = self.snapshot
+
+            for position in positions:
+                previous = previous_snapshot.get(position.ticket)
+                if fetched_at is not None:
+                    if previous is not None and previous[5] > fetched_at:
+                        current[position.ticket] = previous
+                        continue
+                    if self.recently_removed.get(position.ticket, 0.0) > fetched_at:
+                        # Closed by a push after the fetch started
+                        continue
+
+                state = self._state(position)
+                current[position.ticket] = state + (position, 0.0)
+
+                if previous is None:
+                    events.append(self._make_event(PositionEventType.OPEN, position, None))
+                elif previous[:4] != state:
+                    event = self._classify(previous, position)
+                    if event is not None:
+                        events.append(event)
+
+            for ticket in previous_snapshot.keys() - current.keys():
+                previous = previous_snapshot[ticket]
+                if fetched_at is not None and previous[5] > fetched_at:
+                    current[ticket] = previous
+                    continue
+                events.append(self._make_event(PositionEventType.CLOSE, previous[4], previous))
+
+            self.recently_removed = {}
+
+            self.snapshot = current
+        return events
+
+    def apply(self, position: Any) -> List[Dict[str, Any]]:
+        """
+        Apply a single pushed position update without a full snapshot
+
+        Args:
+            position: Current state of one position
+
+        Returns:
+            List with the resulting event, empty when nothing changed
+        """
+        state = self._state(position)
+        with self.lock:
+            previous = self.snapshot.get(position.ticket)
+            self.snapshot[position.ticket] = state + (position, time.monotonic())
+
+            if previous is None:
+                return [self._make_event(PositionEventType.OPEN, position, None)]
+            if previous[:4] == state:
+                return []
+            event = self._classify(previous, position)
+            return [event] if event is not None else []
+
+    def remove(self, ticket: int) -> List[Dict[str, Any]]:
+        """
+        Apply a single pushed position close
+
+        Args:
+            ticket: Ticket of the closed position
+
+        Returns:
+            List with the CLOSE event, empty if the ticket was not tracked
+        """
+        with self.lock:
+            previous = self.snapshot.pop(ticket, None)
+            self.recently_removed[ticket] = time.monotonic()
+        if previous is None:
+            return []
+        return [self._make_event(PositionEventType.CLOSE, previous[4], previous)]
+
+    def _classify(self, previous: tuple, position: Any) -> Optional[Dict[str, Any]]:
+        """
+        Classify a changed position
+
+        Args:
+            previous: Previous snapshot entry for the ticket
+            position: Current position
+
+        Returns:
+            PARTIAL_CLOSE or MODIFY event, or None if only the update time moved
+        """
+        prev_volume, prev_sl, prev_tp = previous[0], previous[1], previous[2]
+
+        if position.volume < prev_volume:
+            return self._make_event(PositionEventType.PARTIAL_CLOSE, position, previous)
+
+        if position.volume != prev_volume or position.sl != prev_sl or position.tp != prev_tp:
+            return self._make_event(PositionEventType.MODIFY, position, previous)
+
+        # Only time_update_msc changed (e.g. swap or price re-calculation) - nothing to copy
+        return None
+
+    @staticmethod
+    def _make_event(event_type: PositionEventType, position: Any, previous: Optional[tuple]) -> Dict[str, Any]:
+        """Build a position event dictionary"""
+        event = {
+            "event": event_type,
+            "ticket": position.ticket,
+            "symbol": position.symbol,
+            "position": position_to_dict(position),
+            "previous": None,
+            # MT5 time of the change on the trade server clock; a close leaves no time on
+            # the position, so the connector stamps it with the detection time instead
+            "event_time": None,
+        }
+        if event_type != PositionEventType.CLOSE and getattr(position, "time_update_msc", None):
+            event["event_time"] = position.time_update_msc / 1000.0
+        if previous is not None:
+            event["previous"] = {"volume": previous[0], "sl": previous[1], "tp": previous[2]}
+            if event_type == PositionEventType.PARTIAL_CLOSE:
+                event["closed_volume"] = round(previous[0] - position.volume, 8)
+            elif event_type == PositionEventType.CLOSE:
+                event["closed_volume"] = previous[0]
+        return event
+
+    def seed(self, positions: Iterable[Dict[str, Any]]):
+        """
+        Load a previously known snapshot without emitting events
+
+        Used when a connector restarts: the next update only reports what changed
+        since the seeded state instead of re-reporting every position as OPEN.
+
+        Args:
+            positions: Position dictionaries as carried in earlier events
+        """
+        with self.lock:
+            self.snapshot = {}
+            for position in positions:
+                position = SimpleNamespace(**position)
+                self.snapshot[position.ticket] = self._state(position) + (position, 0.0)
+            self.recently_removed = {}
+
+    def reset(self):
+        """Forget the current snapshot (next update reports every position as OPEN)"""
+        with self.lock:
+            self.snapshot = {}
+            self.recently_removed = {}
+
+    def get_open_tickets(self) -> List[int]:
+        """
+        Get tickets of all positions in the current snapshot
+
+        Returns:
+            List of open position tickets
+        """
+        with self.lock:
+            return list(self.snapshot.keys())
@@ -5,9 +5,13 @@ Implements retry logic with exponential backoff and circuit breaker pattern.
 - Exponential backoff for failed operations
 - Circuit breaker to prevent cascading failures
 - Configurable retry strategies
+- Async counterpart (asyncio.sleep, cancellation, deadline) sharing the same
+  circuit breaker state as the sync path
 """
 
+import asyncio
 import logging
+import threading
 import time
 import functools
 from typing import Callable, Any, Optional, Dict, Tuple
@@ -56,8 +60,10 @@ class RetryManager:
         
         self.logger = logging.getLogger(__name__)
         
-        # Circuit breaker state tracking
+        # Circuit breaker state tracking, shared by the sync and async paths
+        # (the lock covers sync calls from other threads)
         self.circuit_states: Dict[str, Tuple[CircuitState, datetime, int]] = {}
+        self.circuit_lock = threading.RLock()
     
     def calculate_delay(self, attempt: int) -> float:
         """
@@ -79,13 +85,16 @@ class RetryManager:
         
         return max(0, delay)  # Ensure non-negative
     
-    def retry_with_backoff(self, func: Callable, *args, **kwargs) -> Any:
+    def retry_with_backoff(self, func: Callable, *args, circuit_key: Optional[str] = None, **kwargs) -> Any:
         """
         Execute function with retry logic
         
         Args:
             func: Function to execute
             *args: Function arguments
+            circuit_key: Circuit breaker key (defaults to the function name); pass the same
+                key as the async path, e.g. the broker, to share one circuit between them.
+                Named so it cannot collide with func's own keyword arguments
             **kwargs: Function keyword arguments
             
         Returns:
@@ -94,8 +103,10 @@ class RetryManager:
         Raises:
             Last exception if all retries failed
         """
-        func_name = func.__name__
-        
+        return self._retry_sync(func, circuit_key or func.__name__, args, kwargs)
+    
+    def _retry_sync(self, func: Callable, func_name: str, args: tuple, kwargs: dict) -> Any:
+        """Sync retry loop; func_name is the circuit breaker key"""
         # Check circuit breaker state
         if self._is_circuit_open(func_name):
             raise Exception(f"Circuit breaker is OPEN for {func_name}")
@@ -123,6 +134,10 @@ class RetryManager:
                 # Record failure for circuit breaker
                 self._on_failure(func_name)
                 
+                # Stop early when the circuit opened meanwhile (possibly from the async path)
+                if self._is_circuit_open(func_name):
+                    break
+                
                 # Don't retry if this was the last attempt
                 if attempt < self.max_attempts - 1:
                     delay = self.calculate_delay(attempt)
@@ -130,36 +145,131 @@ class RetryManager:
                     time.sleep(delay)
         
         # All retries failed
-        self.logger.error(f"{func_name} failed after {self.max_attempts} attempts")
+        self.logger.error(f"{func_name} failed after {attempt + 1} attempts")
         raise last_exception
     
-    def retry_decorator(self, max_attempts: Optional[int] = None):
+    async def retry_with_backoff_async(self, func: Callable, *args,
+                                       deadline: Optional[float] = None,
+                                       circuit_key: Optional[str] = None, **kwargs) -> Any:
+        """
+        Await a coroutine function with retry logic, without blocking the event loop
+        
+        Args:
+            func: Coroutine function to execute
+            *args: Function arguments
+            deadline: Seconds from now after which no further attempt is made; the
+                running attempt is cancelled when it passes (None for no deadline)
+            circuit_key: Circuit breaker key (defaults to the function name, so a sync
+                and an async function of the same name share one circuit)
+            **kwargs: Function keyword arguments
+            
+        Returns:
+            Function result if successful
+            
+        Raises:
+            Last exception if all retries failed, asyncio.TimeoutError if the deadline
+            passed before any attempt completed, asyncio.CancelledError if cancelled
+        """
+        return await self._retry_async(func, circuit_key or func.__name__, args, kwargs, deadline)
+    
+    async def _retry_async(self, func: Callable, func_name: str, args: tuple, kwargs: dict,
+                           deadline: Optional[float] = None) -> Any:
+        """Async retry loop; func_name is the circuit breaker key"""
+        # Check circuit breaker state
+        if self._is_circuit_open(func_name):
+            raise Exception(f"Circuit breaker is OPEN for {func_name}")
+        
+        expires_at = time.monotonic() + deadline if deadline is not None else None
+        last_exception = None
+        
+        for attempt in range(self.max_attempts):
+            try:
+                self.logger.debug(f"Attempting {func_name} (attempt {attempt + 1}/{self.max_attempts})")
+                
+                if expires_at is None:
+                    result = await func(*args, **kwargs)
+                else:
+                    result = await asyncio.wait_for(func(*args, **kwargs), expires_at - time.monotonic())
+                
+                # Success - reset circuit breaker
+                self._on_success(func_name)
+                
+                if attempt > 0:
+                    self.logger.info(f"{func_name} succeeded after {attempt + 1} attempts")
+                
+                return result
+                
+            except asyncio.CancelledError:
+                # Cancellation is not a failure of the service - propagate without retrying
+                raise
+            except Exception as e:
+                last_exception = e
+                self.logger.warning(f"{func_name} failed (attempt {attempt + 1}/{self.max_attempts}): {str(e)}")
+                
+                # Record failure for circuit breaker
+                self._on_failure(func_name)
+                
+                # Stop early when the circuit opened meanwhile (possibly from the sync path)
+                if self._is_circuit_open(func_name):
+                    break
+                
+                # Don't retry if this was the last attempt
+                if attempt < self.max_attempts - 1:
+                    delay = self.calculate_delay(attempt)
+                    if expires_at is not None and time.monotonic() + delay >= expires_at:
+                        self.logger.warning(f"{func_name} deadline reached, not retrying")
+                        break
+                    self.logger.info(f"Retrying {func_name} in {delay:.2f} seconds...")
+                    await asyncio.sleep(delay)
+        
+        # All retries failed
+        self.logger.error(f"{func_name} failed after {attempt + 1} attempts")
+        raise last_exception
+    
+    def retry_decorator(self, max_attempts: Optional[int] = None, circuit: Optional[str] = None):
         """
         Decorator for adding retry logic to functions
         
+        Coroutine functions get the async retry path; both share this manager's
+        circuit breakers.
+        
         Args:
             max_attempts: Override default max attempts for this function
+            circuit: Circuit breaker key (defaults to the function name)
             
         Returns:
             Decorated function with retry logic
         """
         def decorator(func):
+            circuit_name = circuit or func.__name__
+            
+            def manager():
+                # Create a new instance with custom max_attempts if provided
+                if max_attempts is None:
+                    return self
+                retry_manager = RetryManager(
+                    max_attempts=max_attempts,
+                    initial_delay=self.initial_delay,
+                    max_delay=self.max_delay,
+                    exponential_base=self.exponential_base,
+                    jitter=self.jitter,
+                    circuit_failure_threshold=self.circuit_failure_threshold,
+                    circuit_recovery_timeout=self.circuit_recovery_timeout
+                )
+                retry_manager.circuit_states = self.circuit_states
+                retry_manager.circuit_lock = self.circuit_lock
+                return retry_manager
+            
+            if asyncio.iscoroutinefunction(func):
+                @functools.wraps(func)
+                async def async_wrapper(*args, **kwargs):
+                    return await manager()._retry_async(func, circuit_name, args, kwargs)
+                
+                return async_wrapper
+            
             @functools.wraps(func)
             def wrapper(*args, **kwargs):
-                # Create a new instance with custom max_attempts if provided
-                if max_attempts is not None:
-                    retry_manager = RetryManager(
-                        max_attempts=max_attempts,
-                        initial_delay=self.initial_delay,
-                        max_delay=self.max_delay,
-                        exponential_base=self.exponential_base,
-                        jitter=self.jitter,
-                        circuit_failure_threshold=self.circuit_failure_threshold,
-                        circuit_recovery_timeout=self.circuit_recovery_timeout
-                    )
-                    return retry_manager.retry_with_backoff(func, *args, **kwargs)
-                else:
-                    return self.retry_with_backoff(func, *args, **kwargs)
+                return manager()._retry_sync(func, circuit_name, args, kwargs)
             
             return wrapper
         return decorator
@@ -170,26 +280,27 @@ class RetryManager:
         
         Args:
             func_name: Name of the function
-            
+        
         Returns:
             True if circuit is open, False otherwise
         """
-        if func_name not in self.circuit_states:
-            return False
-        
-        state, last_failure_time, failure_count = self.circuit_states[func_name]
-        
-        if state == CircuitState.OPEN:
-            # Check if recovery timeout has passed
-            if datetime.now() - last_failure_time > timedelta(seconds=self.circuit_recovery_timeout):
-                # Move to half-open state
-                self.circuit_states[func_name] = (CircuitState.HALF_OPEN, last_failure_time, failure_count)
-                self.logger.info(f"Circuit breaker for {func_name} moved to HALF_OPEN state")
+        with self.circuit_lock:
+            if func_name not in self.circuit_states:
                 return False
-            else:
-                return True
-        
-        return False
+            
+            state, last_failure_time, failure_count = self.circuit_states[func_name]
+            
+            if state == CircuitState.OPEN:
+                # Check if recovery timeout has passed
+                if datetime.now() - last_failure_time > timedelta(seconds=self.circuit_recovery_timeout):
+                    # Move to half-open state
+                    self.circuit_states[func_name] = (CircuitState.HALF_OPEN, last_failure_time, failure_count)
+                    self.logger.info(f"Circuit breaker for {func_name} moved to HALF_OPEN state")
+                    return False
+                else:
+                    return True
+            
+            return False
     
     def _on_success(self, func_name: str):
         """
@@ -198,12 +309,13 @@ class RetryManager:
         Args:
             func_name: Name of the function
         """
-        if func_name in self.circuit_states:
-            state, _, _ = self.circuit_states[func_name]
-            if state == CircuitState.HALF_OPEN:
-                # Recovery successful, close circuit
-                del self.circuit_states[func_name]
-                self.logger.info(f"Circuit breaker for {func_name} CLOSED (recovered)")
+        with self.circuit_lock:
+            if func_name in self.circuit_states:
+                state, _, _ = self.circuit_states[func_name]
+                if state == CircuitState.HALF_OPEN:
+                    # Recovery successful, close circuit
+                    del self.circuit_states[func_name]
+                    self.logger.info(f"Circuit breaker for {func_name} CLOSED (recovered)")
     
     def _on_failure(self, func_name: str):
         """
@@ -212,25 +324,26 @@ class RetryManager:
         Args:
             func_name: Name of the function
         """
-        if func_name not in self.circuit_states:
-            # First failure
-            self.circuit_states[func_name] = (CircuitState.CLOSED, datetime.now(), 1)
-        else:
-            state, last_failure_time, failure_count = self.circuit_states[func_name]
-            
-            if state == CircuitState.HALF_OPEN:
-                # Recovery failed, reopen circuit
-                self.circuit_states[func_name] = (CircuitState.OPEN, datetime.now(), failure_count + 1)
-                self.logger.warning(f"Circuit breaker for {func_name} REOPENED")
+        with self.circuit_lock:
+            if func_name not in self.circuit_states:
+                # First failure
+                self.circuit_states[func_name] = (CircuitState.CLOSED, datetime.now(), 1)
             else:
-                # Increment failure count
-                new_count = failure_count + 1
-                self.circuit_states[func_name] = (state, datetime.now(), new_count)
+                state, last_failure_time, failure_count = self.circuit_states[func_name]
                 
-                # Check if threshold reached
-                if new_count >= self.circuit_failure_threshold and state == CircuitState.CLOSED:
-                    self.circuit_states[func_name] = (CircuitState.OPEN, datetime.now(), new_count)
-                    self.logger.warning(f"Circuit breaker for {func_name} OPENED after {new_count} failures")
+                if state == CircuitState.HALF_OPEN:
+                    # Recovery failed, reopen circuit
+                    self.circuit_states[func_name] = (CircuitState.OPEN, datetime.now(), failure_count + 1)
+                    self.logger.warning(f"Circuit breaker for {func_name} REOPENED")
+                else:
+                    # Increment failure count
+                    new_count = failure_count + 1
+                    self.circuit_states[func_name] = (state, datetime.now(), new_count)
+                    
+                    # Check if threshold reached
+                    if new_count >= self.circuit_failure_threshold and state == CircuitState.CLOSED:
+                        self.circuit_states[func_name] = (CircuitState.OPEN, datetime.now(), new_count)
+                        self.logger.warning(f"Circuit breaker for {func_name} OPENED after {new_count} failures")
     
     def get_circuit_status(self) -> Dict[str, Dict[str, Any]]:
         """
@@ -240,7 +353,9 @@ class RetryManager:
             Dictionary with circuit breaker status for each function
         """
         status = {}
-        for func_name, (state, last_failure_time, failure_count) in self.circuit_states.items():
+        with self.circuit_lock:
+            circuits = list(self.circuit_states.items())
+        for func_name, (state, last_failure_time, failure_count) in circuits:
             status[func_name] = {
                 "state": state.value,
                 "failure_count": failure_count,
@@ -256,11 +371,13 @@ class RetryManager:
         Args:
             func_name: Name of the function
         """
-        if func_name in self.circuit_states:
-            del self.circuit_states[func_name]
-            self.logger.info(f"Circuit breaker for {func_name} manually reset")
+        with self.circuit_lock:
+            if func_name in self.circuit_states:
+                del self.circuit_states[func_name]
+                self.logger.info(f"Circuit breaker for {func_name} manually reset")
     
     def reset_all_circuits(self):
         """Reset all circuit breakers"""
-        self.circuit_states.clear()
-        self.logger.info("All circuit breakers reset")
+        with self.circuit_lock:
+            self.circuit_states.clear()
+            self.logger.info("All circuit breakers reset")
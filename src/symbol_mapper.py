@@ -5,6 +5,7 @@ Handles symbol conversions between MT5 and Match-Trader platforms.
 - Automatic suffix removal (.z, .a, etc.)
 - Custom symbol mapping
 - Symbol validation
+- MT5 group= mask compilation for terminal-side filtering
 """
 
 import logging
@@ -158,6 +159,28 @@ class SymbolMapper:
         mapped = self.map_symbol(symbol)
         return mapped is not None
     
+    def build_group_mask(self) -> Optional[str]:
+        """
+        Compile allowed symbols and mapping keys into an MT5 group= mask
+        
+        The mask is deliberately a superset (broker suffix wildcards such as
+        EURUSD* also match EURUSDm); map_symbol still does the exact filtering.
+        
+        Returns:
+            Comma-separated group mask, or None when every symbol is allowed
+        """
+        if not self.allowed_symbols:
+            return None
+        
+        patterns = set()
+        for symbol in self.allowed_symbols:
+            patterns.add(f"{symbol}*")
+        for mt5_symbol, mapped_symbol in self.symbol_mapping.items():
+            if mapped_symbol in self.allowed_symbols:
+                patterns.add(f"{self.suffix_pattern.sub('', mt5_symbol)}*")
+        
+        return ",".join(sorted(patterns))
+    
     def get_all_mappings(self) -> Dict[str, str]:
         """
         Get all current symbol mappings
@@ -6,16 +6,16 @@ Trade Copier Module for core replication logic.
 """
 
 import logging
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from threading import Thread, Lock
 import time
 from datetime import datetime
-import asyncio
-from concurrent.futures import ThreadPoolExecutor
 
 try:
     from .config_manager import ConfigManager
     from .mt5_connector import MT5Connector
+    from .mt5_worker_pool import MT5WorkerPool
+    from .copy_pipeline import CopyPipeline, LatencyBudget
     from .match_trader_client import MatchTraderClient
     from .symbol_mapper import SymbolMapper
     from .retry_manager import RetryManager
@@ -25,6 +25,8 @@ try:
 except ImportError:
     from config_manager import ConfigManager
     from mt5_connector import MT5Connector
+    from mt5_worker_pool import MT5WorkerPool
+    from copy_pipeline import CopyPipeline, LatencyBudget
     from match_trader_client import MatchTraderClient
     from symbol_mapper import SymbolMapper
     from retry_manager import RetryManager
@@ -32,6 +34,22 @@ except ImportError:
     from trade_analytics import TradeAnalytics
     from health_monitor import HealthMonitor
 
+# Dispatch priority classes: risk-reducing orders (closes, SL hits) always go out before new entries
+ACTION_PRIORITY = {"close": 0, "partial_close": 0, "modify": 1, "open": 2}
+
+
+def signal_priority(item: Dict[str, Any]) -> int:
+    """Priority class of a position event or order (0 is dispatched first)"""
+    action = item.get("action") or item["event"].value
+    return ACTION_PRIORITY.get(action, 1)
+
+
+def signal_key(item: Dict[str, Any]) -> Tuple[Any, Any]:
+    """Master position a position event or order belongs to; its signals keep their order"""
+    if "master_ticket" in item:
+        return item.get("master_account"), item["master_ticket"]
+    return item.get("account_id"), item["ticket"]
+
 
 class TradeCopier:
     """Core trade replication logic and coordination"""
@@ -40,23 +58,48 @@ class TradeCopier:
         self.config_manager = config_manager
         self.logger = logging.getLogger(__name__)
         self.mt5_connectors = {}
+        self.mt5_worker_pool = None
         self.match_clients = {}
+        self.symbol_group = None
+        self.symbol_mapper = None
+        self.trade_settings = None
+        self.pipeline = None
+        self.health_monitor = None
 
     def initialize_connections(self):
         """Initialize connections for all accounts"""
         self.logger.info("Initializing connections...")
         config = self.config_manager.load_config()
+        self.trade_settings = config.trade_settings
+        self.symbol_mapper = SymbolMapper(
+            config.trade_settings.symbol_mapping,
+            set(config.trade_settings.allowed_symbols) or None,
+        )
+        self.symbol_group = self.symbol_mapper.build_group_mask()
 
-        for mt5_account in config.mt5_accounts:
-            mt5_connector = MT5Connector(
-                account_id=mt5_account.account_id,
-                server=mt5_account.server,
-                login=mt5_account.login,
-                password=mt5_account.password,
-                terminal_path=mt5_account.terminal_path,
+        self.pipeline = CopyPipeline(
+            transform=self.map_trade,
+            ingest_size=config.performance.pipeline_ingest_queue_size,
+            dispatch_size=config.performance.pipeline_dispatch_queue_size,
+            overflow_policy=config.performance.pipeline_overflow_policy,
+            block_timeout=config.performance.pipeline_block_timeout_seconds,
+            priority=signal_priority,
+            ordering_key=signal_key,
+            latency_budget=LatencyBudget(
+                config.performance.max_latency_ms,
+                policy=config.performance.stale_signal_policy,
+                # Only new entries are held to the budget; exits are always sent
+                applies_to=lambda order: order["action"] == "open",
+                slippage_check=self._within_slippage,
+            ),
+        )
+        self.max_slippage_percent = config.performance.max_slippage_percent
+        if config.performance.stale_signal_policy == "slippage_check" and len(config.mt5_accounts) > 1:
+            # Several masters run in worker processes, where the parent has no terminal to quote from
+            raise ValueError(
+                "stale_signal_policy 'slippage_check' needs an in-process MT5 connector and is not "
+                "supported with more than one MT5 account; use 'drop' or 'flag'"
             )
-            mt5_connector.start()
-            self.mt5_connectors[mt5_account.account_id] = mt5_connector
 
         for mt_account in config.matchtrade_accounts:
             match_client = MatchTraderClient(
@@ -68,16 +111,128 @@ class TradeCopier:
             )
             match_client.start()
             self.match_clients[mt_account.account_id] = match_client
+            self.pipeline.add_destination(mt_account.account_id, match_client.send_trade)
+        # Destinations are registered before MT5 events start flowing
+        self.pipeline.start()
+        self.health_monitor = HealthMonitor()
+        self.health_monitor.add_stats_source("pipeline", self.pipeline.get_metrics)
+        self.health_monitor.start_monitoring(config.performance.health_check_interval_seconds)
+
+        if len(config.mt5_accounts) > 1:
+            # The MetaTrader5 module holds a single terminal session per process,
+            # so several masters each get their own worker process
+            self.mt5_worker_pool = MT5WorkerPool(on_event=self.on_new_trade)
+            for mt5_account in config.mt5_accounts:
+                self.mt5_worker_pool.add_account(
+                    mt5_account.account_id,
+                    **self._mt5_connector_kwargs(mt5_account, config),
+                )
+            self.mt5_worker_pool.start()
+        else:
+            for mt5_account in config.mt5_accounts:
+                mt5_connector = MT5Connector(
+                    account_id=mt5_account.account_id,
+                    on_event=self.on_new_trade,
+                    **self._mt5_connector_kwargs(mt5_account, config),
+                )
+                mt5_connector.start()
+                self.mt5_connectors[mt5_account.account_id] = mt5_connector
+                # One shared executor thread serializes every MetaTrader5 call in this process
+                self.health_monitor.add_stats_source("mt5_executor", mt5_connector.executor.get_stats)
+
+    def _mt5_connector_kwargs(self, mt5_account, config) -> Dict[str, Any]:
+        """Build MT5Connector arguments for one MT5 account"""
+        return {
+            "server": mt5_account.server,
+            "login": mt5_account.login,
+            "password": mt5_account.password,
+            "terminal_path": mt5_account.terminal_path,
+            "max_latency_ms": config.performance.max_latency_ms,
+            "push_port": mt5_account.push_port,
+            "reconcile_interval": config.performance.reconcile_interval_seconds,
+            "symbol_group": self.symbol_group,
+            "server_time_offset": mt5_account.server_time_offset_seconds,
+            # Master symbols whose ticks reveal the trade server clock
+            "time_probe_symbols": list(config.trade_settings.symbol_mapping) or None,
+        }
 
     def on_new_trade(self, trade_data: Dict[str, Any]):
-        """Handle new trade event from MT5"""
-        self.logger.info(f"New trade received: {trade_data}")
-        # Copy trade logic here
+        """Handle a position event (OPEN / MODIFY / PARTIAL_CLOSE / CLOSE) from MT5"""
+        self.logger.debug(f"New trade received: {trade_data}")
+        if not self.pipeline.submit(trade_data):
+            self.logger.error(f"Copy pipeline full, dropped event for ticket {trade_data.get('ticket')}")
+
+    def map_trade(self, trade_data: Dict[str, Any]) -> List[Tuple[str, Dict[str, Any]]]:
+        """
+        Map/size stage: build the order for each Match-Trader account
+
+        Args:
+            trade_data: Position event from MT5
+
+        Returns:
+            List of (Match-Trader account ID, order) pairs (empty if the symbol is not copied)
+        """
+        symbol = self.symbol_mapper.map_symbol(trade_data["symbol"])
+        if symbol is None:
+            return []
+
+        position = trade_data["position"]
+        order = {
+            "action": trade_data["event"].value,
+            "master_account": trade_data.get("account_id"),
+            "master_ticket": trade_data["ticket"],
+            "master_symbol": trade_data["symbol"],
+            "symbol": symbol,
+            "type": position.get("type"),
+            "volume": self._size_volume(position.get("volume", 0.0)),
+            "price": position.get("price_open"),
+            "event_time": trade_data.get("event_time"),
+        }
+        if self.trade_settings.copy_sl_tp:
+            order["sl"] = position.get("sl")
+            order["tp"] = position.get("tp")
+        if "closed_volume" in trade_data:
+            order["closed_volume"] = self._size_volume(trade_data["closed_volume"])
+        return [(account_id, order) for account_id in self.match_clients]
+
+    def _size_volume(self, volume: float) -> float:
+        """Apply the lot multiplier and clamp to the configured lot limits"""
+        settings = self.trade_settings
+        sized = round(volume * settings.lot_multiplier, 2)
+        return max(settings.min_lot_size, min(sized, settings.max_lot_size))
+
+    def _within_slippage(self, order: Dict[str, Any]) -> bool:
+        """
+        Slippage check for stale opens: is the master's current price still near its entry?
+
+        Args:
+            order: Open order past the latency budget
+
+        Returns:
+            True if the current price is within max_slippage_percent of the master entry;
+            False when it cannot be checked (no price or no in-process MT5 connector)
+        """
+        connector = self.mt5_connectors.get(order.get("master_account"))
+        price = order.get("price")
+        if connector is None:
+            self.logger.error(
+                f"No MT5 connector for {order.get('master_account')} to check slippage; "
+                f"dropping stale open for ticket {order.get('master_ticket')}"
+            )
+            return False
+        if not price:
+            return False
+        tick = connector.get_tick(order["master_symbol"])
+        if tick is None:
+            return False
+        # MT5 position type 0 is a buy, filled at the ask
+        current = tick.ask if order.get("type") == 0 else tick.bid
+        return abs(current - price) / price * 100 <= self.max_slippage_percent
 
     def run(self):
         """Main loop for processing trades"""
         self.initialize_connections()
-        # Assuming the MT5Connector calls `on_new_trade` when a new trade is detected
+        # MT5Connector calls `on_new_trade` for every position event it detects
         self.logger.info("Trade copier running...")
         # Possibly a main loop if you need to do recurring tasks
 
@@ -85,6 +240,12 @@ class TradeCopier:
         """Shutdown all connections and stop trading activities"""
         for connector in self.mt5_connectors.values():
             connector.shutdown()
+        if self.mt5_worker_pool is not None:
+            self.mt5_worker_pool.stop()
+        if self.pipeline is not None:
+            self.pipeline.stop()
+        if self.health_monitor is not None:
+            self.health_monitor.stop_monitoring()
         for client in self.match_clients.values():
             client.close()
 
@@ -0,0 +1,238 @@
+"""
+Trade Event Listener Module
+
+Push-based ingestion of MT5 trade events from the TradeEventBridge Expert Advisor.
+- Asyncio TCP server on localhost
+- Newline-delimited JSON wire format (see below)
+- Decodes messages into the same position events the poll loop produces
+- Stand-in producer speaking the same wire format for testing without a terminal
+
+Wire format (one UTF-8 JSON object per line):
+    {"msg": "position", "ticket": 1, "symbol": "EURUSD", "type": 0, "volume": 1.0,
+     "price_open": 1.1, "sl": 0.0, "tp": 0.0, "time_update_msc": 1700000000000, ...}
+    {"msg": "close", "ticket": 1, "time_msc": 1700000000000}
+    {"msg": "heartbeat"}
+"""
+
+import asyncio
+import json
+import logging
+import socket
+import time
+from threading import Thread
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional
+
+try:
+    from .position_tracker import PositionTracker
+except ImportError:
+    from position_tracker import PositionTracker
+
+
+POSITION_FIELDS = ("ticket", "symbol", "type", "volume", "sl", "tp", "time_update_msc")
+
+
+def encode_message(message: Dict[str, Any]) -> bytes:
+    """
+    Encode a message in the listener wire format
+
+    Args:
+        message: Message dictionary with a "msg" key
+
+    Returns:
+        Encoded line including the trailing newline
+    """
+    return (json.dumps(message, separators=(",", ":")) + "\n").encode("utf-8")
+
+
+class TradeEventListener:
+    """Receives pushed trade transactions from the MT5 EA and turns them into position events"""
+
+    def __init__(self,
+                 tracker: PositionTracker,
+                 on_event: Callable[[Dict[str, Any]], None],
+                 host: str = "127.0.0.1",
+                 port: int = 5555,
+                 heartbeat_timeout: float = 3.0):
+        """
+        Initialize Trade Event Listener
+
+        Args:
+            tracker: Position tracker shared with the poll loop
+            on_event: Callback for every decoded position event
+            host: Interface to listen on (keep this on localhost)
+            port: TCP port to listen on (0 picks a free port)
+            heartbeat_timeout: Seconds without messages before the feed counts as down
+        """
+        self.tracker = tracker
+        self.on_event = on_event
+        self.host = host
+        self.port = port
+        self.heartbeat_timeout = heartbeat_timeout
+
+        self.server: Optional[asyncio.AbstractServer] = None
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.last_message_at = 0.0
+        self.clients = 0
+        self.messages_received = 0
+        self.decode_errors = 0
+        self.logger = logging.getLogger(__name__)
+
+    async def start(self):
+        """Start listening; the actual port is available in self.port afterwards"""
+        self.loop = asyncio.get_running_loop()
+        self.server = await asyncio.start_server(self._handle_client, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        self.logger.info(f"Trade event listener on {self.host}:{self.port}")
+
+    async def serve_forever(self):
+        """Start (if needed) and serve until stopped"""
+        if self.server is None:
+            await self.start()
+        try:
+            await self.server.serve_forever()
+        except asyncio.CancelledError:
+            pass
+
+    async def stop(self):
+        """Stop listening"""
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+            self.server = None
+            self.logger.info("Trade event listener stopped")
+
+    def run_in_thread(self) -> Thread:
+        """
+        Run the listener on its own event loop in a daemon thread
+
+        Returns:
+            The started thread
+        """
+        thread = Thread(target=lambda: asyncio.run(self.serve_forever()), daemon=True)
+        thread.start()
+        return thread
+
+    def stop_threadsafe(self):
+        """Stop a listener started with run_in_thread from another thread"""
+        if self.loop is not None and self.server is not None:
+            self.loop.call_soon_threadsafe(self.server.close)
+
+    def is_active(self) -> bool:
+        """
+        Check whether the EA feed is connected and alive
+
+        Returns:
+            True if a client is connected and sent something within heartbeat_timeout
+        """
+        return self.clients > 0 and time.monotonic() - self.last_message_at < self.heartbeat_timeout
+
+    async def _handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Read messages from one EA connection until it closes"""
+        peer = writer.get_extra_info("peername")
+        self.clients += 1
+        self.last_message_at = time.monotonic()
+        self.logger.info(f"Trade event producer connected: {peer}")
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                self.last_message_at = time.monotonic()
+                self.messages_received += 1
+                try:
+                    message = json.loads(line)
+                except ValueError:
+                    self.decode_errors += 1
+                    self.logger.warning(f"Invalid trade event message: {line[:200]!r}")
+                    continue
+                for event in self.handle_message(message):
+                    try:
+                        self.on_event(event)
+                    except Exception as e:
+                        self.logger.error(f"Error handling pushed event {event['ticket']}: {e}")
+        except (ConnectionError, asyncio.IncompleteReadError) as e:
+            self.logger.warning(f"Trade event producer {peer} dropped: {e}")
+        finally:
+            self.clients -= 1
+            writer.close()
+            self.logger.info(f"Trade event producer disconnected: {peer}")
+
+    def handle_message(self, message: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Decode one wire message into position events
+
+        Args:
+            message: Decoded JSON message
+
+        Returns:
+            List of position events (empty for heartbeats and no-op updates)
+        """
+        kind = message.get("msg")
+
+        if kind == "position":
+            missing = [field for field in POSITION_FIELDS if field not in message]
+            if missing:
+                self.decode_errors += 1
+                self.logger.warning(f"Position message missing fields {missing}")
+                return []
+            fields = {key: value for key, value in message.items() if key != "msg"}
+            return self.tracker.apply(SimpleNamespace(**fields))
+
+        if kind == "close":
+            return self.tracker.remove(message.get("ticket"))
+
+        if kind != "heartbeat":
+            self.decode_errors += 1
+            self.logger.warning(f"Unknown trade event message type: {kind}")
+        return []
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get listener statistics
+
+        Returns:
+            Dictionary with connection state and message counters
+        """
+        return {
+            "active": self.is_active(),
+            "clients": self.clients,
+            "messages_received": self.messages_received,
+            "decode_errors": self.decode_errors,
+        }
+
+
+class TradeEventProducer:
+    """Stand-in for the TradeEventBridge EA: pushes wire-format messages to a listener"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 5555):
+        self.host = host
+        self.port = port
+        self.sock: Optional[socket.socket] = None
+
+    def connect(self):
+        """Connect to the listener"""
+        self.sock = socket.create_connection((self.host, self.port))
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+    def send(self, message: Dict[str, Any]):
+        """Send a raw message"""
+        self.sock.sendall(encode_message(message))
+
+    def send_position(self, **position):
+        """Send the current state of a position (same fields as mt5.positions_get)"""
+        self.send(dict(position, msg="position"))
+
+    def send_close(self, ticket: int, time_msc: Optional[int] = None):
+        """Send a position close"""
+        self.send({"msg": "close", "ticket": ticket, "time_msc": time_msc or int(time.time() * 1000)})
+
+    def send_heartbeat(self):
+        """Send a heartbeat"""
+        self.send({"msg": "heartbeat"})
+
+    def close(self):
+        """Close the connection"""
+        if self.sock is not None:
+            self.sock.close()
+            self.sock = None
@@ -69,6 +69,14 @@ class TestHealthMonitor(unittest.TestCase):
         self.assertIn('status', status)
         self.assertIn('metrics', status)
 
+    def test_component_stats_in_report(self):
+        """Test registered component stats are part of every health check"""
+        self.monitor.add_stats_source('pipeline', lambda: {'dropped': 3})
+        self.monitor.add_stats_source('broken', lambda: 1 / 0)
+        components = self.monitor.check_health_status()['components']
+        self.assertEqual(components['pipeline'], {'dropped': 3})
+        self.assertIn('error', components['broken'])
+
 
 def run_advanced_tests():
     """Run tests for advanced features"""
@@ -0,0 +1,179 @@
+"""
+Test Suite for the bounded copy pipeline
+"""
+
+import unittest
+import os
+import sys
+import threading
+import time
+
+# Add src directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from copy_pipeline import BoundedStage, CopyPipeline, LatencyBudget, OverflowPolicy
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+class TestBoundedStage(unittest.TestCase):
+    """Test BoundedStage overflow policies"""
+
+    def test_drop_oldest(self):
+        """Test the oldest items are evicted when full"""
+        stage = BoundedStage("test", 2, OverflowPolicy.DROP_OLDEST)
+        for item in range(4):
+            self.assertTrue(stage.put(item))
+        self.assertEqual([stage.get(0.1), stage.get(0.1)], [2, 3])
+        self.assertEqual(stage.get_metrics()["dropped"], 2)
+
+    def test_drop_newest(self):
+        """Test new items are rejected when full"""
+        stage = BoundedStage("test", 1, OverflowPolicy.DROP_NEWEST)
+        self.assertTrue(stage.put(1))
+        self.assertFalse(stage.put(2))
+        self.assertEqual(stage.get(0.1), 1)
+
+    def test_block_times_out(self):
+        """Test a blocking put gives up after the timeout"""
+        stage = BoundedStage("test", 1, OverflowPolicy.BLOCK, block_timeout=0.05)
+        stage.put(1)
+        self.assertFalse(stage.put(2))
+        self.assertEqual(stage.get_metrics()["max_depth"], 1)
+
+
+class TestCopyPipeline(unittest.TestCase):
+    """Test CopyPipeline routing and isolation"""
+
+    def setUp(self):
+        self.fast = []
+        self.release = threading.Event()
+        self.pipeline = CopyPipeline(
+            transform=lambda event: [("slow", event), ("fast", event)],
+            dispatch_size=100,
+            overflow_policy="drop_oldest",
+        )
+        self.pipeline.add_destination("fast", self.fast.append)
+        self.pipeline.add_destination("slow", lambda payload: self.release.wait(2), queue_size=5)
+        self.pipeline.start()
+        self.addCleanup(self.pipeline.stop)
+        self.addCleanup(self.release.set)
+
+    def test_slow_destination_does_not_delay_others(self):
+        """Test a stuck destination drops its backlog while others keep flowing"""
+        for event in range(40):
+            self.assertTrue(self.pipeline.submit(event))
+
+        self.assertTrue(wait_for(lambda: len(self.fast) == 40))
+        metrics = self.pipeline.get_metrics()
+        self.assertEqual(self.fast, list(range(40)))
+        self.assertLessEqual(metrics["dispatch"]["slow"]["depth"], 5)
+        self.assertGreater(metrics["dispatch"]["slow"]["dropped"], 0)
+        self.assertEqual(metrics["ingest"]["processed"], 40)
+
+
+class TestPriorityAndLatency(unittest.TestCase):
+    """Test priority classes and the latency budget"""
+
+    PRIORITY = {"close": 0, "modify": 1, "open": 2}
+
+    def stage(self, maxsize=10, policy=OverflowPolicy.DROP_NEWEST):
+        return BoundedStage("test", maxsize, policy,
+                            priority=lambda item: self.PRIORITY[item[0]],
+                            ordering_key=lambda item: item[1])
+
+    def drain(self, stage):
+        items = []
+        while stage.queue.qsize():
+            items.append(stage.get(0.1))
+        return items
+
+    def test_closes_overtake_opens(self):
+        """Test risk-reducing items go first while one ticket keeps its order"""
+        stage = self.stage()
+        for item in [("open", 1), ("open", 2), ("modify", 3), ("close", 4), ("close", 1)]:
+            stage.put(item)
+        self.assertEqual(self.drain(stage), [("close", 4), ("open", 1), ("close", 1), ("modify", 3), ("open", 2)])
+
+    def test_full_queue_evicts_entries_for_exits(self):
+        """Test a close is never turned away by a queue full of opens"""
+        stage = self.stage(maxsize=2)
+        stage.put(("open", 1))
+        stage.put(("open", 2))
+        self.assertTrue(stage.put(("close", 3)))
+        self.assertFalse(stage.put(("open", 4)))
+        self.assertEqual(self.drain(stage), [("close", 3), ("open", 1)])
+        self.assertEqual(stage.get_metrics()["evicted"], 1)
+
+    def test_block_policy_never_evicts(self):
+        """Test a full blocking queue makes the producer wait instead of evicting"""
+        stage = BoundedStage("test", 2, OverflowPolicy.BLOCK, block_timeout=1.0,
+                             priority=lambda item: self.PRIORITY[item[0]])
+        stage.put(("open", 1))
+        stage.put(("open", 2))
+        # The consumer frees a slot while the close waits for one
+        threading.Timer(0.05, stage.get, args=(0.1,)).start()
+        self.assertTrue(stage.put(("close", 3)))
+        self.assertEqual(self.drain(stage), [("close", 3), ("open", 2)])
+        self.assertEqual(stage.get_metrics()["evicted"], 0)
+        self.assertEqual(stage.get_metrics()["dropped"], 0)
+
+    def test_drop_oldest_keeps_urgent_items(self):
+        """Test drop_oldest only evicts items as urgent as the new one or less"""
+        stage = self.stage(maxsize=2, policy=OverflowPolicy.DROP_OLDEST)
+        stage.put(("close", 1))
+        stage.put(("close", 2))
+        self.assertFalse(stage.put(("open", 3)))
+        self.assertTrue(stage.put(("close", 4)))
+        self.assertEqual(self.drain(stage), [("close", 2), ("close", 4)])
+
+    def test_latency_budget_policies(self):
+        """Test stale opens are dropped, flagged or slippage-checked and exits pass"""
+        now = time.time()
+        fresh = {"action": "open", "event_time": now}
+        stale = {"action": "open", "event_time": now - 1.0}
+        stale_close = {"action": "close", "event_time": now - 1.0}
+        is_open = lambda payload: payload["action"] == "open"
+
+        drop = LatencyBudget(100, "drop", applies_to=is_open)
+        self.assertIs(drop.apply(fresh), fresh)
+        self.assertIsNone(drop.apply(stale))
+        self.assertIs(drop.apply(stale_close), stale_close)
+        self.assertEqual(drop.get_metrics()["dropped"], 1)
+
+        flagged = LatencyBudget(100, "flag", applies_to=is_open).apply(stale)
+        self.assertTrue(flagged["stale"])
+        self.assertGreaterEqual(flagged["age_ms"], 1000)
+        self.assertNotIn("stale", stale)
+
+        checked = LatencyBudget(100, "slippage_check", slippage_check=lambda payload: payload["ok"])
+        self.assertIsNotNone(checked.apply(dict(stale, ok=True)))
+        self.assertIsNone(checked.apply(dict(stale, ok=False)))
+
+    def test_pipeline_drops_stale_signals(self):
+        """Test the dispatch stage applies the budget before sending"""
+        sent = []
+        pipeline = CopyPipeline(
+            transform=lambda event: [("dest", event)],
+            latency_budget=LatencyBudget(100, "drop"),
+        )
+        pipeline.add_destination("dest", sent.append)
+        pipeline.start()
+        self.addCleanup(pipeline.stop)
+
+        pipeline.submit({"ticket": 1, "event_time": time.time() - 5})
+        pipeline.submit({"ticket": 2, "event_time": time.time()})
+        self.assertTrue(wait_for(lambda: len(sent) == 1))
+        self.assertEqual(sent[0]["ticket"], 2)
+        self.assertEqual(pipeline.get_metrics()["latency"]["dropped"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
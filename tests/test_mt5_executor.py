@@ -0,0 +1,68 @@
+"""
+Test Suite for the MT5 I/O executor
+"""
+
+import unittest
+import asyncio
+import os
+import sys
+import threading
+
+# Add src directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from mt5_executor import MT5Executor
+
+
+class TestMT5Executor(unittest.TestCase):
+    """Test MT5Executor"""
+
+    def setUp(self):
+        self.executor = MT5Executor(name="test-mt5-io")
+        self.addCleanup(self.executor.stop)
+
+    def test_calls_run_on_one_thread(self):
+        """Test calls from many threads are serialized onto the I/O thread"""
+        seen = set()
+
+        def record():
+            seen.add(threading.current_thread().name)
+
+        callers = [threading.Thread(target=self.executor.call, args=(record,)) for _ in range(8)]
+        for caller in callers:
+            caller.start()
+        for caller in callers:
+            caller.join()
+
+        self.assertEqual(seen, {"test-mt5-io"})
+        self.assertEqual(self.executor.get_stats()["calls"], 8)
+
+    def test_batch(self):
+        """Test batched reads return per-key results and isolate failures"""
+        def fail():
+            raise RuntimeError("terminal gone")
+
+        result = self.executor.batch({
+            "total": (len, ([1, 2, 3],)),
+            "broken": (fail, ()),
+        })
+        self.assertEqual(result, {"total": 3, "broken": None})
+
+    def test_nested_call_runs_inline(self):
+        """Test a job calling the executor again does not deadlock"""
+        result = self.executor.call(lambda: self.executor.call(lambda: "inner"))
+        self.assertEqual(result, "inner")
+
+    def test_call_async(self):
+        """Test awaitable calls and exception propagation"""
+        async def run():
+            value = await self.executor.call_async(sum, [1, 2])
+            with self.assertRaises(ZeroDivisionError):
+                await self.executor.call_async(lambda: 1 / 0)
+            return value
+
+        self.assertEqual(asyncio.run(run()), 3)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,114 @@
+"""
+Test Suite for the MetaTrader5 simulator
+"""
+
+import unittest
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+
+# Add src directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from mt5_simulator import MT5Simulator, install
+from position_tracker import PositionTracker, PositionEventType
+
+START = datetime(2024, 1, 2, 9, 0, 0)
+
+
+class TestMT5Simulator(unittest.TestCase):
+    """Test MT5Simulator"""
+
+    def _simulator(self, **kwargs):
+        simulator = MT5Simulator(start_time=START, **kwargs)
+        simulator.initialize()
+        return simulator
+
+    def test_same_seed_same_sequence(self):
+        """Test the random generator is deterministic for a seed"""
+        first, second = self._simulator(seed=7), self._simulator(seed=7)
+        first.step(500)
+        second.step(500)
+
+        self.assertEqual(first.positions_get(), second.positions_get())
+        self.assertEqual(first.history_deals_get(START, START + timedelta(days=1)),
+                         second.history_deals_get(START, START + timedelta(days=1)))
+        self.assertEqual(first.get_stats()["events_generated"], 500)
+
+    def test_not_initialized(self):
+        """Test calls fail before initialize like the real terminal"""
+        simulator = MT5Simulator(start_time=START)
+        self.assertIsNone(simulator.positions_get())
+        self.assertEqual(simulator.last_error()[0], -10005)
+
+    def test_scripted_events_drive_tracker(self):
+        """Test a scripted lifecycle produces the matching tracker events"""
+        simulator = self._simulator(script=[
+            {"action": "open", "ticket": 1, "symbol": "EURUSD", "type": 0, "volume": 1.0},
+            {"action": "modify", "ticket": 1, "sl": 1.09, "tp": 1.12},
+            {"action": "partial_close", "ticket": 1, "volume": 0.4},
+            {"action": "close", "ticket": 1},
+        ])
+        tracker = PositionTracker()
+        events = []
+        while simulator.step():
+            events.extend(tracker.update(simulator.positions_get()))
+
+        self.assertEqual([e["event"] for e in events], [
+            PositionEventType.OPEN, PositionEventType.MODIFY,
+            PositionEventType.PARTIAL_CLOSE, PositionEventType.CLOSE,
+        ])
+        deals = simulator.history_deals_get(START, START + timedelta(minutes=1))
+        self.assertEqual([d.volume for d in deals], [1.0, 0.4, 0.6])
+
+    def test_group_mask_and_history_range(self):
+        """Test group masks and date ranges filter like the terminal"""
+        simulator = self._simulator(seed=1, event_rate=10)
+        simulator.step(200)
+
+        for position in simulator.positions_get(group="EUR*,GBP*,!GBPUSD"):
+            self.assertEqual(position.symbol, "EURUSD")
+        window = simulator.history_deals_get(START + timedelta(seconds=5), START + timedelta(seconds=10))
+        self.assertTrue(window)
+        for deal in window:
+            self.assertTrue(5000 <= deal.time_msc - simulator.start_msc <= 10000)
+
+    def test_installed_module_serves_connector(self):
+        """Test the installed module works behind the MT5 connector"""
+        simulator = install(self._simulator(seed=3))
+        self.addCleanup(sys.modules.pop, "MetaTrader5", None)
+        from mt5_connector import MT5Connector
+
+        events = []
+        connector = MT5Connector("sim", "Simulator-Demo", "1", "pw", on_event=events.append)
+        self.assertTrue(connector.initialize())
+        simulator.step(50)
+        self.assertTrue(connector.poll_positions())
+        self.assertEqual(len(connector.position_tracker.get_open_tickets()), simulator.positions_total())
+        connector.shutdown()
+
+    def test_connector_measures_server_clock_offset(self):
+        """Test the connector derives the trade server offset from tick times"""
+        server_now = datetime.now(timezone.utc) + timedelta(hours=3)
+        install(MT5Simulator(start_time=server_now))
+        self.addCleanup(sys.modules.pop, "MetaTrader5", None)
+        # Re-import so the connector binds this simulator module rather than one from an earlier test
+        sys.modules.pop("mt5_connector", None)
+        self.addCleanup(sys.modules.pop, "mt5_connector", None)
+        from mt5_connector import MT5Connector
+
+        connector = MT5Connector("sim", "Simulator-Demo", "1", "pw")
+        self.assertTrue(connector.initialize())
+        self.assertEqual(connector.server_time_offset, 3 * 3600)
+        connector.shutdown()
+
+        # A tick from a closed market says nothing about the clock
+        install(self._simulator())
+        connector = MT5Connector("sim", "Simulator-Demo", "1", "pw")
+        self.assertTrue(connector.initialize())
+        self.assertEqual(connector.server_time_offset, 0.0)
+        connector.shutdown()
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,85 @@
+"""
+Test Suite for the MT5 worker pool supervision
+"""
+
+import unittest
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+# Add src directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from mt5_worker_pool import MT5WorkerPool
+from position_tracker import PositionEventType, PositionTracker
+
+
+def crashing_worker(account_id, connector_kwargs, event_queue, stop_event, heartbeat_interval):
+    """Stand-in worker: reports one OPEN event and exits as if the terminal crashed"""
+    event_queue.put((account_id, "event", {"event": "open", "ticket": connector_kwargs["ticket"]}))
+
+
+def restarting_worker(account_id, connector_kwargs, event_queue, stop_event, heartbeat_interval):
+    """Stand-in worker: diffs a book against the seeded tracker, then crashes
+
+    The first run sees ticket 1; after the restart ticket 2 was opened while the worker was down.
+    """
+    tracker = PositionTracker()
+    known = connector_kwargs.get("known_positions")
+    if known:
+        tracker.seed(known)
+    tickets = [1, 2] if known else [1]
+    book = [SimpleNamespace(ticket=t, symbol="EURUSD", volume=0.1, sl=0.0, tp=0.0, time_update_msc=1000 + t)
+            for t in tickets]
+    for event in tracker.update(book):
+        event_queue.put((account_id, "event", dict(event, event=event["event"].value)))
+
+
+class TestMT5WorkerPool(unittest.TestCase):
+    """Test MT5WorkerPool"""
+
+    def test_events_and_restart(self):
+        """Test events are forwarded per account and dead workers are restarted"""
+        events = []
+        pool = MT5WorkerPool(on_event=events.append, max_restarts=1, restart_backoff=0.1,
+                             worker_target=crashing_worker)
+        pool.add_account("master-1", ticket=1)
+        pool.add_account("master-2", ticket=2)
+        pool.start()
+        try:
+            deadline = time.monotonic() + 30
+            while time.monotonic() < deadline:
+                status = pool.get_status()
+                if all(s["failed"] for s in status.values()):
+                    break
+                time.sleep(0.1)
+        finally:
+            pool.stop()
+
+        status = pool.get_status()
+        self.assertTrue(all(s["restarts"] == 1 and s["failed"] for s in status.values()))
+        self.assertTrue(all(e["event"] == PositionEventType.OPEN for e in events))
+        self.assertEqual({e["account_id"] for e in events}, {"master-1", "master-2"})
+
+    def test_restart_does_not_replay_open(self):
+        """Test a restarted worker is seeded with known positions and only reports new ones"""
+        events = []
+        pool = MT5WorkerPool(on_event=events.append, max_restarts=1, restart_backoff=0.1,
+                             worker_target=restarting_worker)
+        pool.add_account("master-1")
+        pool.start()
+        try:
+            deadline = time.monotonic() + 30
+            while time.monotonic() < deadline and not pool.get_status()["master-1"]["failed"]:
+                time.sleep(0.1)
+        finally:
+            pool.stop()
+
+        self.assertEqual(pool.get_status()["master-1"]["restarts"], 1)
+        self.assertEqual([(e["event"], e["ticket"]) for e in events],
+                         [(PositionEventType.OPEN, 1), (PositionEventType.OPEN, 2)])
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
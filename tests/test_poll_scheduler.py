@@ -0,0 +1,65 @@
+"""
+Test Suite for the AdaptivePollScheduler
+"""
+
+import unittest
+from unittest.mock import patch
+import os
+import sys
+
+# Add src directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from poll_scheduler import AdaptivePollScheduler
+
+
+class TestAdaptivePollScheduler(unittest.TestCase):
+    """Test AdaptivePollScheduler"""
+
+    def setUp(self):
+        self.now = 1000.0
+        patcher = patch('poll_scheduler.time.monotonic', side_effect=lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.scheduler = AdaptivePollScheduler(max_latency_ms=100, min_interval_ms=10,
+                                               active_window_ms=1000, full_refresh_ms=500)
+
+    def test_backs_off_when_idle(self):
+        """Test the interval grows to the latency budget when idle"""
+        self.now += 5.0  # Leave the active window
+        for _ in range(10):
+            self.scheduler.record(False)
+        self.assertAlmostEqual(self.scheduler.next_interval(), 0.1)
+
+    def test_fast_polling_on_activity(self):
+        """Test activity drops the interval back to the minimum"""
+        self.now += 5.0
+        for _ in range(10):
+            self.scheduler.record(False)
+
+        self.scheduler.record(True)
+        self.assertAlmostEqual(self.scheduler.next_interval(), 0.01)
+
+    def test_probe_skips_full_fetch(self):
+        """Test unchanged counters skip positions_get() outside the active window"""
+        self.assertTrue(self.scheduler.should_fetch(3, 0))  # First poll always fetches
+
+        self.now += 2.0
+        self.assertTrue(self.scheduler.should_fetch(3, 0))  # Full refresh deadline
+        self.now += 0.1
+        self.assertFalse(self.scheduler.should_fetch(3, 0))
+        self.now += 0.1
+        self.assertTrue(self.scheduler.should_fetch(4, 0))  # New position
+
+    def test_stats(self):
+        """Test achieved poll rate is reported"""
+        for _ in range(11):
+            self.scheduler.should_fetch(0, 0)
+            self.now += 0.02
+        stats = self.scheduler.get_stats()
+        self.assertEqual(stats['polls'], 11)
+        self.assertAlmostEqual(stats['recent_poll_rate_hz'], 50.0, places=3)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
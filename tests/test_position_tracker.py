@@ -0,0 +1,90 @@
+"""
+Test Suite for the PositionTracker snapshot-diff engine
+"""
+
+import unittest
+import os
+import sys
+from collections import namedtuple
+
+# Add src directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from position_tracker import PositionTracker, PositionEventType
+
+
+Position = namedtuple("Position", ["ticket", "symbol", "type", "volume", "sl", "tp", "time_update_msc"])
+
+
+class TestPositionTracker(unittest.TestCase):
+    """Test PositionTracker"""
+
+    def setUp(self):
+        self.tracker = PositionTracker()
+        self.position = Position(1001, "EURUSD", 0, 1.0, 1.0900, 1.1100, 1000)
+
+    def test_open_event(self):
+        """Test new positions are reported once as OPEN"""
+        events = self.tracker.update([self.position])
+        self.assertEqual(len(events), 1)
+        self.assertEqual(events[0]["event"], PositionEventType.OPEN)
+        self.assertEqual(events[0]["position"]["volume"], 1.0)
+        self.assertEqual(events[0]["event_time"], 1.0)
+
+        # Unchanged snapshot produces nothing
+        self.assertEqual(self.tracker.update([self.position]), [])
+
+    def test_modify_event(self):
+        """Test SL/TP changes are reported as MODIFY"""
+        self.tracker.update([self.position])
+        modified = self.position._replace(sl=1.0950, time_update_msc=2000)
+
+        events = self.tracker.update([modified])
+        self.assertEqual(len(events), 1)
+        self.assertEqual(events[0]["event"], PositionEventType.MODIFY)
+        self.assertEqual(events[0]["previous"]["sl"], 1.0900)
+        self.assertEqual(events[0]["position"]["sl"], 1.0950)
+
+    def test_partial_close_event(self):
+        """Test volume reduction is reported as PARTIAL_CLOSE"""
+        self.tracker.update([self.position])
+        reduced = self.position._replace(volume=0.4, time_update_msc=2000)
+
+        events = self.tracker.update([reduced])
+        self.assertEqual(events[0]["event"], PositionEventType.PARTIAL_CLOSE)
+        self.assertAlmostEqual(events[0]["closed_volume"], 0.6)
+
+    def test_close_event(self):
+        """Test disappearing positions are reported as CLOSE"""
+        self.tracker.update([self.position])
+
+        events = self.tracker.update([])
+        self.assertEqual(len(events), 1)
+        self.assertEqual(events[0]["event"], PositionEventType.CLOSE)
+        self.assertEqual(events[0]["ticket"], 1001)
+        self.assertEqual(self.tracker.get_open_tickets(), [])
+
+    def test_update_time_only_change_ignored(self):
+        """Test a bare time_update_msc change emits no event"""
+        self.tracker.update([self.position])
+        self.assertEqual(self.tracker.update([self.position._replace(time_update_msc=5000)]), [])
+
+    def test_failed_fetch_keeps_snapshot(self):
+        """Test positions_get() returning None does not close everything"""
+        self.tracker.update([self.position])
+        self.assertEqual(self.tracker.update(None), [])
+        self.assertEqual(self.tracker.get_open_tickets(), [1001])
+
+    def test_seed_resumes_without_events(self):
+        """Test a seeded snapshot only reports what changed since it"""
+        self.tracker.seed([self.position._asdict()])
+        self.assertEqual(self.tracker.update([self.position]), [])
+
+        self.tracker.seed([self.position._asdict()])
+        events = self.tracker.update([])
+        self.assertEqual([e["event"] for e in events], [PositionEventType.CLOSE])
+        self.assertEqual(events[0]["position"]["symbol"], "EURUSD")
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
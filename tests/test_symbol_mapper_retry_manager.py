@@ -2,6 +2,7 @@
 Test Suite for SymbolMapper and RetryManager modules
 """
 
+import asyncio
 import unittest
 from unittest.mock import MagicMock, patch
 import os
@@ -109,6 +110,14 @@ class TestSymbolMapper(unittest.TestCase):
         # Any valid symbol should be allowed
         mapped = mapper_no_restriction.map_symbol("EURAUD.z")
         self.assertEqual(mapped, "EURAUD")
+    
+    def test_build_group_mask(self):
+        """Test compiling allowed symbols and mappings into an MT5 group mask"""
+        mask = self.mapper.build_group_mask()
+        self.assertEqual(mask, "EURUSD*,GBPUSD*,GOLD*,USDJPY*,XAUUSD*")
+        
+        # No allowed list means no terminal-side filtering
+        self.assertIsNone(SymbolMapper(self.symbol_mapping, None).build_group_mask())
 
 
 class TestRetryManager(unittest.TestCase):
@@ -260,6 +269,135 @@ class TestRetryManager(unittest.TestCase):
             self.assertLessEqual(delay, 1.25)
 
 
+
+class TestAsyncRetryManager(unittest.TestCase):
+    """Test the async retry path of Retry Manager"""
+    
+    def setUp(self):
+        """Set up test data"""
+        self.retry_manager = RetryManager(
+            max_attempts=3,
+            initial_delay=0.05,
+            max_delay=1.0,
+            exponential_base=2.0,
+            jitter=False,
+            circuit_failure_threshold=3,
+            circuit_recovery_timeout=1
+        )
+    
+    def test_retry_on_failure(self):
+        """Test async retries sleep without blocking the event loop"""
+        calls = []
+        ticks = []
+        
+        async def flaky_func(value):
+            calls.append(value)
+            if len(calls) < 3:
+                raise Exception("Temporary failure")
+            return value
+        
+        async def ticker():
+            while True:
+                ticks.append(time.monotonic())
+                await asyncio.sleep(0.01)
+        
+        async def run():
+            ticking = asyncio.ensure_future(ticker())
+            try:
+                return await self.retry_manager.retry_with_backoff_async(flaky_func, "done")
+            finally:
+                ticking.cancel()
+        
+        self.assertEqual(asyncio.run(run()), "done")
+        self.assertEqual(len(calls), 3)
+        # The loop kept running during the 0.05 + 0.1 s of backoff
+        self.assertGreater(len(ticks), 5)
+    
+    def test_deadline(self):
+        """Test the deadline cuts off a slow attempt and stops further retries"""
+        calls = []
+        
+        async def slow_func():
+            calls.append(1)
+            await asyncio.sleep(1.0)
+        
+        started = time.monotonic()
+        with self.assertRaises(asyncio.TimeoutError):
+            asyncio.run(self.retry_manager.retry_with_backoff_async(slow_func, deadline=0.1))
+        self.assertLess(time.monotonic() - started, 0.5)
+        self.assertEqual(len(calls), 1)
+    
+    def test_cancellation_is_not_a_failure(self):
+        """Test cancelling a retrying call propagates and leaves the circuit alone"""
+        async def hanging_func():
+            await asyncio.sleep(10)
+        
+        async def run():
+            task = asyncio.ensure_future(self.retry_manager.retry_with_backoff_async(hanging_func))
+            await asyncio.sleep(0.01)
+            task.cancel()
+            await task
+        
+        with self.assertRaises(asyncio.CancelledError):
+            asyncio.run(run())
+        self.assertEqual(self.retry_manager.get_circuit_status(), {})
+    
+    def test_circuit_shared_with_sync_path(self):
+        """Test a circuit opened by sync failures makes the async path fail fast"""
+        calls = []
+        
+        def place_order():
+            calls.append(1)
+            raise Exception("Broker down")
+        
+        async def get_positions():
+            raise AssertionError("should not be called while the circuit is open")
+        
+        self.retry_manager.circuit_failure_threshold = 2
+        with self.assertRaises(Exception):
+            self.retry_manager.retry_with_backoff(place_order, circuit_key="broker")
+        # The sync loop stops as soon as the circuit opens instead of using every attempt
+        self.assertEqual(len(calls), 2)
+        
+        with self.assertRaises(Exception) as context:
+            asyncio.run(self.retry_manager.retry_with_backoff_async(get_positions, circuit_key="broker"))
+        self.assertIn("Circuit breaker is OPEN", str(context.exception))
+    
+    def test_wrapped_function_keeps_its_circuit_argument(self):
+        """Test a function's own circuit/deadline keywords reach it untouched"""
+        def route(circuit):
+            return circuit
+        
+        async def route_async(circuit):
+            return circuit
+        
+        self.assertEqual(self.retry_manager.retry_with_backoff(route, circuit="EU-1"), "EU-1")
+        
+        @self.retry_manager.retry_decorator(circuit="broker")
+        async def decorated(circuit, deadline):
+            return circuit, deadline
+        
+        self.assertEqual(asyncio.run(decorated(circuit="EU-1", deadline=5)), ("EU-1", 5))
+        self.assertEqual(asyncio.run(self.retry_manager.retry_with_backoff_async(
+            route_async, circuit="EU-1", circuit_key="broker")), "EU-1")
+    
+    def test_async_decorator(self):
+        """Test the decorator wraps coroutine functions with the async path"""
+        calls = []
+        
+        @self.retry_manager.retry_decorator(max_attempts=2, circuit="broker")
+        async def decorated_func():
+            calls.append(1)
+            if len(calls) < 2:
+                raise Exception("Temporary failure")
+            return "success"
+        
+        self.assertTrue(asyncio.iscoroutinefunction(decorated_func))
+        self.assertEqual(asyncio.run(decorated_func()), "success")
+        # The decorator's custom-attempt manager records into the shared circuits
+        self.assertEqual(self.retry_manager.get_circuit_status()["broker"]["failure_count"], 1)
+
+
 def run_tests():
     """Run all tests"""
     unittest.main(verbosity=2)
@@ -0,0 +1,89 @@
+"""
+Test Suite for push-based trade event ingestion
+"""
+
+import unittest
+import asyncio
+import os
+import sys
+
+# Add src directory to path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from position_tracker import PositionTracker, PositionEventType
+from trade_event_listener import TradeEventListener, TradeEventProducer
+
+
+POSITION = {
+    "ticket": 2001, "symbol": "EURUSD", "type": 0, "volume": 1.0,
+    "price_open": 1.1, "sl": 1.09, "tp": 1.12, "time_update_msc": 1000,
+}
+
+
+class TestTradeEventListener(unittest.TestCase):
+    """Test TradeEventListener with the stand-in producer"""
+
+    def setUp(self):
+        self.tracker = PositionTracker()
+        self.events = []
+        self.listener = TradeEventListener(self.tracker, self.events.append, port=0)
+
+    async def _produce(self, *messages, expected):
+        await self.listener.start()
+        producer = TradeEventProducer(port=self.listener.port)
+        producer.connect()
+        try:
+            for message in messages:
+                producer.send(message)
+            for _ in range(200):
+                if len(self.events) >= expected:
+                    break
+                await asyncio.sleep(0.01)
+            self.assertTrue(self.listener.is_active())
+        finally:
+            producer.close()
+            await self.listener.stop()
+
+    def test_pushed_lifecycle(self):
+        """Test open, modify and close pushed over the socket"""
+        asyncio.run(self._produce(
+            dict(POSITION, msg="position"),
+            {"msg": "heartbeat"},
+            dict(POSITION, msg="position", sl=1.095, time_update_msc=2000),
+            {"msg": "close", "ticket": 2001, "time_msc": 3000},
+            expected=3,
+        ))
+
+        self.assertEqual([e["event"] for e in self.events],
+                         [PositionEventType.OPEN, PositionEventType.MODIFY, PositionEventType.CLOSE])
+        self.assertEqual(self.events[1]["position"]["sl"], 1.095)
+
+    def test_invalid_message_skipped(self):
+        """Test malformed messages are counted and skipped"""
+        self.assertEqual(self.listener.handle_message({"msg": "position", "ticket": 1}), [])
+        self.assertEqual(self.listener.handle_message({"msg": "bogus"}), [])
+        self.assertEqual(self.listener.get_stats()["decode_errors"], 2)
+
+    def test_reconcile_after_push_is_silent(self):
+        """Test a reconciliation poll matching pushed state emits nothing"""
+        self.listener.handle_message(dict(POSITION, msg="position"))
+
+        class Polled:
+            pass
+        polled = Polled()
+        polled.__dict__.update(POSITION)
+
+        self.assertEqual(self.tracker.update([polled]), [])
+
+    def test_stale_poll_does_not_undo_push(self):
+        """Test a snapshot fetched before a push does not revert or close pushed state"""
+        import time
+        fetched_at = time.monotonic()
+        self.listener.handle_message(dict(POSITION, msg="position"))
+
+        self.assertEqual(self.tracker.update([], fetched_at), [])
+        self.assertEqual(self.tracker.get_open_tickets(), [2001])
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)